@@ -0,0 +1,354 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import config  # loads .env
+import response_cache
+
+try:
+    import aiohttp
+except ImportError:                 # optional: AsyncClient then runs fetch_json in threads
+    aiohttp = None
+
+# =====================================================
+# SHARED CRICBUZZ HTTP CLIENT
+# One keep-alive session for pipeline.py and cricbuzzapp.py,
+# so fan-out questions reuse TCP/TLS connections. requests is
+# imported when the session is first built, not at import.
+# =====================================================
+
+API_HOST = os.getenv("RAPIDAPI_HOST", "cricbuzz-cricket.p.rapidapi.com")
+BASE_URL = f"https://{API_HOST}"
+
+API_KEY = os.getenv("API_KEY") or "DUMMY_KEY"
+
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "16"))
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("API_BACKOFF_FACTOR", "0.5"))
+DEFAULT_TIMEOUT = 15
+
+# Global request budget shared by every thread (requests per second)
+RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", "5"))
+RATE_BURST = int(os.getenv("API_RATE_BURST", "5"))
+MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", "8"))
+
+# In-flight requests per host for the asyncio client
+HOST_CONCURRENCY = int(os.getenv("API_HOST_CONCURRENCY", "16"))
+
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+headers = {
+    "x-rapidapi-key": API_KEY,
+    "x-rapidapi-host": API_HOST
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# =====================================================
+# RATE LIMITER
+# =====================================================
+class RateLimiter:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` saved."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self):
+        """Take a token: 0 on success, else the seconds until one is due."""
+
+        if self.rate <= 0:
+            return 0
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst,
+                self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waits without blocking the event loop."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+rate_limiter = RateLimiter(RATE_LIMIT, RATE_BURST)
+
+
+def _build_session():
+
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.headers.update(headers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_session():
+
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+
+    return _session
+
+
+def get(url, params=None, timeout=DEFAULT_TIMEOUT):
+    """Raw GET through the pooled session. Returns the Response."""
+    rate_limiter.acquire()
+    return get_session().get(url, params=params, timeout=timeout)
+
+
+def fetch_json(url, params=None, timeout=DEFAULT_TIMEOUT, use_cache=True):
+    """
+    GET a Cricbuzz endpoint and return parsed JSON, or {} on any failure.
+    Served from the on-disk response cache when a fresh entry exists.
+    """
+
+    if use_cache:
+        cached = response_cache.get(url, params)
+        if cached is not None:
+            return cached
+
+    try:
+        response = get(url, params=params, timeout=timeout)
+
+        if response.status_code != 200:
+            print(f" API failed: {response.status_code}")
+            return {}
+
+        payload = response.json()
+
+        if use_cache:
+            response_cache.put(url, params, payload)
+
+        return payload
+
+    except Exception as e:
+        print(" API error:", e)
+        return {}
+
+
+# =====================================================
+# CONCURRENT FAN-OUT
+# =====================================================
+def fetch_many(urls, params=None, max_workers=MAX_WORKERS):
+    """
+    Fetch {key: url} concurrently and yield (key, json) as each completes.
+    Failed calls yield {} like fetch_json. The global rate limiter still applies.
+    """
+
+    if not urls:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+
+        futures = {
+            pool.submit(fetch_json, url, params): key
+            for key, url in urls.items()
+        }
+
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def fetch_scorecards(match_ids, kind="scard", max_workers=MAX_WORKERS):
+    """Yield (match_id, scorecard) for /mcenter/v1/{id}/{kind} as they arrive."""
+
+    urls = {
+        mid: f"{BASE_URL}/mcenter/v1/{mid}/{kind}"
+        for mid in dict.fromkeys(match_ids)
+        if mid
+    }
+
+    yield from fetch_many(urls, max_workers=max_workers)
+
+
+def fetch_match_info(match_ids, max_workers=MAX_WORKERS):
+    """Yield (match_id, info) for /mcenter/v1/{id} as they arrive."""
+
+    urls = {
+        mid: f"{BASE_URL}/mcenter/v1/{mid}"
+        for mid in dict.fromkeys(match_ids)
+        if mid
+    }
+
+    yield from fetch_many(urls, max_workers=max_workers)
+
+
+# =====================================================
+# ASYNCIO CLIENT
+# For ingestion written as task graphs (async_ingest.py): one
+# keep-alive aiohttp session per run, at most HOST_CONCURRENCY
+# requests in flight per host, and the same global token bucket
+# (so the same RapidAPI budget) as the threaded client above.
+# =====================================================
+def _retry_delay(attempt, retry_after=None):
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return BACKOFF_FACTOR * (2 ** attempt)
+
+
+class AsyncClient:
+    """
+    async with AsyncClient() as api:
+        data = await api.fetch_json(url)
+
+    Same contract as fetch_json / fetch_many: parsed JSON or {} on
+    failure, served from the response cache when fresh. Without
+    aiohttp installed, each request runs fetch_json in a thread.
+    """
+
+    def __init__(self, per_host=HOST_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = None
+        self.pool = None
+        self.limits = {}
+
+    async def __aenter__(self):
+
+        if aiohttp is not None:
+            self.session = aiohttp.ClientSession(
+                headers=headers,
+                connector=aiohttp.TCPConnector(limit=POOL_SIZE, limit_per_host=self.per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        else:
+            # own threads: the loop's default executor is sized by CPU count
+            self.pool = ThreadPoolExecutor(max_workers=POOL_SIZE)
+
+        return self
+
+    async def __aexit__(self, *exc):
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def _limit(self, url):
+
+        host = urlsplit(url).netloc
+
+        if host not in self.limits:
+            self.limits[host] = asyncio.Semaphore(self.per_host)
+
+        return self.limits[host]
+
+    async def _get(self, url, params):
+        """
+        GET with the threaded client's retry policy: RETRY_STATUSES and
+        connection errors / timeouts are retried up to MAX_RETRIES times
+        with BACKOFF_FACTOR exponential backoff (or Retry-After).
+        """
+
+        for attempt in range(MAX_RETRIES + 1):
+
+            await rate_limiter.acquire_async()
+            retry_after = None
+
+            try:
+                async with self.session.get(url, params=params) as response:
+
+                    if response.status == 200:
+                        return await response.json(content_type=None)
+
+                    if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        print(f" API failed: {response.status}")
+                        return {}
+
+                    retry_after = response.headers.get("Retry-After")
+
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == MAX_RETRIES:
+                    raise
+
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+
+    async def fetch_json(self, url, params=None, use_cache=True):
+
+        if self.session is None:
+            async with self._limit(url):
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.pool, fetch_json, url, params, self.timeout, use_cache
+                )
+
+        if use_cache:
+            cached = response_cache.get(url, params)
+            if cached is not None:
+                return cached
+
+        async with self._limit(url):
+            try:
+                payload = await self._get(url, params)
+            except Exception as e:
+                print(" API error:", e)
+                return {}
+
+        if use_cache:
+            response_cache.put(url, params, payload)
+
+        return payload
+
+    async def fetch_many(self, urls, params=None):
+        """Fetch {key: url} concurrently; async-yield (key, json) as each completes."""
+
+        async def one(key, url):
+            return key, await self.fetch_json(url, params)
+
+        for done in asyncio.as_completed([one(key, url) for key, url in urls.items()]):
+            yield await done
@@ -0,0 +1,14 @@
+import os
+
+from dotenv import load_dotenv
+
+# =====================================================
+# ENVIRONMENT
+# .env is read once per process: every module that reads
+# settings with os.getenv imports this one first, and Python
+# runs it only on the first import.
+# =====================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+load_dotenv(os.path.join(BASE_DIR, ".env"))
@@ -0,0 +1,247 @@
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+import config  # loads .env
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:                 # in requirements.txt; without it nothing is snapshotted
+    pa = ds = pq = None
+
+# =====================================================
+# COLUMNAR CORPUS SNAPSHOT
+# The archive feed's scorecard rows are compacted into Parquet
+# datasets under data/snapshot/<name>/match_format=../year=../,
+# so a reader loads only the formats / seasons and columns it
+# needs (the archive innings stores behind Q23 / Q25, and Q24 for
+# a format or season slice). A snapshot is rewritten only when a
+# source table's change version moved (warehouse.source_marks),
+# so start dates backfilled later move rows out of year=0.
+# Derived frames of JSON caches (Q22) are kept here too.
+# =====================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR") or os.path.join(DATA_DIR, "snapshot")
+
+PARTITIONING = ["match_format", "year"]
+
+# matches without a start date are kept under year=0
+PARTITION_COLUMNS = """
+    COALESCE(m.match_format, 'unknown') AS match_format,
+    COALESCE(EXTRACT(YEAR FROM m.start_date)::int, 0) AS year
+"""
+
+# dataset name -> rows of the feed's matches (:feed)
+SNAPSHOT_QUERIES = {
+    "batting": """
+        SELECT
+            b.match_id, b.innings_id, b.position, b.player_id,
+            COALESCE(p.full_name, b.player_name) AS player_name,
+            b.runs, b.balls, b.fours, b.sixes,
+            b.strike_rate::float8 AS strike_rate,
+            b.dismissal,
+            m.start_date::date AS date,
+        """ + PARTITION_COLUMNS + """
+        FROM batting_entries b
+        JOIN matches m
+            ON m.match_id = b.match_id
+        LEFT JOIN players p
+            ON p.player_id = b.player_id
+        WHERE b.match_id IN (SELECT match_id FROM feed_matches WHERE feed = :feed)
+    """,
+    "bowling": """
+        SELECT
+            b.match_id, b.innings_id, b.position, b.player_id,
+            COALESCE(p.full_name, b.player_name) AS player_name,
+            b.overs::float8 AS overs, b.balls, b.maidens, b.runs, b.wickets,
+            b.economy::float8 AS economy,
+            m.start_date::date AS date,
+        """ + PARTITION_COLUMNS + """
+        FROM bowling_entries b
+        JOIN matches m
+            ON m.match_id = b.match_id
+        LEFT JOIN players p
+            ON p.player_id = b.player_id
+        WHERE b.match_id IN (SELECT match_id FROM feed_matches WHERE feed = :feed)
+    """,
+    "partnerships": """
+        SELECT
+            t.match_id, t.innings_id, t.wicket_no,
+            t.bat1_id, COALESCE(p1.full_name, t.bat1_name) AS bat1_name, t.bat1_runs,
+            t.bat2_id, COALESCE(p2.full_name, t.bat2_name) AS bat2_name, t.bat2_runs,
+            t.total_runs, t.total_balls,
+            m.start_date::date AS date,
+        """ + PARTITION_COLUMNS + """
+        FROM partnerships t
+        JOIN matches m
+            ON m.match_id = t.match_id
+        LEFT JOIN players p1
+            ON p1.player_id = t.bat1_id
+        LEFT JOIN players p2
+            ON p2.player_id = t.bat2_id
+        WHERE t.match_id IN (SELECT match_id FROM feed_matches WHERE feed = :feed)
+    """,
+}
+
+SOURCE_TABLES = ["batting_entries", "bowling_entries", "partnerships", "matches", "feed_matches", "players"]
+
+_frames = {}
+
+
+def available():
+    return ds is not None
+
+
+def snapshot_signature(snapshot_dir=SNAPSHOT_DIR):
+    """Signature the current snapshot was written for, None before the first one."""
+
+    try:
+        with open(os.path.join(snapshot_dir, "_signature"), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _swap_dataset(df, path):
+    """Write df as a partitioned dataset next to `path`, then swap it in,
+    so readers never see a half-written dataset."""
+
+    staging = f"{path}.tmp"
+    retired = f"{path}.old"
+
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        staging,
+        format="parquet",
+        partitioning=PARTITIONING,
+        partitioning_flavor="hive",
+        existing_data_behavior="overwrite_or_ignore"
+    )
+
+    shutil.rmtree(retired, ignore_errors=True)
+
+    if os.path.exists(path):
+        os.replace(path, retired)
+
+    os.replace(staging, path)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def write_corpus_snapshot(engine, snapshot_dir=SNAPSHOT_DIR, feed="archive", force=False):
+    """
+    Write the feed's batting / bowling / partnership rows as Parquet
+    datasets partitioned by match format and year. Skipped while none
+    of SOURCE_TABLES changed since the last snapshot.
+    Returns {dataset: rows written} ({} when skipped or pyarrow is missing).
+    """
+
+    import warehouse
+
+    if not available():
+        return {}
+
+    with engine.begin() as conn:
+
+        warehouse.create_schema(conn)
+
+        # one writer at a time (refresh worker vs. a cold dashboard read)
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('corpus_snapshot'))"))
+
+        for table in SOURCE_TABLES:
+            warehouse.watch_table(conn, table)
+
+        signature = json.dumps(
+            {"feed": feed, "sources": warehouse.source_marks(conn, SOURCE_TABLES)},
+            sort_keys=True
+        )
+
+        if not force and snapshot_signature(snapshot_dir) == signature:
+            return {}
+
+        counts = {}
+
+        for name, sql in SNAPSHOT_QUERIES.items():
+            df = pd.read_sql(text(sql), conn, params={"feed": feed})
+            _swap_dataset(df, os.path.join(snapshot_dir, name))
+            counts[name] = len(df)
+
+        with open(os.path.join(snapshot_dir, "_signature"), "w") as f:
+            f.write(signature)
+
+    return counts
+
+
+def read_snapshot(name, columns=None, formats=None, years=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Load one snapshot dataset ("batting", "bowling", "partnerships").
+    `formats` / `years` prune partitions; `columns` prunes columns.
+    """
+
+    if not available():
+        raise RuntimeError("pyarrow is required for the Parquet snapshot")
+
+    dataset = ds.dataset(
+        os.path.join(snapshot_dir, name),
+        format="parquet",
+        partitioning="hive"
+    )
+
+    # an empty feed writes no files, so the dataset has no schema
+    if not dataset.files:
+        return pd.DataFrame(columns=columns or [])
+
+    condition = None
+
+    if formats:
+        condition = ds.field("match_format").isin([str(f) for f in formats])
+
+    if years:
+        by_year = ds.field("year").isin([int(y) for y in years])
+        condition = by_year if condition is None else condition & by_year
+
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def cached_frame(name, sources, build, snapshot_dir=SNAPSHOT_DIR):
+    """
+    build() once per change of the `sources` files: the frame is kept
+    in memory and, with pyarrow, as snapshot/<name>.parquet, and is
+    rebuilt only when a source file is newer than the cached copy.
+    """
+
+    mtimes = tuple(os.stat(p).st_mtime_ns for p in sources)
+
+    cached = _frames.get(name)
+    if cached and cached[0] == mtimes:
+        return cached[1].copy()
+
+    path = os.path.join(snapshot_dir, f"{name}.parquet")
+    df = None
+
+    if available() and os.path.exists(path) and os.stat(path).st_mtime_ns >= max(mtimes):
+        df = pq.read_table(path).to_pandas()
+
+    if df is None:
+        df = build()
+
+        if available():
+            os.makedirs(snapshot_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{time.time_ns()}.tmp"
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+            os.replace(tmp_path, path)
+
+    _frames[name] = (mtimes, df)
+
+    return df.copy()
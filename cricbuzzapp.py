@@ -1,37 +1,15 @@
 import streamlit as st
 import pandas as pd
-import requests
-import json
+import api_client
+import config  # loads .env
+import live_scores
 import pipeline
 import os
-from pipeline import engine
 
-import streamlit as st
-
-from dotenv import load_dotenv
-
-
-# Load environment variables (optional if already done in pipeline)
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-load_dotenv(os.path.join(BASE_DIR, ".env"))
-
-# Test database connection
-if engine:
-    try:
-        with engine.connect() as conn:
-            st.success("Database connected successfully ✅")
-    except Exception as e:
-        st.error(f"Connection failed: {e}")
-else:
-    st.error("Engine is None")
+from sqlalchemy.exc import SQLAlchemyError
 
 # -------- API --------
-API_KEY = os.getenv("API_KEY") or "DUMMY_KEY"
-
-headers = {
-    "x-rapidapi-key": API_KEY,
-    "x-rapidapi-host": "cricbuzz-cricket.p.rapidapi.com"
-}
+# All Cricbuzz calls go through the shared pooled session in api_client
 
 
 # =============================
@@ -51,6 +29,22 @@ st.set_page_config(
     layout="wide"
 )
 
+# Test database connection once per process, not on every rerun
+# (a failure raises, is not cached, and is retried on the next rerun)
+@st.cache_resource
+def check_database():
+    engine = pipeline.get_engine()
+    if engine is None:
+        raise RuntimeError("Engine is None")
+    with engine.connect():
+        return True
+
+try:
+    check_database()
+    st.success("Database connected successfully ✅")
+except Exception as e:
+    st.error(f"Connection failed: {e}")
+
 # ---------- Styling ----------
 st.markdown("""
 <style>
@@ -86,38 +80,82 @@ section[data-testid="stSidebar"] {
 </style>
 """, unsafe_allow_html=True)
 
-# Helper: Transform API values to Dataframe records
-def transform_to_records(data):
-    if not data or "values" not in data:
+# Helper: long career-stats rows -> one record per stat, a column per format
+def transform_to_records(rows):
+    df = pd.DataFrame(rows)
+    if df.empty:
         return []
-    h = data.get("headers", [])
-    v = data.get("values", [])
-    return [dict(zip(h, row.get("values", []))) for row in v if len(row.get("values", [])) == len(h)]
+    df = df.sort_values(["stat_order", "format_order"])
+    table = df.pivot(index=["stat_order", "stat"], columns="format", values="raw")
+    table = table[df["format"].drop_duplicates()].fillna("")
+    return table.reset_index(level="stat").rename(columns={"stat": "Stat"}).to_dict("records")
 
-@st.cache_data(ttl=3600)
+# served from the shared response cache (search TTL rule); a failed
+# call is not cached, so the next search retries it
 def search_player(name):
     url = "https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/search"
-    response = requests.get(url, headers=headers, params={"plrN": name})
-    return response.json().get("player", []) if response.status_code == 200 else None
+    return api_client.fetch_json(url, params={"plrN": name}).get("player", [])
 
 @st.cache_data(ttl=3600)
 def get_player_stats(player_id):
-    # Fetch batting and bowling separately as the main profile lacks the "stats" key
-    bat_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{player_id}/batting"
-    bowl_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{player_id}/bowling"
-    
-    bat_resp = requests.get(bat_url, headers=headers)
-    bowl_resp = requests.get(bowl_url, headers=headers)
-    
+    import warehouse
+
+    # batting and bowling come from the warehouse career-stats cache,
+    # shared with the SQL questions (one download per player per day);
+    # without a usable database the page reads the API directly
+    rows = None
+    engine = pipeline.get_engine()
+    if engine is not None:
+        try:
+            rows = warehouse.career_stats(engine, [player_id]).to_dict("records")
+        except SQLAlchemyError as e:
+            print(" Career stats cache unavailable:", e)
+    if rows is None:
+        rows = [r for _, part in warehouse.fetch_career_stats([player_id]) for r in part]
+
     combined_stats = []
-    if bat_resp.status_code == 200:
-        combined_stats.append({"type": "Batting Statistics", "values": transform_to_records(bat_resp.json())})
-    if bowl_resp.status_code == 200:
-        combined_stats.append({"type": "Bowling Statistics", "values": transform_to_records(bowl_resp.json())})
+    for discipline in warehouse.DISCIPLINES:
+        part = [r for r in rows if r["discipline"] == discipline]
+        if part:
+            combined_stats.append({"type": f"{discipline.title()} Statistics", "values": transform_to_records(part)})
         
     return {"stats": combined_stats} if combined_stats else None
 
 
+# Live table: reruns on its own every LIVE_VIEW_REFRESH seconds and
+# applies only the matches the shared live_scores poller saw change
+LIVE_VIEW_REFRESH = float(os.getenv("LIVE_VIEW_REFRESH", "5"))
+
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def _live_fragment(fn):
+    return fragment(run_every=LIVE_VIEW_REFRESH)(fn) if fragment else fn
+
+@_live_fragment
+def live_scores_table():
+    version, changed, removed = live_scores.changes(st.session_state.get("live_version", 0))
+
+    rows = st.session_state.setdefault("live_rows", {})
+    if removed is None:
+        rows.clear()    # too far behind: `changed` is the full state
+    for mid in removed or []:
+        rows.pop(mid, None)
+    rows.update(changed)
+    st.session_state.live_version = version
+
+    df_live = live_scores.live_frame(list(rows.values()))
+    if not df_live.empty:
+        cols = ["Team 1", "Team 2", "Team1 Runs", "Team1 Wickets", "Team2 Runs", "Team2 Wickets", "Status", "Venue", "Format"]
+        available_cols = [c for c in cols if c in df_live.columns]
+        st.dataframe(df_live[available_cols], use_container_width=True)
+    else:
+        st.info("No live matches at the moment.")
+
+    age = live_scores.poller.age()
+    if age is not None:
+        st.caption(f"Live scores polled {int(age)} s ago")
+
+
 # Initialize Error Tracking
 if 'has_error' not in st.session_state:
     st.session_state.has_error = False
@@ -145,36 +183,57 @@ option = st.sidebar.radio(
 
 
 # ---------- Navigation ----------
-@st.cache_data(ttl=60)
 def get_match_full_details(match_id):
+    # Match info and scorecard fetched concurrently through the shared
+    # response cache: completed matches are kept for good, live ones
+    # for LIVE_MATCH_TTL (see response_cache.TTL_RULES)
+    urls = {
+        "info": f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{match_id}",
+        "scard": f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{match_id}/scard"
+    }
     try:
-        # Match Info
-        info_url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{match_id}"
-        info_resp = requests.get(info_url, headers=headers)
-        
-        # Scorecard
-        sc_url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{match_id}/scard"
-        sc_resp = requests.get(sc_url, headers=headers)
-        
-        if info_resp.status_code != 200:
-            return None, f"Match Info API failed with status {info_resp.status_code}"
-        if sc_resp.status_code != 200:
-            return None, f"Scorecard API failed with status {sc_resp.status_code}"
-            
-        return {"info": info_resp.json(), "scard": sc_resp.json()}, None
+        data = dict(api_client.fetch_many(urls))
+
+        if not data["info"]:
+            return None, "Match Info API failed"
+        if not data["scard"]:
+            return None, "Scorecard API failed"
+
+        return data, None
     except Exception as e:
         return None, str(e)
 
 
+# Scorecard tables: payload field -> column
+BAT_COLUMNS = {"name": "Batter", "runs": "Runs", "balls": "Balls", "fours": "4s", "sixes": "6s", "strikeRate": "SR", "outDesc": "Dismissal"}
+BOWL_COLUMNS = {"name": "Bowler", "overs": "O", "maidens": "M", "runs": "R", "wickets": "W", "economy": "Eco"}
+
+# lowercase field names of current scard payloads
+FIELD_ALIASES = {"strkrate": "strikeRate", "outdec": "outDesc"}
+
+def innings_frame(players, columns):
+    # one frame per innings in a single construction: older payloads map
+    # player keys to dicts (batsmenData), current ones list them (batsman)
+    rows = list(players.values()) if isinstance(players, dict) else players or []
+    df = pd.DataFrame(rows).rename(columns=FIELD_ALIASES)
+    return df.reindex(columns=list(columns)).rename(columns=columns)
+
+def pick(d, *keys, default=None):
+    return next((d[k] for k in keys if d.get(k) is not None), default)
+
+
 # ---------- Navigation ----------
 if option == LIVE:
     st.header("📋 Matches Dashboard")
     st.caption("Real-time match insights from Cricbuzz")
 
-    # Fetch data once to populate dropdown
-    df_live = pipeline.live_data()
-    df_recent = pipeline.recent_match_data()
-    df_upcoming = pipeline.upcoming_data()
+    # Shared last-known lists; stale ones refresh in the background
+    lists = pipeline.match_lists()
+    df_live, df_recent, df_upcoming = lists["live"], lists["recent"], lists["upcoming"]
+
+    age = pipeline.match_lists_age()
+    if age is not None:
+        st.caption(f"Match lists updated {int(age)} s ago")
 
     # Dropdown for scorecard selection
     match_options = {}
@@ -218,14 +277,14 @@ if option == LIVE:
                 # --- SCORECARD LOOP ---
                 if "scorecard" in scard and scard["scorecard"]:
                     for innings in scard["scorecard"]:
-                        bat_team = innings.get('batTeamName', 'Innings')
+                        bat_team = pick(innings, 'batTeamName', 'batteamname', default='Innings')
                         st.markdown(f"### 🏏 {bat_team} Scorecard")
                         
                         # Innings Summary
                         s_runs = innings.get('score', 0)
                         s_wick = innings.get('wickets', 0)
                         s_overs = innings.get('overs', 0)
-                        rr = innings.get('runRate', 'N/A')
+                        rr = pick(innings, 'runRate', 'runrate', default='N/A')
                         
                         m1, m2, m3 = st.columns(3)
                         m1.metric("Score", f"{s_runs}/{s_wick}")
@@ -233,7 +292,7 @@ if option == LIVE:
                         m3.metric("Run Rate", f"{rr}")
                         
                         # Target and RRR for 2nd innings or later
-                        if innings.get('inningsId', 1) > 1:
+                        if pick(innings, 'inningsId', 'inningsid', default=1) > 1:
                             target = innings.get('target')
                             rrr = innings.get('requiredRunRate')
                             if target or rrr:
@@ -243,35 +302,15 @@ if option == LIVE:
                         
                         # Batting
                         st.write("#### Batting")
-                        bat_list = []
-                        # BatsmenData is a dict mapping player string IDs to info
-                        for _, b_info in innings.get("batsmenData", {}).items():
-                            bat_list.append({
-                                "Batter": b_info.get("name"),
-                                "Runs": b_info.get("runs"),
-                                "Balls": b_info.get("balls"),
-                                "4s": b_info.get("fours"),
-                                "6s": b_info.get("sixes"),
-                                "SR": b_info.get("strikeRate"),
-                                "Dismissal": b_info.get("outDesc")
-                            })
-                        if bat_list:
-                            st.dataframe(pd.DataFrame(bat_list), use_container_width=True, hide_index=True)
+                        bat_df = innings_frame(pick(innings, "batsmenData", "batsman"), BAT_COLUMNS)
+                        if not bat_df.empty:
+                            st.dataframe(bat_df, use_container_width=True, hide_index=True)
                         
                         # Bowling
                         st.write("#### Bowling")
-                        bowl_list = []
-                        for _, bw_info in innings.get("bowlersData", {}).items():
-                            bowl_list.append({
-                                "Bowler": bw_info.get("name"),
-                                "O": bw_info.get("overs"),
-                                "M": bw_info.get("maidens"),
-                                "R": bw_info.get("runs"),
-                                "W": bw_info.get("wickets"),
-                                "Eco": bw_info.get("economy")
-                            })
-                        if bowl_list:
-                            st.dataframe(pd.DataFrame(bowl_list), use_container_width=True, hide_index=True)
+                        bowl_df = innings_frame(pick(innings, "bowlersData", "bowler"), BOWL_COLUMNS)
+                        if not bowl_df.empty:
+                            st.dataframe(bowl_df, use_container_width=True, hide_index=True)
                 else:
                     st.info("Detailed scorecard not yet available for this match.")
 
@@ -280,12 +319,7 @@ if option == LIVE:
 
     with tab_live:
         st.subheader("Live Matches Summary")
-        if not df_live.empty:
-            cols = ["Team 1", "Team 2", "Team1 Runs", "Team1 Wickets", "Team2 Runs", "Team2 Wickets", "Status", "Venue", "Format"]
-            available_cols = [c for c in cols if c in df_live.columns]
-            st.dataframe(df_live[available_cols], use_container_width=True)
-        else:
-            st.info("No live matches at the moment.")
+        live_scores_table()
 
     with tab_recent:
         st.subheader("Recent Matches Summary")
@@ -349,121 +383,68 @@ elif option == PLAYER:
                 else:
                     st.dataframe(df, use_container_width=True, hide_index=True)
 
+        # recent form from the memory-mapped innings store (refresh job "innings_store")
+        import innings_store
+        store = innings_store.open_store()
+
+        if store is not None and player_id in store:
+            st.subheader("Recent Innings")
+            st.dataframe(pd.DataFrame([store.form(player_id)]), use_container_width=True, hide_index=True)
+            st.dataframe(store.frame(player_id, last=10).iloc[::-1], use_container_width=True, hide_index=True)
+
 
 
 elif option == SQL:
     st.header("📊 Analytics Questions")
     st.caption("25 Analytical queries powered by pipeline.py")
 
-    questions = [f"Question {i}" for i in range(1, 26)]
-    question_labels = {
-        "Question 1": "All players who represent India",
-        "Question 2": "Matches played in the last few days",
-        "Question 3": "Top 10 highest run scorers in ODI",
-        "Question 4": "Venues with capacity exceeding 25k",
-        "Question 5": "Matches won by each team",
-        "Question 6": "Player count by playing role",
-        "Question 7": "Highest individual score per format",
-        "Question 8": "Series started in 2024",
-        "Question 9": "All-rounders with 1000 runs & 50 wickets",
-        "Question 10": "Last 20 completed matches details",
-        "Question 11": "Player performance comparison across formats",
-        "Question 12": "Team performance Home vs Away",
-        "Question 13": "Batting partnerships of 100+ runs",
-        "Question 14": "Bowling performance at different venues",
-        "Question 15": "Players in close matches",
-        "Question 16": "Yearly batting performance evolution",
-        "Question 17": "Toss advantage percentage analysis",
-        "Question 18": "Most economical bowlers in limited overs",
-        "Question 19": "Batsmen scoring consistency analysis",
-        "Question 20": "Player format analysis & batting averages",
-        "Question 21": "Composite player ranking system",
-        "Question 22": "Head-to-head match prediction",
-        "Question 23": "Recent player form categorized",
-        "Question 24": "Successful batting partnerships analysis",
-        "Question 25": "Time-series analysis of player evolution"
-    }
+    questions = list(pipeline.QUESTIONS)
 
-    selected_q = st.selectbox("Select a query", questions, format_func=lambda x: f"{x}: {question_labels.get(x, '')}")
+    selected_q = st.selectbox(
+        "Select a query",
+        questions,
+        format_func=lambda x: f"Question {x}: {pipeline.QUESTIONS[x]['label']}"
+    )
+    spec = pipeline.QUESTIONS[selected_q]
         
     if st.button("Execute"):
         
         with st.spinner("Calculating..."):
             try:
-                res = pd.DataFrame()
-                if selected_q == "Question 1":res = pipeline.get_q1_india_players()
-                elif selected_q == "Question 2":res = pipeline.get_q2_recent_matches()
-                elif selected_q == "Question 3":res = pipeline.get_q3_top_odi_scorers()
-                elif selected_q == "Question 4": res = pipeline.get_q4_large_venues()
-                elif selected_q == "Question 5":res = pipeline.get_q5_team_win_counts()
-                elif selected_q == "Question 6":res = pipeline.get_q6_players_by_role()
-                elif selected_q == "Question 7": res = pipeline.get_q7_highest_scores()
-                elif selected_q == "Question 8": res = pipeline.get_q8_series_2024()
-                elif selected_q == "Question 9": res = pipeline.get_q9_allrounders()
-                elif selected_q == "Question 10": res = pipeline.get_q10_last_20_completed_matches()
-                elif selected_q == "Question 11": res = pipeline.get_q11_player_format_comparison()
-                elif selected_q == "Question 12": 
-                    st.subheader("ICC Cricket World Cup 2023 — Home vs Away Performance")
-                    res = pipeline.get_que12_home_away_analysis()
-                elif selected_q == "Question 13": res = pipeline.get_que13_century_partnerships()
-                elif selected_q == "Question 14":
-                    res, series_name = pipeline.get_que14_bowler_venue_performance()
+                if spec.get("title"):
+                    st.subheader(spec["title"])
+                if spec.get("caption"):
+                    st.caption(spec["caption"])
+
+                res = pipeline.run_question(selected_q)
+
+                # Q14 also returns the series it analysed
+                if isinstance(res, tuple):
+                    res, series_name = res
                     st.subheader(f"Series: {series_name}")
-                    if res.empty:
-                      st.info(
-                         "No bowlers satisfy the criteria:\n"
-                         "• At least 3 matches at the same venue\n"
-                         "• Minimum 4 overs in each match"
-                         )
-                    else:
-                         st.dataframe(res)
-                elif selected_q == "Question 15": res = pipeline.get_que15_close_matches_performance()
-                elif selected_q == "Question 16":res = pipeline.get_que16_player_yearly_stats()
-                elif selected_q == "Question 17": 
-                    res = pipeline.get_q17_toss_advantage()
-                    if isinstance(res, pd.DataFrame) and not res.empty:
-                        st.subheader("Question 17 — Toss Advantage Analysis")
-                        st.dataframe(res, use_container_width=True)
-                    else:
-                        st.warning("No data available for Question 17.")
-                elif selected_q == "Question 18": res = pipeline.get_que18_economical_bowlers()
-                elif selected_q == "Question 19":
-                    try:
-                        res = pipeline.get_que19_player_consistency()
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-                        res = pd.DataFrame()
-                elif selected_q == "Question 20": res = pipeline.get_que20_player_format_analysis()
-                elif selected_q == "Question 21":res = pipeline.get_q21_composite_ranking()
-                elif selected_q == "Question 22":
-                    st.subheader("🏏 Q22: India vs Australia Head-to-Head Analysis (2024–2026)")
-                    st.caption("Data extracted from Cricbuzz series archives | Only completed matches included")
-                    res = pipeline.get_q22_head_to_head_analysis()
-                elif selected_q == "Question 23":res = pipeline.get_q23_player_form_analysis()
-                elif selected_q == "Question 24":res = pipeline.get_q24_batting_partnerships()
-                elif selected_q == "Question 25":res = pipeline.get_q25_player_time_series()
-                else: res = pd.DataFrame() # Fallback 
-                # -------- SAFE DISPLAY --------
-                if isinstance(res, pd.DataFrame):
 
-                  if not res.empty:
-                      st.dataframe(res, use_container_width=True)
-               
-                  else:
-                      st.warning("No data available for this query.")
-                elif isinstance(res, dict):
-                 # temporary fallback if any function still returns dict
-                      st.write(res)
-                elif res is None:
-                      pass   # do nothing (custom UI already shown)
+                age = pipeline.question_age(selected_q)
+                if age is not None:
+                    st.caption(f"Data refreshed {int(age // 60)} min ago")
 
+                # -------- SAFE DISPLAY --------
+                if isinstance(res, pd.DataFrame) and not res.empty:
+                    st.dataframe(res, use_container_width=True)
+                elif isinstance(res, dict):
+                    # temporary fallback if any function still returns dict
+                    st.write(res)
+                elif spec.get("empty_message"):
+                    st.info(spec["empty_message"])
                 else:
-                      st.warning("No data available for this query.")
+                    st.warning("No data available for this query.")
 
                
             except Exception as e:
                 st.session_state.has_error = True
-                st.error(f"Analysis failed: {e}")
+                if "does not exist" in str(e):
+                    st.warning("No data ingested for this question yet. Run `python -m pipeline refresh`.")
+                else:
+                    st.error(f"Analysis failed: {e}")
 
 
 
@@ -471,41 +452,18 @@ elif option == CRUD:
     st.header("🛠 Database CRUD Operations")
     st.caption("Persistent storage powered by PostgreSQL")
 
-    # ── Imports ──────────────────────────────────────────────────────────────
-    try:
-        import psycopg2
-        from psycopg2 import sql as pg_sql
-    except ImportError:
-        st.error("❌ psycopg2 is not installed. Run: pip install psycopg2-binary")
-        st.stop()
-
-    # ── Credentials from environment variables ────────────────────────────────
-    DB_HOST     = os.getenv("DB_HOST", "localhost")
-    DB_PORT     = os.getenv("DB_PORT", "5432")
-    DB_NAME     = os.getenv("DB_NAME", "cricbuzz")
-    DB_USER     = os.getenv("DB_USER", "postgres")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-
-    missing_vars = []
-    for var_name, var_val in [("DB_HOST", DB_HOST), ("DB_NAME", DB_NAME),
-                               ("DB_USER", DB_USER), ("DB_PASSWORD", DB_PASSWORD)]:
-        if not var_val:
-            missing_vars.append(var_name)
+    # ── Credentials from environment variables (read by pipeline) ─────────────
+    # a missing driver or password surfaces through pipeline.db_connection
+    missing_vars = [name for name in ("DB_HOST", "DB_PORT", "DB_NAME", "DB_USER", "DB_PASSWORD") if not os.getenv(name)]
     if missing_vars:
         st.warning(f"⚠️ Missing environment variables: {', '.join(missing_vars)}. "
                    "Set them in your .env file or system environment. "
-                   "Using defaults where possible (DB_HOST=localhost, DB_PORT=5432, DB_NAME=cricbuzz).")
+                   f"The shared engine uses {pipeline.DB_USER}@{pipeline.DB_HOST}:{pipeline.DB_PORT}/{pipeline.DB_NAME}"
+                   + (" and is not created without DB_PASSWORD." if "DB_PASSWORD" in missing_vars else "."))
 
     # ── DB helpers ────────────────────────────────────────────────────────────
-    def get_connection():
-        """Return a new psycopg2 connection."""
-        return psycopg2.connect(
-            host=DB_HOST,
-            port=int(DB_PORT),
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD
-        )
+    # every helper borrows a connection from pipeline's shared pool for its
+    # statement and hands it back (pipeline.db_connection commits / rolls back)
 
     DEFAULT_PLAYERS = [
         ("Virat Kohli",       "India",        "Batsman",      275, 12898,   4),
@@ -520,9 +478,10 @@ elif option == CRUD:
         ("Quinton de Kock",   "South Africa", "Wicketkeeper", 145,  5966,   0),
     ]
 
-    def init_db(conn):
-        """Create table if not exists; seed with 10 players if empty."""
-        with conn.cursor() as cur:
+    @st.cache_resource
+    def init_db():
+        """Create table if not exists; seed with 10 players if empty (once per process)."""
+        with pipeline.db_connection() as conn, conn.cursor() as cur:
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS crud_players (
                     id       SERIAL PRIMARY KEY,
@@ -542,11 +501,11 @@ elif option == CRUD:
                     "VALUES (%s, %s, %s, %s, %s, %s);",
                     DEFAULT_PLAYERS
                 )
-        conn.commit()
+        return True
 
-    def fetch_all(conn, search=""):
+    def fetch_all(search=""):
         """Return all players (optionally filtered) as a DataFrame."""
-        with conn.cursor() as cur:
+        with pipeline.db_connection() as conn, conn.cursor() as cur:
             if search:
                 cur.execute(
                     "SELECT id, name, country, role, matches, runs, wickets "
@@ -562,35 +521,31 @@ elif option == CRUD:
         cols = ["ID", "Name", "Country", "Role", "Matches", "Runs", "Wickets"]
         return pd.DataFrame(rows, columns=cols)
 
-    def add_player(conn, name, country, role, matches, runs, wickets):
-        with conn.cursor() as cur:
+    def add_player(name, country, role, matches, runs, wickets):
+        with pipeline.db_connection() as conn, conn.cursor() as cur:
             cur.execute(
                 "INSERT INTO crud_players (name, country, role, matches, runs, wickets) "
                 "VALUES (%s, %s, %s, %s, %s, %s);",
                 (name, country, role, matches, runs, wickets)
             )
-        conn.commit()
 
-    def update_player(conn, pid, name, country, role, matches, runs, wickets):
-        with conn.cursor() as cur:
+    def update_player(pid, name, country, role, matches, runs, wickets):
+        with pipeline.db_connection() as conn, conn.cursor() as cur:
             cur.execute(
                 "UPDATE crud_players SET name=%s, country=%s, role=%s, "
                 "matches=%s, runs=%s, wickets=%s WHERE id=%s;",
                 (name, country, role, matches, runs, wickets, pid)
             )
-        conn.commit()
-        return cur.rowcount  # 0 if ID not found
+            return cur.rowcount  # 0 if ID not found
 
-    def delete_player(conn, pid):
-        with conn.cursor() as cur:
+    def delete_player(pid):
+        with pipeline.db_connection() as conn, conn.cursor() as cur:
             cur.execute("DELETE FROM crud_players WHERE id=%s;", (pid,))
-        conn.commit()
-        return cur.rowcount  # 0 if ID not found
+            return cur.rowcount  # 0 if ID not found
 
     # ── Connect & initialise ──────────────────────────────────────────────────
     try:
-        _conn = get_connection()
-        init_db(_conn)
+        init_db()
     except Exception as _db_err:
         st.error(f"❌ Could not connect to PostgreSQL: {_db_err}\n\n"
                  "**Checklist:**\n"
@@ -602,7 +557,7 @@ elif option == CRUD:
 
     # ── Fetch players for dropdowns ───────────────────────────────────────────
     try:
-        players_df = fetch_all(_conn)
+        players_df = fetch_all()
     except Exception as e:
         st.error(f"❌ Failed to fetch players: {e}")
         st.stop()
@@ -617,7 +572,7 @@ elif option == CRUD:
     with col_count:
         st.metric("Total Records", len(players_df))
 
-    filtered_df = fetch_all(_conn, search=search_q.strip())
+    filtered_df = fetch_all(search=search_q.strip())
     if filtered_df.empty:
         st.info("No players found.")
     else:
@@ -655,7 +610,7 @@ elif option == CRUD:
                 st.error("❌ Player name cannot be empty.")
             else:
                 try:
-                    add_player(_conn, a_name.strip(), a_country.strip(), a_role,
+                    add_player(a_name.strip(), a_country.strip(), a_role,
                                int(a_matches), int(a_runs), int(a_wickets))
                     st.success(f"✅ **{a_name}** added to the database!")
                     st.rerun()
@@ -692,7 +647,7 @@ elif option == CRUD:
                     st.error("❌ Name cannot be empty.")
                 else:
                     try:
-                        affected = update_player(_conn, int(sel_row["ID"]),
+                        affected = update_player(int(sel_row["ID"]),
                                                  u_name.strip(), u_country.strip(), u_role,
                                                  int(u_matches), int(u_runs), int(u_wickets))
                         if affected == 0:
@@ -729,7 +684,7 @@ elif option == CRUD:
             st.warning(f"⚠️ You are about to delete **{del_row['Name']}**. This cannot be undone.")
             if st.button("�️ Confirm Delete", type="primary", use_container_width=True):
                 try:
-                    affected = delete_player(_conn, int(del_row["ID"]))
+                    affected = delete_player(int(del_row["ID"]))
                     if affected == 0:
                         st.warning("⚠️ Player not found.")
                     else:
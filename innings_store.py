@@ -0,0 +1,544 @@
+import hashlib
+import json
+import os
+import shutil
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import corpus_snapshot
+import warehouse
+
+# =====================================================
+# MEMORY-MAPPED INNINGS STORE
+# Batting innings as fixed-width .npy columns, sorted by player
+# and date. offsets.npy marks where each player's run starts, so
+# "last N innings of player X" is a slice of memory-mapped arrays:
+# no query, no copy. The main store holds every innings in the
+# warehouse (Player page); archive stores behind Q23 / Q25 are
+# built from the Parquet snapshot, one per format / season slice.
+# =====================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.getenv("INNINGS_STORE_DIR") or os.path.join(BASE_DIR, "data", "innings_store")
+ARCHIVE_STORE_DIR = os.getenv("ARCHIVE_STORE_DIR") or os.path.join(BASE_DIR, "data", "innings_store_archive")
+
+COLUMNS = {
+    "player_id": np.int64,
+    "match_id": np.int64,
+    "date": "datetime64[D]",
+    "runs": np.int32,
+    "balls": np.int32,
+    "strike_rate": np.float32,
+}
+
+SOURCE_TABLES = ["batting_entries", "matches", "players"]
+
+# bumped when the on-disk layout changes, so build_store rewrites old stores
+STORE_VERSION = 2
+
+_open = {}
+
+
+def _signature(conn):
+    """Change versions of the source tables (see warehouse.watch_table)."""
+
+    for table in SOURCE_TABLES:
+        warehouse.watch_table(conn, table)
+
+    return json.dumps(warehouse.source_marks(conn, SOURCE_TABLES), sort_keys=True)
+
+
+def _read_meta(store_dir):
+    try:
+        with open(os.path.join(store_dir, "meta.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_store(engine, store_dir=STORE_DIR, force=False):
+    """
+    (Re)write the store from batting_entries + matches when either table
+    changed since the last build. Returns the number of innings written,
+    or None when the store was already current.
+    """
+
+    with engine.begin() as conn:
+
+        warehouse.create_schema(conn)
+        signature = _signature(conn)
+
+        meta = _read_meta(store_dir)
+
+        if not force and meta.get("version") == STORE_VERSION and meta.get("signature") == signature:
+            return None
+
+        df = pd.read_sql(
+            text("""
+                SELECT
+                    b.player_id,
+                    COALESCE(p.full_name, b.player_name) AS player_name,
+                    b.match_id,
+                    m.start_date::date AS date,
+                    b.runs,
+                    b.balls,
+                    b.strike_rate
+                FROM batting_entries b
+                JOIN matches m
+                    ON m.match_id = b.match_id
+                LEFT JOIN players p
+                    ON p.player_id = b.player_id
+                WHERE b.player_id IS NOT NULL
+                ORDER BY b.player_id, m.start_date NULLS FIRST, b.match_id, b.innings_id
+            """),
+            conn
+        )
+
+    return write_store(df, store_dir, signature)
+
+
+# snapshot columns a store needs (innings_id only orders the rows)
+SNAPSHOT_COLUMNS = ["player_id", "player_name", "match_id", "innings_id", "date", "runs", "balls", "strike_rate"]
+
+
+def _slice_name(formats=None, years=None):
+    """Directory name of an archive store slice: "all", "T20", "T20-2024-2025" ..."""
+
+    parts = sorted(str(f) for f in formats or []) + sorted(str(int(y)) for y in years or [])
+    return "-".join(parts) or "all"
+
+
+def build_snapshot_store(formats=None, years=None, snapshot_dir=corpus_snapshot.SNAPSHOT_DIR, force=False):
+    """
+    (Re)write the archive store of one format / season slice from the
+    Parquet snapshot, reading only SNAPSHOT_COLUMNS of the matching
+    partitions; skipped while the snapshot is unchanged. Returns the
+    store directory.
+    """
+
+    store_dir = os.path.join(ARCHIVE_STORE_DIR, _slice_name(formats, years))
+
+    signature = json.dumps({
+        "snapshot": corpus_snapshot.snapshot_signature(snapshot_dir),
+        "formats": sorted(str(f) for f in formats or []),
+        "years": sorted(int(y) for y in years or []),
+    }, sort_keys=True)
+
+    meta = _read_meta(store_dir)
+
+    if not force and meta.get("version") == STORE_VERSION and meta.get("signature") == signature:
+        return store_dir
+
+    df = corpus_snapshot.read_snapshot(
+        "batting", columns=SNAPSHOT_COLUMNS, formats=formats, years=years, snapshot_dir=snapshot_dir
+    )
+
+    df = df[df["player_id"].notna()].astype({"player_id": "int64"})
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values(["player_id", "date", "match_id", "innings_id"], na_position="first", kind="stable")
+
+    write_store(df, store_dir, signature)
+
+    return store_dir
+
+
+def write_store(df, store_dir=STORE_DIR, signature=None):
+    """
+    Write innings rows (player_id, player_name, match_id, date, runs,
+    balls, strike_rate; sorted by player then date) as a store and swap
+    it in. Returns the number of innings written.
+    """
+
+    staging = f"{store_dir}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for name, dtype in COLUMNS.items():
+        values = pd.to_datetime(df[name]) if name == "date" else df[name].fillna(0)
+        np.save(os.path.join(staging, f"{name}.npy"), values.to_numpy().astype(dtype))
+
+    players, starts = np.unique(df["player_id"].to_numpy(np.int64), return_index=True)
+    offsets = np.append(starts, len(df)).astype(np.int64)
+
+    np.save(os.path.join(staging, "players.npy"), players)
+    np.save(os.path.join(staging, "offsets.npy"), offsets)
+    np.save(os.path.join(staging, "digests.npy"), _digests(staging, offsets))
+
+    names = df.drop_duplicates("player_id").set_index("player_id")["player_name"]
+
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({
+            "version": STORE_VERSION,
+            "signature": signature,
+            "innings": len(df),
+            "names": {str(pid): name for pid, name in names.items()}
+        }, f)
+
+    retired = f"{store_dir}.old"
+    shutil.rmtree(retired, ignore_errors=True)
+
+    if os.path.exists(store_dir):
+        os.replace(store_dir, retired)
+
+    os.replace(staging, store_dir)
+    shutil.rmtree(retired, ignore_errors=True)
+
+    return len(df)
+
+
+def _digests(store_dir, offsets):
+    """
+    Per-player 64-bit digest of every stored column, so caches keyed on a
+    player can tell when any of their innings (runs, balls, strike rate,
+    dates...) changed between builds.
+    """
+
+    columns = [
+        np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r")
+        for name in COLUMNS
+    ]
+
+    digests = np.empty(len(offsets) - 1, dtype=np.uint64)
+
+    for i, (start, end) in enumerate(zip(offsets[:-1], offsets[1:])):
+        h = hashlib.blake2b(digest_size=8)
+        for col in columns:
+            h.update(np.ascontiguousarray(col[start:end]).tobytes())
+        digests[i] = int.from_bytes(h.digest(), "little")
+
+    return digests
+
+
+class InningsStore:
+    """Read-only view over a built store directory."""
+
+    def __init__(self, store_dir=STORE_DIR):
+
+        self.store_dir = store_dir
+
+        self.columns = {
+            name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r")
+            for name in COLUMNS
+        }
+
+        offsets = np.load(os.path.join(store_dir, "offsets.npy"))
+        players = np.load(os.path.join(store_dir, "players.npy"))
+        digests = np.load(os.path.join(store_dir, "digests.npy"))
+
+        # player_id -> (start, end) row range
+        self.index = {
+            int(pid): (int(offsets[i]), int(offsets[i + 1]))
+            for i, pid in enumerate(players)
+        }
+
+        # player_id -> digest of that player's innings (see _digests)
+        self.digests = dict(zip(players.tolist(), digests.tolist()))
+
+        self.names = {int(k): v for k, v in _read_meta(store_dir).get("names", {}).items()}
+
+    def __contains__(self, player_id):
+        return int(player_id) in self.index
+
+    def __len__(self):
+        return len(self.columns["match_id"])
+
+    def innings(self, player_id, last=None):
+        """
+        {column: array} of a player's innings, oldest first; `last` keeps
+        the most recent N. The arrays are views into the mapped files.
+        """
+
+        start, end = self.index.get(int(player_id), (0, 0))
+
+        if last is not None:
+            start = max(start, end - last)
+
+        return {name: col[start:end] for name, col in self.columns.items()}
+
+    def frame(self, player_id, last=None):
+        """innings() as a DataFrame (copies; meant for display)."""
+        return pd.DataFrame({k: np.asarray(v) for k, v in self.innings(player_id, last).items()})
+
+    def form(self, player_id, last=10):
+        """Q23's form metrics for one player over their last `last` innings."""
+
+        cols = self.innings(player_id, last)
+        runs = cols["runs"]
+
+        if len(runs) == 0:
+            return None
+
+        recent = runs[-5:]
+
+        return {
+            "player": self.names.get(int(player_id)),
+            "innings": len(runs),
+            "avg_last5": round(float(recent.mean()), 2),
+            f"avg_last{last}": round(float(runs.mean()), 2),
+            "sr_last5": round(float(cols["strike_rate"][-5:].mean()), 2),
+            f"sr_last{last}": round(float(cols["strike_rate"].mean()), 2),
+            "fifties": int((runs >= 50).sum()),
+            "std_dev": round(float(runs.std(ddof=1)), 2) if len(runs) > 1 else 0.0
+        }
+
+
+def _scoped_rows(store, match_ids=None):
+    """Store row numbers (still sorted by player) of the given matches' innings."""
+
+    if match_ids is None:
+        return np.arange(len(store))
+
+    return np.flatnonzero(np.isin(store.columns["match_id"], np.asarray(match_ids, dtype=np.int64)))
+
+
+def _runs(*keys):
+    """(starts, ends) of the runs of equal consecutive values across `keys`."""
+
+    changed = np.zeros(len(keys[0]), dtype=bool)
+    changed[0] = True
+
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+
+    starts = np.flatnonzero(changed)
+    return starts, np.r_[starts[1:], len(keys[0])]
+
+
+FORM_COLUMNS = ["player", "avg_last{short}", "avg_last{long}", "sr_last{short}", "sr_last{long}",
+                "fifties", "std_dev", "consistency_score", "form_category"]
+
+
+def form_table(store, short=5, long=10, match_ids=None):
+    """
+    Q23's form metrics for every player with at least `long` innings, in
+    one grouped NumPy pass: the last `long` innings of each player are
+    gathered into a (players x long) matrix and reduced along rows.
+    `match_ids` restricts the innings considered (e.g. the archive).
+    """
+
+    columns = [c.format(short=short, long=long) for c in FORM_COLUMNS]
+
+    rows = _scoped_rows(store, match_ids)
+
+    if len(rows) == 0:
+        return pd.DataFrame(columns=columns)
+
+    pids = store.columns["player_id"][rows]
+    starts, ends = _runs(pids)
+
+    qualified = (ends - starts) >= long
+
+    if not qualified.any():
+        return pd.DataFrame(columns=columns)
+
+    ends = ends[qualified]
+    players = pids[starts[qualified]]
+
+    # (players x long) row numbers, oldest innings first
+    window = rows[ends[:, None] - long + np.arange(long)]
+
+    runs = store.columns["runs"][window].astype(np.float64)
+    sr = store.columns["strike_rate"][window].astype(np.float64)
+
+    avg_short = runs[:, -short:].mean(axis=1)
+    avg_long = runs.mean(axis=1)
+    fifties = (runs >= 50).sum(axis=1)
+    std = runs.std(axis=1, ddof=1)
+
+    category = np.select(
+        [
+            (avg_short > avg_long) & (fifties >= 3) & (std < 25),
+            (avg_short >= avg_long) & (fifties >= 2),
+            (avg_short < avg_long) & (std > 35),
+        ],
+        ["Excellent Form", "Good Form", "Poor Form"],
+        default="Average Form"
+    )
+
+    df = pd.DataFrame({
+        columns[0]: [store.names.get(int(p)) for p in players],
+        columns[1]: avg_short.round(2),
+        columns[2]: avg_long.round(2),
+        columns[3]: sr[:, -short:].mean(axis=1).round(2),
+        columns[4]: sr.mean(axis=1).round(2),
+        columns[5]: fifties,
+        columns[6]: std.round(2),
+        columns[7]: (100 / (1 + std)).round(2),
+        columns[8]: category,
+    })
+
+    return df.sort_values(columns[1], ascending=False, kind="stable").reset_index(drop=True)
+
+
+# =====================================================
+# QUARTERLY TIME SERIES (Q25)
+# Innings bucketed into calendar quarters by match start date,
+# with quarter-over-quarter deltas and a career phase per player.
+# Results are cached per player (LRU, QUARTERLY_CACHE_SIZE entries)
+# and recomputed only for players whose innings digest changed.
+# =====================================================
+QUARTER_COLUMNS = ["player", "quarter", "avg_runs", "avg_strike_rate", "innings",
+                   "runs_delta", "sr_delta", "trend", "career_phase"]
+
+QUARTERLY_CACHE_SIZE = int(os.getenv("QUARTERLY_CACHE_SIZE", "20000"))
+
+_quarterly = OrderedDict()
+
+
+def _scope_key(match_ids):
+    """Stable key for a match_ids scope (None for the whole store)."""
+
+    if match_ids is None:
+        return None
+
+    ids = np.unique(np.asarray(match_ids, dtype=np.int64))
+    return hashlib.blake2b(ids.tobytes(), digest_size=16).hexdigest()
+
+
+def _quarterly_frame(store, rows, min_quarters, min_innings):
+    """Quarterly rows (plus player_id) for the players owning `rows`."""
+
+    dates = store.columns["date"][rows]
+    rows = rows[~np.isnat(dates)]
+
+    if len(rows) == 0:
+        return pd.DataFrame(columns=["player_id"] + QUARTER_COLUMNS)
+
+    pids = store.columns["player_id"][rows]
+    quarters = store.columns["date"][rows].astype("datetime64[M]").astype(np.int64) // 3
+
+    # the store is sorted by (player, date): each (player, quarter) is one run
+    starts, ends = _runs(pids, quarters)
+    innings = ends - starts
+
+    runs = np.add.reduceat(store.columns["runs"][rows].astype(np.float64), starts) / innings
+    sr = np.add.reduceat(store.columns["strike_rate"][rows].astype(np.float64), starts) / innings
+
+    q_pids = pids[starts]
+    q_index = quarters[starts]
+
+    keep = innings >= min_innings
+    q_pids, q_index, runs, sr, innings = q_pids[keep], q_index[keep], runs[keep], sr[keep], innings[keep]
+
+    if len(q_pids) == 0:
+        return pd.DataFrame(columns=["player_id"] + QUARTER_COLUMNS)
+
+    p_starts, p_ends = _runs(q_pids)
+    keep = np.repeat((p_ends - p_starts) >= min_quarters, p_ends - p_starts)
+    q_pids, q_index, runs, sr, innings = q_pids[keep], q_index[keep], runs[keep], sr[keep], innings[keep]
+
+    if len(q_pids) == 0:
+        return pd.DataFrame(columns=["player_id"] + QUARTER_COLUMNS)
+
+    p_starts, p_ends = _runs(q_pids)
+
+    # quarter-over-quarter deltas; a player's first quarter has none
+    runs_delta = np.r_[np.nan, np.diff(runs)]
+    sr_delta = np.r_[np.nan, np.diff(sr)]
+    runs_delta[p_starts] = np.nan
+    sr_delta[p_starts] = np.nan
+
+    # NaN compares False, so first quarters are "Stable"
+    improving = runs_delta > 0
+    declining = runs_delta < 0
+
+    trend = np.select([improving, declining], ["Improving", "Declining"], default="Stable")
+
+    ups = np.add.reduceat(improving.astype(np.int64), p_starts)
+    downs = np.add.reduceat(declining.astype(np.int64), p_starts)
+
+    phase = np.select(
+        [ups > downs, downs > ups],
+        ["Career Ascending", "Career Declining"],
+        default="Career Stable"
+    )
+
+    return pd.DataFrame({
+        "player_id": q_pids,
+        "player": [store.names.get(int(p)) for p in q_pids],
+        "quarter": [f"{1970 + q // 4}-Q{q % 4 + 1}" for q in q_index],
+        "avg_runs": runs.round(2),
+        "avg_strike_rate": sr.round(2),
+        "innings": innings,
+        "runs_delta": runs_delta.round(2),
+        "sr_delta": sr_delta.round(2),
+        "trend": trend,
+        "career_phase": np.repeat(phase, p_ends - p_starts),
+    })
+
+
+def quarterly_table(store, match_ids=None, min_quarters=3, min_innings=1):
+    """
+    Q25's quarterly series for every player with at least `min_quarters`
+    quarters of `min_innings`+ innings. Players whose innings digest is
+    unchanged since the last call are served from the per-player cache.
+    """
+
+    rows = _scoped_rows(store, match_ids)
+
+    if len(rows) == 0:
+        return pd.DataFrame(columns=QUARTER_COLUMNS)
+
+    pids = store.columns["player_id"][rows]
+    starts, ends = _runs(pids)
+
+    players = pids[starts].tolist()
+    signatures = [store.digests.get(pid) for pid in players]
+
+    scope = _scope_key(match_ids)
+    keys = [(store.store_dir, scope, min_quarters, min_innings, pid) for pid in players]
+
+    stale = np.array([
+        _quarterly.get(key, (None,))[0] != signature
+        for key, signature in zip(keys, signatures)
+    ])
+
+    if stale.any():
+
+        fresh = _quarterly_frame(
+            store, rows[np.repeat(stale, ends - starts)], min_quarters, min_innings
+        )
+        by_player = {pid: df for pid, df in fresh.groupby("player_id", sort=False)}
+
+        for key, pid, signature, is_stale in zip(keys, players, signatures, stale):
+            if is_stale:
+                _quarterly[key] = (signature, by_player.get(pid))
+
+    frames = []
+
+    for key in keys:
+        _quarterly.move_to_end(key)
+        frame = _quarterly[key][1]
+        if frame is not None:
+            frames.append(frame)
+
+    # frames are collected first: this call's own players may exceed the bound
+    while len(_quarterly) > QUARTERLY_CACHE_SIZE:
+        _quarterly.popitem(last=False)
+
+    if not frames:
+        return pd.DataFrame(columns=QUARTER_COLUMNS)
+
+    df = pd.concat(frames, ignore_index=True)[QUARTER_COLUMNS]
+
+    return df.sort_values(["player", "quarter"], kind="stable").reset_index(drop=True)
+
+
+def open_store(store_dir=STORE_DIR):
+    """Shared InningsStore, reopened after a rebuild; None before the first build."""
+
+    try:
+        stamp = os.stat(os.path.join(store_dir, "meta.json")).st_mtime_ns
+    except OSError:
+        return None
+
+    cached = _open.get(store_dir)
+
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, InningsStore(store_dir))
+        _open[store_dir] = cached
+
+    return cached[1]
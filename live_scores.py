@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+import api_client
+
+# =====================================================
+# LIVE SCORE POLLER
+# One background thread per process polls /matches/v1/live and
+# keeps the latest row per match in memory. A match counts as
+# changed only when its matchScore (runs / wickets / overs of every
+# innings), state or status moved; each change bumps a version, so
+# a viewer asks for changes(since=<its version>) and receives just
+# the matches that changed. Polls are frequent while some score
+# moved within LIVE_HOT_WINDOW and rare otherwise; the number of
+# viewers never changes the number of API calls. Only the newest
+# LIVE_REMOVED_KEEP removals are remembered; a viewer whose version
+# predates the ones dropped is sent the full state to resync.
+# =====================================================
+
+LIVE_URL = f"{api_client.BASE_URL}/matches/v1/live"
+
+LIVE_HOT_INTERVAL = float(os.getenv("LIVE_HOT_INTERVAL", "10"))
+LIVE_IDLE_INTERVAL = float(os.getenv("LIVE_IDLE_INTERVAL", "120"))
+LIVE_HOT_WINDOW = float(os.getenv("LIVE_HOT_WINDOW", "300"))
+LIVE_REMOVED_KEEP = int(os.getenv("LIVE_REMOVED_KEEP", "200"))
+
+SCORE_FIELDS = ("runs", "wickets", "overs")
+
+
+def live_matches(payload):
+    """(matchInfo, matchScore) for every match of a /matches/v1/live payload."""
+
+    for match_type in payload.get("typeMatches", []):
+        for item in match_type.get("seriesMatches", []):
+
+            series_wrapper = item.get("seriesAdWrapper")
+
+            if not series_wrapper:
+                continue
+
+            for match in series_wrapper.get("matches", []):
+                info = match.get("matchInfo", {})
+                if info.get("matchId"):
+                    yield info, match.get("matchScore")
+
+
+def score_key(score):
+    """Comparable (team, innings, runs, wickets, overs) tuple of a matchScore."""
+
+    key = []
+
+    for team in ("team1Score", "team2Score"):
+        for innings, values in sorted((score or {}).get(team, {}).items()):
+            key.append((team, innings) + tuple(values.get(f) for f in SCORE_FIELDS))
+
+    return tuple(key)
+
+
+def live_row(info, score):
+    """The dashboard's flat row for one live match (first-innings scores)."""
+
+    row = {
+        "Match ID": info.get("matchId"),
+        "Series Name": info.get("seriesName"),
+        "Match": info.get("matchDesc"),
+        "Format": info.get("matchFormat"),
+        "Team 1": info.get("team1", {}).get("teamName"),
+        "Team 2": info.get("team2", {}).get("teamName"),
+        "Venue": info.get("venueInfo", {}).get("ground"),
+        "City": info.get("venueInfo", {}).get("city"),
+        "State": info.get("state"),
+        "Status": info.get("status"),
+        "Start Date": info.get("startDate"),
+        "End Date": info.get("endDate")
+    }
+
+    for n, team in ((1, "team1Score"), (2, "team2Score")):
+
+        inngs = score.get(team, {}).get("inngs1", {}) if score else None
+
+        row[f"Team{n} Runs"] = int(inngs.get("runs", 0)) if inngs is not None else None
+        row[f"Team{n} Wickets"] = int(inngs.get("wickets", 0)) if inngs is not None else None
+        row[f"Team{n} Overs"] = float(inngs.get("overs", 0)) if inngs is not None else None
+
+    return row
+
+
+def live_frame(rows):
+    """Rows as the dashboard's live table: dates parsed, newest first, 1-based index."""
+
+    df = pd.DataFrame(rows)
+
+    if df.empty:
+        return df
+
+    df["Start Date"] = pd.to_datetime(df["Start Date"].astype("int64"), unit="ms")
+    df["End Date"] = pd.to_datetime(df["End Date"].astype("int64"), unit="ms")
+
+    df = df.sort_values("Start Date", ascending=False)
+    df.reset_index(drop=True, inplace=True)
+    df.index = df.index + 1
+
+    return df.fillna("-")
+
+
+class LivePoller:
+
+    def __init__(self, fetch=None):
+        self.fetch = fetch or (lambda: api_client.fetch_json(LIVE_URL, use_cache=False))
+        self.lock = threading.Lock()
+        self.matches = {}           # match_id -> {"row", "key", "changed_at", "version"}
+        self.removed = {}           # match_id -> version it left the live list
+        self.horizon = 0            # newest version whose removals were dropped
+        self.version = 0
+        self.polled_at = None
+        self.thread = None
+        self.ready = threading.Event()
+
+    # ---------- polling ----------
+    def poll(self):
+        """Fetch once and apply the changes. Returns the changed match ids."""
+
+        payload = self.fetch()
+
+        # a failed call keeps the last-known state
+        if not payload:
+            return []
+
+        seen = {}
+
+        for info, score in live_matches(payload):
+            row = live_row(info, score)
+            seen[row["Match ID"]] = (row, (score_key(score), row["State"], row["Status"]))
+
+        now = time.time()
+
+        with self.lock:
+
+            changed = [
+                mid for mid, (row, key) in seen.items()
+                if mid not in self.matches or self.matches[mid]["key"] != key
+            ]
+            gone = [mid for mid in self.matches if mid not in seen]
+
+            if changed or gone:
+                self.version += 1
+
+            for mid in changed:
+                row, key = seen[mid]
+                self.matches[mid] = {"row": row, "key": key, "changed_at": now, "version": self.version}
+                self.removed.pop(mid, None)
+
+            for mid in gone:
+                del self.matches[mid]
+                self.removed[mid] = self.version
+
+            self._prune_removed()
+
+            self.polled_at = now
+
+        return changed + gone
+
+    def _prune_removed(self):
+        """Keep the newest LIVE_REMOVED_KEEP removals (lock held)."""
+
+        excess = len(self.removed) - LIVE_REMOVED_KEEP
+
+        if excess <= 0:
+            return
+
+        for mid, version in sorted(self.removed.items(), key=lambda item: item[1])[:excess]:
+            del self.removed[mid]
+            self.horizon = max(self.horizon, version)
+
+    def interval(self):
+        """LIVE_HOT_INTERVAL while any score moved within LIVE_HOT_WINDOW, else LIVE_IDLE_INTERVAL."""
+
+        now = time.time()
+
+        with self.lock:
+            hot = any(now - m["changed_at"] < LIVE_HOT_WINDOW for m in self.matches.values())
+
+        return LIVE_HOT_INTERVAL if hot else LIVE_IDLE_INTERVAL
+
+    def run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                print(" Live poll failed:", e)
+            self.ready.set()
+            time.sleep(self.interval())
+
+    def start(self, wait=True):
+        """Start the polling thread once; by default wait for its first poll."""
+
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="live-scores", daemon=True)
+                self.thread.start()
+
+        if wait:
+            self.ready.wait(timeout=api_client.DEFAULT_TIMEOUT)
+
+    # ---------- reading ----------
+    def changes(self, since=0):
+        """
+        (version, {match_id: row} changed after `since`, [match_ids] that
+        left the live list after `since`). since=0 gives the full state.
+        When removals after `since` were already dropped, the full state is
+        returned with removed=None: the caller must replace its rows.
+        """
+
+        with self.lock:
+
+            resync = 0 < since < self.horizon
+
+            if resync:
+                since = 0
+
+            changed = {
+                mid: dict(m["row"]) for mid, m in self.matches.items()
+                if m["version"] > since
+            }
+            removed = [mid for mid, v in self.removed.items() if v > since] if since else []
+
+            return self.version, changed, None if resync else removed
+
+    def frame(self):
+        return live_frame(list(self.changes()[1].values()))
+
+    def age(self):
+        polled_at = self.polled_at
+        return None if polled_at is None else time.time() - polled_at
+
+
+poller = LivePoller()
+
+
+def changes(since=0):
+    """LivePoller.changes on the process-wide poller (started on first use)."""
+    poller.start()
+    return poller.changes(since)
+
+
+def frame():
+    """The current live table from the process-wide poller (started on first use)."""
+    poller.start()
+    return poller.frame()
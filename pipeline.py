@@ -1,70 +1,218 @@
-import pandas as pd
-import requests
-import os
+import asyncio
 import json
+import os
+import re
+import threading
 import time
-import numpy as np
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote_plus
+
+import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy import text
 
-load_dotenv()
+import api_client
+import config  # loads .env
+import live_scores
+import response_cache
+
+# warehouse (psycopg2), innings_store (numpy), corpus_snapshot (pyarrow)
+# and async_ingest are imported inside the functions that use them,
+# so importing pipeline does not load them.
 
-print("PIPELINE FILE RUNNING 🚀")
 API_KEY = os.getenv("API_KEY")
 
 if not API_KEY:
-    API_KEY = "DUMMY_KEY"
-    print("Warning: API key not found. Relying on local data.")
+    API_KEY = "DUMMY_KEY"          # no key: rely on local data / cached responses
 
-headers = {
-    "x-rapidapi-key": API_KEY,
-    "x-rapidapi-host": "cricbuzz-cricket.p.rapidapi.com"
-}
-
-from sqlalchemy import create_engine
-from urllib.parse import quote_plus
+headers = api_client.headers
 
-load_dotenv()
 
-DB_USER = os.getenv("DB_USER")
+# =====================================================
+# DATABASE ENGINE (lazy)
+# Importing pipeline builds nothing: the engine, its psycopg2
+# dialect and pool are created by the first get_engine() call.
+# pipeline.engine still works for callers outside this module.
+# One tuned pool serves the analytics and the dashboard's CRUD
+# page (db_connection); sizes and timeouts come from DB_POOL_*.
+# =====================================================
+DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-DB_NAME = os.getenv("DB_NAME")
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "cricbuzz")
 
-engine = None
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no")
 
-try:
-    encoded_password = quote_plus(DB_PASSWORD)
-
-    DATABASE_URL = (
-        f"postgresql+psycopg2://{DB_USER}:{encoded_password}"
-        f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    )
+# milliseconds; 0 = no limit (archive loads and view refreshes run long)
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
 
-    engine = create_engine(DATABASE_URL)
+_engine = None
+_engine_tried = False
+_engine_error = None
+_engine_lock = threading.Lock()
 
- 
 
-except Exception as e:
-    print(f" Engine creation failed: {e}")
+def _create_engine():
 
+    global _engine_error
 
-def safe_api_call(url, headers, params=None):
+    if not DB_PASSWORD:
+        _engine_error = "DB_PASSWORD is not set in .env"
+        print(f" Engine creation failed: {_engine_error}")
+        return None
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=15)
+        encoded_password = quote_plus(DB_PASSWORD)
 
-        if response.status_code != 200:
-            print(f" API failed: {response.status_code}")
-            return {}
+        DATABASE_URL = (
+            f"postgresql+psycopg2://{DB_USER}:{encoded_password}"
+            f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+        )
+
+        connect_args = {}
 
-        return response.json()
+        if DB_STATEMENT_TIMEOUT > 0:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"
+
+        return create_engine(
+            DATABASE_URL,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_POOL_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+            connect_args=connect_args
+        )
 
+    except ImportError as e:
+        _engine_error = f"psycopg2 is not installed (pip install psycopg2-binary): {e}"
     except Exception as e:
-        print(" API error:", e)
-        return {}
+        _engine_error = str(e)
+
+    print(f" Engine creation failed: {_engine_error}")
+    return None
+
+
+def get_engine():
+    """The shared SQLAlchemy engine, created on first use (None if the DB settings are unusable)."""
+
+    global _engine, _engine_tried
+
+    if not _engine_tried:
+        with _engine_lock:
+            if not _engine_tried:
+                _engine = _create_engine()
+                _engine_tried = True
+
+    return _engine
+
+
+def set_engine(engine):
+    """Use `engine` instead of the one built from the DB_* settings."""
+
+    global _engine, _engine_tried
+
+    with _engine_lock:
+        _engine, _engine_tried = engine, True
+
+
+@contextmanager
+def db_connection():
+    """
+    A DBAPI (psycopg2) connection borrowed from the shared pool, for code
+    that works with cursors: committed when the block ends, rolled back
+    if it raises, and always handed back to the pool.
+    """
+
+    engine = get_engine()
+
+    if engine is None:
+        raise RuntimeError(f"database engine not available: {_engine_error or 'check DB_* settings in .env'}")
+
+    conn = engine.raw_connection()
+
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def __getattr__(name):
+
+    if name == "engine":
+        return get_engine()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def safe_api_call(url, headers=None, params=None, timeout=15, use_cache=True):
+
+    # headers kept for older call sites; the pooled session already sends them.
+    # Fresh entries in the on-disk response cache are returned without a request.
+    return api_client.fetch_json(url, params=params, timeout=timeout, use_cache=use_cache)
+
+
+# =====================================================
+# INGEST / READ SPLIT
+# API work lives in the _build_* functions; get_* only run SQL,
+# served from materialized answer views (warehouse.read_answer).
+# `python -m pipeline refresh` runs the builds on REFRESH_JOBS
+# intervals, so dashboard clicks stay a database query.
+# =====================================================
+
+# Cold start: build on read when the scheduler has never run that job.
+# Set PIPELINE_INGEST_ON_READ=0 when a refresh worker is deployed.
+INGEST_ON_READ = os.getenv("PIPELINE_INGEST_ON_READ", "1").lower() not in ("0", "false", "no")
+
+
+def run_refresh_job(name, build):
+    """
+    Run one ingestion job and stamp it in ingest_state as refresh/<name>.
+    Builds return False when nothing could be fetched; those stay unstamped
+    so the next read or scheduler pass retries them.
+    """
+
+    import warehouse
+
+    if get_engine() is None:
+        print(f" Refresh {name}: database engine not available")
+        return
+
+    started = time.time()
+
+    if build() is False:
+        print(f" Refresh {name}: nothing ingested")
+        return
+
+    with get_engine().begin() as conn:
+        warehouse.create_schema(conn)
+        warehouse.record_ingest(conn, f"refresh/{name}", None)
+
+    print(f" Refreshed {name} in {time.time() - started:.1f}s")
+
+
+def _ensure_ingested(name, build):
+
+    import warehouse
+
+    if not INGEST_ON_READ or get_engine() is None:
+        return
+
+    with get_engine().connect() as conn:
+        ages = warehouse.ingest_ages(conn)
+
+    if f"refresh/{name}" not in ages:
+        run_refresh_job(name, build)
 
 ## RECENT MATCHES:
 
@@ -142,95 +290,17 @@ def recent_match_data():
 
 def live_data():
 
-    url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/live"
-
-    data = safe_api_call(url, headers)
+    # one-off fetch; the dashboard reads live_scores' poller instead
+    data = safe_api_call(live_scores.LIVE_URL, headers)
 
     if not data:
         print(" No live match data")
         return pd.DataFrame()
-    type_matches = data.get("typeMatches", [])
-
-    matches_list = []
-
-    for match_type in type_matches:
-
-        series_matches = match_type.get("seriesMatches", [])
-
-        for item in series_matches:
-
-            series_wrapper = item.get('seriesAdWrapper')
-
-            if not series_wrapper:
-                continue
-
-            matches = series_wrapper.get('matches', [])
-
-            for match in matches:
-
-                info = match.get('matchInfo', {})
-
-                match_dict = {
-                    "Match ID": info.get('matchId'),
-                    "Series Name": info.get('seriesName'),
-                    "Match": info.get('matchDesc'),
-                    "Format": info.get('matchFormat'),
-                    "Team 1": info.get('team1', {}).get('teamName'),
-                    "Team 2": info.get('team2', {}).get('teamName'),
-                    "Venue": info.get('venueInfo', {}).get('ground'),
-                    "City": info.get('venueInfo', {}).get('city'),
-                    "State": info.get('state'),
-                    "Status": info.get('status'),
-                    "Start Date": info.get('startDate'),
-                    "End Date": info.get('endDate')
-                }
-
-                score = match.get('matchScore')
-
-                if score:
-
-                    team1 = score.get('team1Score', {}).get('inngs1', {})
-                    team2 = score.get('team2Score', {}).get('inngs1', {})
-
-                    match_dict["Team1 Runs"] = int(team1.get('runs', 0))
-                    match_dict["Team1 Wickets"] = int(team1.get('wickets', 0))
-                    match_dict["Team1 Overs"] = float(team1.get('overs', 0))
-
-                    match_dict["Team2 Runs"] = int(team2.get('runs', 0))
-                    match_dict["Team2 Wickets"] = int(team2.get('wickets', 0))
-                    match_dict["Team2 Overs"] = float(team2.get('overs', 0))
-
-                else:
-
-                    match_dict["Team1 Runs"] = None
-                    match_dict["Team1 Wickets"] = None
-                    match_dict["Team1 Overs"] = None
-                    match_dict["Team2 Runs"] = None
-                    match_dict["Team2 Wickets"] = None
-                    match_dict["Team2 Overs"] = None
-
-                matches_list.append(match_dict)
-
-    matches_df = pd.DataFrame(matches_list)
 
-    if not matches_df.empty:
-
-        matches_df["Start Date"] = pd.to_datetime(
-            matches_df["Start Date"].astype("int64"),
-            unit="ms"
-        )
-
-        matches_df["End Date"] = pd.to_datetime(
-            matches_df["End Date"].astype("int64"),
-            unit="ms"
-        )
-
-        matches_df = matches_df.sort_values("Start Date", ascending=False)
-        matches_df.reset_index(drop=True, inplace=True)
-        matches_df.index = matches_df.index + 1
-        matches_df = matches_df.fillna("-")
-
-    return matches_df
+    return live_scores.live_frame([
+        live_scores.live_row(info, score)
+        for info, score in live_scores.live_matches(data)
+    ])
 
 
 #UPCOMING MATCHES:
@@ -301,197 +371,236 @@ def upcoming_data():
     return upcoming_df
 
 
+# =====================================================
+# DASHBOARD MATCH LISTS
+# recent / upcoming frames shared by every dashboard session.
+# Callers get the last-known frames straight from memory; once they
+# are older than MATCH_LISTS_TTL one background thread refetches
+# them concurrently. Only the very first call waits. The live list
+# comes from the live_scores poller, which is always current.
+# =====================================================
+MATCH_LISTS_TTL = int(os.getenv("MATCH_LISTS_TTL", "30"))
 
-## Question 1 Find all players who represent India. Display their full name, 
-# playing role, batting style, and bowling style. 
+MATCH_LISTS = {
+    "recent": recent_match_data,
+    "upcoming": upcoming_data
+}
 
-def get_q1_india_players():
+_match_lists = {"frames": None, "fetched_at": None, "refreshing": False}
+_match_lists_lock = threading.Condition()
 
-    team_id = 2
-    team_name = "India"
 
+def _refresh_match_lists():
 
-    url = f"https://cricbuzz-cricket.p.rapidapi.com/teams/v1/{team_id}/players"
-    data = safe_api_call(url, headers)
+    try:
+        with ThreadPoolExecutor(max_workers=len(MATCH_LISTS)) as pool:
+            futures = {name: pool.submit(fn) for name, fn in MATCH_LISTS.items()}
+            frames = {name: f.result() for name, f in futures.items()}
 
-    if not data:
-        return pd.DataFrame()
+        with _match_lists_lock:
+            _match_lists["frames"] = frames
+            _match_lists["fetched_at"] = time.time()
+
+    except Exception as e:
+        print(" Match list refresh failed:", e)
 
-    player_list = data.get("player", [])
-    final_players = []
-    current_role = "Unknown"
+    finally:
+        with _match_lists_lock:
+            _match_lists["refreshing"] = False
+            _match_lists_lock.notify_all()
 
-    for p in player_list:
-        if "id" not in p:
-            current_role = p.get("name")
-        else:
-            final_players.append({
-                "player_id": p.get("id"),
-                "name": p.get("name"),
-                "role": current_role,
-                "batting_style": p.get("battingStyle"),
-                "bowling_style": p.get("bowlingStyle"),
-                "country": team_name
-            })
 
-    df = pd.DataFrame(final_players).fillna("N/A")
+def match_lists(max_age=MATCH_LISTS_TTL):
+    """
+    {"live": df, "recent": df, "upcoming": df} for the Matches Dashboard.
+    Stale lists are returned as-is while a background refresh runs.
+    """
 
-    with engine.begin() as conn:
-        df.to_sql(
-            "q1_players",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+    # the first live poll overlaps the cold fetch below
+    live_scores.poller.start(wait=False)
 
-    print("Q1 table loaded ")
+    with _match_lists_lock:
 
-    return df
+        frames = _match_lists["frames"]
+        fetched_at = _match_lists["fetched_at"]
+        stale = fetched_at is None or time.time() - fetched_at >= max_age
 
+        start = stale and not _match_lists["refreshing"]
+        if start:
+            _match_lists["refreshing"] = True
 
-## Question 2 Show all cricket matches that were played in the last Few days. Include the match description, both team names, 
-## venue name with city, and the match date. Sort by most recent matches first.
+    if frames is None:
 
+        # cold process: nothing to show yet, so fetch (or wait for the fetch)
+        if start:
+            _refresh_match_lists()
 
-def get_q2_recent_matches():
+        with _match_lists_lock:
+            _match_lists_lock.wait_for(lambda: not _match_lists["refreshing"])
+            frames = _match_lists["frames"]
 
-    # ---------------- STEP 1: FETCH FROM API ----------------
-    url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
-    data = safe_api_call(url, headers)
+        frames = frames or {name: pd.DataFrame() for name in MATCH_LISTS}
 
-    records = []
+    elif start:
+        threading.Thread(target=_refresh_match_lists, name="match-lists", daemon=True).start()
 
-    for type_grp in data.get("typeMatches", []):
-        for series_grp in type_grp.get("seriesMatches", []):
-            wrapper = series_grp.get("seriesAdWrapper", {})
-            for match in wrapper.get("matches", []):
+    return {"live": live_scores.frame(), **frames}
 
-                mi = match.get("matchInfo", {})
 
-                records.append({
-                    "match_desc": mi.get("matchDesc"),
-                    "team1": mi.get("team1", {}).get("teamName"),
-                    "team2": mi.get("team2", {}).get("teamName"),
-                    "venue": mi.get("venueInfo", {}).get("ground"),
-                    "city": mi.get("venueInfo", {}).get("city"),
-                    "start_date_raw": mi.get("startDate")
-                })
+def match_lists_age():
+    """Seconds since the match lists were fetched (None before the first fetch)."""
 
-    df_raw = pd.DataFrame(records)
+    fetched_at = _match_lists["fetched_at"]
 
-    if df_raw.empty:
-        return pd.DataFrame()
+    return None if fetched_at is None else time.time() - fetched_at
 
-    # ---------------- STEP 2: CLEAN DATE ----------------
-    df_raw["start_date"] = pd.to_datetime(
-        pd.to_numeric(df_raw["start_date_raw"], errors="coerce"),
-        unit="ms"
-    )
 
-    df_raw = df_raw.drop(columns=["start_date_raw"])
-    df_raw = df_raw.fillna("N/A")
 
-    # ---------------- STEP 3: STORE  ----------------
-    with engine.begin() as conn:
-        df_raw.to_sql(
-            "q2_recent_matches",
+## Question 1 Find all players who represent India. Display their full name, 
+# playing role, batting style, and bowling style. 
+
+def _build_q1_india_players():
+
+    import warehouse
+
+    team_id = 2
+    team_name = "India"
+
+
+    squad = warehouse.roster(get_engine(), [team_id])
+
+    if squad.empty:
+        return False
+
+    df = squad[["player_id", "squad_order", "name", "role", "batting_style", "bowling_style"]].assign(
+        role=squad["role"].fillna("Unknown"),
+        country=team_name
+    ).fillna("N/A")
+
+    with get_engine().begin() as conn:
+        written = warehouse.upsert_frame(
             conn,
-            if_exists="replace",
-            index=False
+            df,
+            "q1_players",
+            "player_id",
+            source=f"teams/{team_id}/players"
+        )
+
+        # players dropped from the squad
+        conn.execute(
+            text("DELETE FROM q1_players WHERE player_id <> ALL(:ids)"),
+            {"ids": df["player_id"].tolist()}
         )
 
-    # ---------------- STEP 4: SQL QUERY ----------------
+    print(f"Q1 table upserted ({written} rows)")
+
+
+def get_q1_india_players():
+
+    import warehouse
+
     query = """
-    SELECT
-        match_desc,
-        team1 || ' vs ' || team2 AS teams,
-        venue || ', ' || city AS venue,
-        start_date
-    FROM q2_recent_matches
-    ORDER BY start_date DESC
+        SELECT player_id, name, role, batting_style, bowling_style, country
+        FROM q1_players
+        ORDER BY squad_order
     """
 
-    with engine.connect() as conn:
-        df_result = pd.read_sql(query, conn)
+    return warehouse.read_answer(get_engine(), "q1", query)
 
-    return df_result
 
-## Question 3 List the top 10 highest run scorers in ODI cricket. Show player name, 
-## total runs scored, batting average, and number of centuries. Display the highest run scorer first.
-def get_q3_top_odi_scorers():
+## Question 2 Show all cricket matches that were played in the last Few days. Include the match description, both team names, 
+## venue name with city, and the match date. Sort by most recent matches first.
 
-    # ---------------- STEP 1: GET TEAM PLAYERS (India) ----------------
-    team_url = "https://cricbuzz-cricket.p.rapidapi.com/teams/v1/2/players"
-    team_data = safe_api_call(team_url, headers)
 
-    player_ids = []
+def _build_recent_matches():
 
-    for p in team_data.get("player", []):
-        if "id" in p:
-            player_ids.append({
-                "id": p["id"],
-                "name": p["name"]
-            })
+    import warehouse
 
-    records = []
+    # Recent feed -> warehouse matches; only the delta since the last run is written.
+    # Returns the feed's match ids, or False when the API call failed.
+    url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
+    data = safe_api_call(url, headers)
 
-    # ---------------- STEP 2: FETCH ODI STATS ----------------
-    for player in player_ids:
+    if not data:
+        return False
 
-        url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{player['id']}/batting"
-        data = safe_api_call(url, headers)
+    infos = []
 
-        headers_list = data.get("headers", [])
+    for type_grp in data.get("typeMatches", []):
+        for series_grp in type_grp.get("seriesMatches", []):
+            wrapper = series_grp.get("seriesAdWrapper", {})
+            for match in wrapper.get("matches", []):
+                infos.append(match.get("matchInfo", {}))
 
-        if "ODI" not in headers_list:
-            continue
+    if not infos:
+        return False
 
-        idx = headers_list.index("ODI")
+    with get_engine().begin() as conn:
+        warehouse.create_schema(conn)
+        return warehouse.ingest_match_infos(conn, infos, "matches/recent")
 
-        runs = 0
-        avg = 0
-        cents = 0
 
-        for row in data.get("values", []):
-            values = row.get("values", [])
-            key = values[0] if values else ""
-            val = values[idx] if len(values) > idx else "0"
+def get_q2_recent_matches():
 
-            try:
-                num = float(str(val).replace("*", ""))
-            except:
-                num = 0
-
-            if key == "Runs":
-                runs = int(num)
-            elif key == "Average":
-                avg = float(num)
-            elif key == "100s":
-                cents = int(num)
-
-        if runs > 0:
-            records.append({
-                "player": player["name"],
-                "runs": runs,
-                "average": avg,
-                "centuries": cents
-            })
+    import warehouse
 
-    df_raw = pd.DataFrame(records)
+    # ---------------- STEP 1: SQL QUERY ----------------
+    query = """
+    SELECT
+        COALESCE(m.match_desc, 'N/A') AS match_desc,
+        COALESCE(m.team1, 'N/A') || ' vs ' || COALESCE(m.team2, 'N/A') AS teams,
+        COALESCE(m.venue, 'N/A') || ', ' || COALESCE(m.city, 'N/A') AS venue,
+        m.start_date
+    FROM matches m
+    JOIN feed_matches f
+        ON f.match_id = m.match_id
+        AND f.feed = 'matches/recent'
+    ORDER BY m.start_date DESC
+    """
+
+    return warehouse.read_answer(get_engine(), "q2", query)
+
+## Question 3 List the top 10 highest run scorers in ODI cricket. Show player name, 
+## total runs scored, batting average, and number of centuries. Display the highest run scorer first.
+def _build_q3_odi_batting():
+
+    import warehouse
+
+    # ---------------- STEP 1: GET TEAM PLAYERS (India) ----------------
+    squad = warehouse.roster(get_engine(), [2])
+
+    # ---------------- STEP 2: ODI STATS (career stats cache) ----------------
+    odi = warehouse.career_table(
+        get_engine(), squad["player_id"], "batting", ["Runs", "Average", "100s"], formats=["ODI"]
+    ).fillna(0)
+
+    df_raw = (
+        odi[odi["Runs"] > 0]
+        .merge(squad[["player_id", "name"]], on="player_id")
+        .rename(columns={"name": "player", "Runs": "runs", "Average": "average", "100s": "centuries"})
+        .astype({"runs": int, "centuries": int})
+        [["player_id", "player", "runs", "average", "centuries"]]
+    )
 
     if df_raw.empty:
-        return pd.DataFrame()
+        return False
 
-    # ---------------- STEP 3: STORE ----------------
-    with engine.begin() as conn:
-        df_raw.to_sql(
-            "q3_odi_batting",
+    # ---------------- STEP 3: UPSERT CHANGED PLAYERS ----------------
+    with get_engine().begin() as conn:
+        warehouse.upsert_frame(
             conn,
-            if_exists="replace",
-            index=False
+            df_raw,
+            "q3_odi_batting",
+            "player_id",
+            source="stats/player/batting"
         )
 
-    # ---------------- STEP 4: SQL QUERY ----------------
+
+def get_q3_top_odi_scorers():
+
+    import warehouse
+
+    # ---------------- STEP 1: SQL QUERY ----------------
     query = """
     SELECT
         player,
@@ -503,16 +612,15 @@ def get_q3_top_odi_scorers():
     LIMIT 10
     """
 
-    with engine.connect() as conn:
-        df_result = pd.read_sql(query, conn)
-
-    return df_result
+    return warehouse.read_answer(get_engine(), "q3", query)
 
 ## Question 4 Display all cricket venues that have a seating capacity of more than 
 ## 25,000 spectators. Show venue name, city, country, and capacity. 
 ## Order by largest capacity first (10 Venues enough).
 
-def get_q4_large_venues():
+def _build_q4_venues():
+
+    import warehouse
 
     # ---------------- STEP 1: FETCH RECENT MATCHES ----------------
     matches_url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
@@ -520,6 +628,9 @@ def get_q4_large_venues():
 
     venue_ids = set()
 
+    if not data:
+        return False
+
     for type_grp in data.get("typeMatches", []):
         for series_grp in type_grp.get("seriesMatches", []):
             wrapper = series_grp.get("seriesAdWrapper", {})
@@ -529,20 +640,29 @@ def get_q4_large_venues():
                 if v_id:
                     venue_ids.add(v_id)
 
-    # ---------------- STEP 2: FETCH VENUE DETAILS ----------------
+    # ---------------- STEP 2: FETCH NEW VENUE DETAILS ----------------
+    # venues already stored are not re-fetched
+    with get_engine().connect() as conn:
+        known_ids = warehouse.existing_keys(conn, "q4_venues", "venue_id")
+
     records = []
     base_url = "https://cricbuzz-cricket.p.rapidapi.com/venues/v1/{}"
+    new_ids = venue_ids - known_ids
 
-    for v_id in venue_ids:
+    for v_id in new_ids:
 
         try:
             v_url = base_url.format(v_id)
             v_info = safe_api_call(v_url, headers)
 
+            if not v_info:
+                continue
+
             capacity_raw = str(v_info.get("capacity", "0")).replace(",", "")
             capacity = int(capacity_raw) if capacity_raw.isdigit() else 0
 
             records.append({
+                "venue_id": int(v_id),
                 "venue_name": v_info.get("ground"),
                 "city": v_info.get("city"),
                 "country": v_info.get("country"),
@@ -554,19 +674,21 @@ def get_q4_large_venues():
 
     df_raw = pd.DataFrame(records).fillna("N/A")
 
+    # every venue already stored is a successful run; new venues that
+    # all failed to fetch are not
     if df_raw.empty:
-        return pd.DataFrame()
+        return False if new_ids else None
 
-    # ---------------- STEP 3: STORE ----------------
-    with engine.begin() as conn:
-        df_raw.to_sql(
-            "q4_venues",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+    # ---------------- STEP 3: UPSERT NEW VENUES ----------------
+    with get_engine().begin() as conn:
+        warehouse.upsert_frame(conn, df_raw, "q4_venues", "venue_id", source="venues")
 
-    # ---------------- STEP 4: SQL QUERY ----------------
+
+def get_q4_large_venues():
+
+    import warehouse
+
+    # ---------------- STEP 1: SQL QUERY ----------------
     query = """
     SELECT
         venue_name,
@@ -579,406 +701,140 @@ def get_q4_large_venues():
     LIMIT 10
     """
 
-    with engine.connect() as conn:
-        df_result = pd.read_sql(query, conn)
-
-    return df_result
+    return warehouse.read_answer(get_engine(), "q4", query)
 
 
 ## Question 5 Calculate how many matches each team has won. 
 # Show team name and total number of wins. Display teams with the most wins first.
 
-from sqlalchemy import text
 def get_q5_team_win_counts():
 
+    import warehouse
 
     # =========================
-    # STEP 1 — API FETCH
+    # STEP 1 —  SQL
     # =========================
-    url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
-    data = safe_api_call(url, headers)
-
-    if not data:
-        print(" API returned empty")
-        return pd.DataFrame()
-
-    matches = []
+    query = """
+        SELECT
+            INITCAP(SPLIT_PART(m.status, ' won ', 1)) AS team,
+            COUNT(*) AS wins
+        FROM matches m
+        JOIN feed_matches f
+            ON f.match_id = m.match_id
+            AND f.feed = 'matches/recent'
+        WHERE m.status ILIKE '% won %'
+        GROUP BY INITCAP(SPLIT_PART(m.status, ' won ', 1))
+        ORDER BY wins DESC
+    """
 
-    for mtype in data.get("typeMatches", []):
-        for series in mtype.get("seriesMatches", []):
-            wrapper = series.get("seriesAdWrapper", {})
-            for match in wrapper.get("matches", []):
-                info = match.get("matchInfo", {})
+    return warehouse.read_answer(get_engine(), "q5", query)
 
-                status_val = info.get("status")
+## Question 6 Count how many players belong to each playing role (like Batsman, Bowler, All-rounder, Wicket-keeper). 
+## Show the role and count of players for each role.
+# Question 6 Count how many players belong to each playing role
 
-                # Ensure status is string ONLY
-                if not isinstance(status_val, str):
-                    status_val = str(status_val)
+def _build_q6_players_role():
 
-                matches.append({
-                    "status": status_val
-                })
+    import warehouse
 
-    if not matches:
-        print("No matches extracted")
-        return pd.DataFrame()
+    # every international squad, through the shared roster cache
+    return warehouse.refresh_rosters(get_engine())
 
-    df_raw = pd.DataFrame(matches)
 
-    print("Raw DF Head:")
-    print(df_raw.head())
-    print("Dtypes:")
-    print(df_raw.dtypes)
+def get_q6_players_by_role():
 
-    # =========================
-    # STEP 2 — STORE 
-    # =========================
-    with engine.begin() as conn:
-        df_raw.to_sql(
-            "q5_matches",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+    import warehouse
 
-    
-
-    # =========================
-    # STEP 3 —  SQL
-    # =========================
-    query = """
-        SELECT
-            INITCAP(SPLIT_PART(status, ' won ', 1)) AS team,
-            COUNT(*) AS wins
-        FROM q5_matches
-        WHERE status ILIKE '% won %'
-        GROUP BY INITCAP(SPLIT_PART(status, ' won ', 1))
-        ORDER BY wins DESC
-    """
-
-    with engine.connect() as conn:
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-        print("SQL rows:", rows)
-
-   
-    df_result = pd.DataFrame(rows, columns=["team", "wins"])
-
-
-
-    return df_result
-
-## Question 6 Count how many players belong to each playing role (like Batsman, Bowler, All-rounder, Wicket-keeper). 
-## Show the role and count of players for each role.
-# Question 6 Count how many players belong to each playing role
-
-def get_q6_players_by_role():
-
-    
-
-    # =====================================
-    # STEP 1 — CHECK IF TABLE EXISTS
-    # =====================================
-
-    check_query = """
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables
-            WHERE table_name = 'q6_players_role'
-        );
-    """
-
-    with engine.connect() as conn:
-        table_exists = conn.execute(text(check_query)).scalar()
-
-    # =====================================
-    # STEP 2 — FETCH FROM API IF NOT EXISTS
-    # =====================================
-
-    if not table_exists:
-
-        
-
-        url = "https://cricbuzz-cricket.p.rapidapi.com/teams/v1/international"
-        data = safe_api_call(url, headers)
-
-        if not data:
-            return pd.DataFrame()
-
-        teams = data.get("list", [])
-        team_ids = [int(t["teamId"]) for t in teams if t.get("teamId")]
-
-        all_players = []
-
-        for tid in team_ids:
-
-            team_url = f"https://cricbuzz-cricket.p.rapidapi.com/teams/v1/{tid}/players"
-            team_data = safe_api_call(team_url, headers)
-
-            if not team_data:
-                continue
-
-            current_role = None
-
-            for p in team_data.get("player", []):
-
-                if "id" not in p:
-                    current_role = p.get("name")
-                else:
-                    all_players.append({
-                        "player_id": int(p.get("id")),
-                        "name": p.get("name"),
-                        "team_id": tid,
-                        "role": str(current_role).title()
-                    })
-
-        if not all_players:
-            return pd.DataFrame()
-
-        df_store = pd.DataFrame(all_players)
-
-        # Store cleanly using connection
-        with engine.begin() as conn:
-            df_store.to_sql(
-                "q6_players_role",
-                conn,
-                if_exists="replace",
-                index=False
-            )
-
-        
-
-    # =====================================
-    # STEP 3 — SQL AGGREGATION
-    # =====================================
+    # =====================================
+    # STEP 1 — SQL AGGREGATION
+    # =====================================
 
     query = """
         SELECT
-            role AS Role,
-            COUNT(*) AS Player_Count
-        FROM q6_players_role
-        GROUP BY role
+            INITCAP(COALESCE(p.role, 'None')) AS "Role",
+            COUNT(*) AS "Player_Count"
+        FROM roster_players p
+        JOIN roster_teams t
+            ON t.team_id = p.team_id
+        WHERE t.category = 'international'
+        GROUP BY 1
         ORDER BY COUNT(*) DESC
     """
 
-    with engine.connect() as conn:
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-
-    df_result = pd.DataFrame(rows, columns=["Role", "Player_Count"])
-
-   
-
-    return df_result
+    return warehouse.read_answer(get_engine(), "q6", query)
 
     
 ## Question 7 Find the highest individual batting score achieved in each cricket format
 ## (Test, ODI, T20I). Display the format and the highest score for that format
 
 
-from sqlalchemy import text
-
-def get_q7_highest_scores():
-
-
-    # =====================================
-    # STEP 1 — CHECK TABLE EXISTS
-    # =====================================
-    check_query = """
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables
-            WHERE table_name = 'q7_highest_scores'
-        );
-    """
-
-    with engine.connect() as conn:
-        table_exists = conn.execute(text(check_query)).scalar()
-
-    # =====================================
-    # STEP 2 — BUILD IF NOT EXISTS
-    # =====================================
-    if not table_exists:
-
-
-        url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
-        data = safe_api_call(url, headers)
-
-        if not data:
-            return pd.DataFrame()
-
-        match_rows = []
-
-        for type_match in data.get("typeMatches", []):
-            for series in type_match.get("seriesMatches", []):
-                wrapper = series.get("seriesAdWrapper")
-                if not wrapper:
-                    continue
-
-                for match in wrapper.get("matches", []):
-                    info = match.get("matchInfo", {})
-
-                    if info.get("state") != "Complete":
-                        continue
-
-                    fmt = info.get("matchFormat")
-
-                    if fmt == "T20":
-                        fmt = "T20I"
 
-                    match_rows.append({
-                        "match_id": info.get("matchId"),
-                        "format": fmt
-                    })
+def _build_q7_recent_scorecards():
 
-        df_matches = pd.DataFrame(match_rows).drop_duplicates()
+    import warehouse
 
-        if df_matches.empty:
-            return pd.DataFrame()
-
-        
-
-        batting_rows = []
-
-        for _, row in df_matches.iterrows():
+    # Completed matches from the recent feed -> warehouse scorecards
+    # (False when the feed or any scorecard could not be fetched)
+    url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
+    data = safe_api_call(url, headers)
 
-            match_id = row["match_id"]
-            fmt = row["format"]
+    if not data:
+        return False
 
-            score_url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{match_id}/scard"
-            score_data = safe_api_call(score_url, headers)
+    infos = []
 
-            if not score_data:
+    for type_match in data.get("typeMatches", []):
+        for series in type_match.get("seriesMatches", []):
+            wrapper = series.get("seriesAdWrapper")
+            if not wrapper:
                 continue
 
-            for innings in score_data.get("scorecard", []):
-                for b in innings.get("batsman", []):
-
-                    runs_val = b.get("runs", 0)
-                    try:
-                        runs_val = int(runs_val)
-                    except:
-                        runs_val = 0
-
-                    batting_rows.append({
-                        "match_id": match_id,
-                        "format": fmt,
-                        "player_name": b.get("name"),
-                        "runs": runs_val
-                    })
-
-            time.sleep(0.2)
-
-        df_batting = pd.DataFrame(batting_rows)
-
-        if df_batting.empty:
-            return pd.DataFrame()
+            for match in wrapper.get("matches", []):
+                info = match.get("matchInfo", {})
 
-        # Store raw batting
-        with engine.begin() as conn:
-            df_batting.to_sql(
-                "q7_match_batting",
-                conn,
-                if_exists="replace",
-                index=False
-            )
+                if info.get("state") == "Complete":
+                    infos.append(info)
 
-        # Aggregate highest scores
-        agg_query = """
-            SELECT
-                format,
-                MAX(runs) AS highest_score
-            FROM q7_match_batting
-            GROUP BY format
-        """
+    with get_engine().begin() as conn:
+        warehouse.create_schema(conn)
+        warehouse.load_match_infos(conn, infos)
 
-        with engine.connect() as conn:
-            result = conn.execute(text(agg_query))
-            rows = result.fetchall()
+    if warehouse.ensure_scorecards(get_engine(), [i.get("matchId") for i in infos]):
+        return False
 
-        df_result = pd.DataFrame(rows, columns=["format", "highest_score"])
 
-        # Store final analytics table
-        with engine.begin() as conn:
-            df_result.to_sql(
-                "q7_highest_scores",
-                conn,
-                if_exists="replace",
-                index=False
-            )
+def get_q7_highest_scores():
 
+    import warehouse
 
     # =====================================
-    # STEP 3 — FINAL OUTPUT
+    # STEP 1 — SQL OVER WAREHOUSE
     # =====================================
-
     final_query = """
         SELECT
-            format AS "Format",
-            highest_score AS "Highest Individual Score"
-        FROM q7_highest_scores
-        ORDER BY format
+            CASE WHEN m.match_format = 'T20' THEN 'T20I'
+                 ELSE m.match_format END AS "Format",
+            MAX(b.runs) AS "Highest Individual Score"
+        FROM batting_entries b
+        JOIN matches m
+            ON m.match_id = b.match_id
+        WHERE m.match_format IS NOT NULL
+        GROUP BY 1
+        ORDER BY 1
     """
 
-    with engine.connect() as conn:
-        result = conn.execute(text(final_query))
-        rows = result.fetchall()
-
-    df_final = pd.DataFrame(rows, columns=["Format", "Highest Individual Score"])
-
-   
-
-    return df_final
+    return warehouse.read_answer(get_engine(), "q7", final_query)
 
 ## Question 8 Show all cricket series that started in the year 2024. Include series name,
 ## host country, match type, start date, and total number of matches planned.
 
 
-def get_q8_series_2024():
-
-
-    # =====================================
-    # STEP 1 — CHECK CACHE
-    # =====================================
-
-    check_query = """
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables
-            WHERE table_name = 'q8_series_2024'
-        );
-    """
-
-    with engine.connect() as conn:
-        table_exists = conn.execute(text(check_query)).scalar()
-
-    if table_exists:
-        
-        final_query = """
-            SELECT
-                series_name AS "Series Name",
-                host_country AS "Host Country",
-                match_type AS "Match Type",
-                start_date AS "Start Date",
-                total_matches AS "Total Matches"
-            FROM q8_series_2024
-            ORDER BY start_date
-        """
-        with engine.connect() as conn:
-            result = conn.execute(text(final_query))
-            rows = result.fetchall()
+def _build_q8_series_2024():
 
-        return pd.DataFrame(
-            rows,
-            columns=[
-                "Series Name",
-                "Host Country",
-                "Match Type",
-                "Start Date",
-                "Total Matches"
-            ]
-        )
+    import warehouse
 
     # =====================================
-    # STEP 2 — FETCH ARCHIVES 
+    # STEP 1 — FETCH ARCHIVES 
     # =====================================
 
     archive_urls = [
@@ -1020,7 +876,7 @@ def get_q8_series_2024():
     df_series = pd.DataFrame(all_series)
 
     if df_series.empty:
-        return pd.DataFrame()
+        return False
 
    
     # df_series = df_series.head(25)
@@ -1029,7 +885,7 @@ def get_q8_series_2024():
     #print(f"Enriching {len(df_series)} series...")
 
     # =====================================
-    # STEP 3 — ENRICH 
+    # STEP 2 — ENRICH 
     # =====================================
 
     enriched_rows = []
@@ -1071,197 +927,108 @@ def get_q8_series_2024():
             "total_matches": total_matches
         })
 
-        time.sleep(0.05)
-
     df_final = pd.DataFrame(enriched_rows)
 
     if df_final.empty:
-        return pd.DataFrame()
+        return False
 
     # =====================================
-    # STEP 4 — STORE CACHE
+    # STEP 3 — STORE
     # =====================================
 
-    with engine.begin() as conn:
-        df_final.to_sql(
-            "q8_series_2024",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+    with get_engine().begin() as conn:
+        warehouse.replace_frame(conn, df_final, "q8_series_2024")
+
 
+def get_q8_series_2024():
+
+    import warehouse
 
+    # =====================================
+    # STEP 1 — SQL
+    # =====================================
+    final_query = """
+        SELECT
+            series_name AS "Series Name",
+            host_country AS "Host Country",
+            match_type AS "Match Type",
+            start_date AS "Start Date",
+            total_matches AS "Total Matches"
+        FROM q8_series_2024
+        ORDER BY start_date
+    """
 
-    return df_final.sort_values("start_date").reset_index(drop=True)
+    return warehouse.read_answer(get_engine(), "q8", final_query)
 
 ## Question 9 Find all-rounder players who have scored more than 
 ## 1000 runs AND taken more than 50 wickets in their career.
 # Display player name, total runs, total wickets, and the cricket format.
 
 
-from sqlalchemy import text
-
-def get_q9_allrounders():
-
-    import pandas as pd
-    import requests
-    import time
-
-    try:
-
-        # =============================
-        # STEP 1 — CHECK CACHE
-        # =============================
-
-        check_query = """
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables
-                WHERE table_name = 'q9_result'
-            );
-        """
-
-        with engine.connect() as conn:
-            table_exists = conn.execute(text(check_query)).scalar()
-
-        if table_exists:
-            return pd.read_sql("SELECT * FROM q9_result", engine)
-
-
-        # =============================
-        # STEP 2 — FETCH TEAMS
-        # =============================
-
-        teams_url = "https://cricbuzz-cricket.p.rapidapi.com/teams/v1/international"
-        resp = requests.get(teams_url, headers=headers, timeout=20)
-
-        if resp.status_code != 200:
-            return pd.DataFrame()
-
-        teams = []
-        for t in resp.json().get("list", []):
-            if t.get("teamId"):
-                teams.append((t["teamId"], t["teamName"]))
-
-
-        batting_records = []
-        bowling_records = []
-        processed_players = set()
-
-
-        # =============================
-        # STEP 3 — FETCH ALL ALLROUNDERS
-        # =============================
-
-        for team_id, team_name in teams:
-
-            team_url = f"https://cricbuzz-cricket.p.rapidapi.com/teams/v1/{team_id}/players"
-            team_resp = requests.get(team_url, headers=headers, timeout=20)
-
-            if team_resp.status_code != 200:
-                continue
-
-            players_section = team_resp.json().get("player", [])
-            current_role = None
-
-            for item in players_section:
-
-                if "id" not in item:
-                    header = item.get("name", "").upper()
-                    current_role = "ALLROUNDER" if "ALL" in header else None
-                    continue
-
-                if current_role != "ALLROUNDER":
-                    continue
-
-                player_id = item.get("id")
-                player_name = item.get("name")
 
-                if not player_id or player_id in processed_players:
-                    continue
-
-                processed_players.add(player_id)
-
-                # ---------- Batting ----------
-                bat_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{player_id}/batting"
-                bat_resp = requests.get(bat_url, headers=headers, timeout=20)
-
-                if bat_resp.status_code == 200:
+def _build_q9_allrounders():
 
-                    bat_data = bat_resp.json()
-                    formats = bat_data.get("headers", [])[1:]
+    import warehouse
 
-                    runs_row = None
-                    for r in bat_data.get("values", []):
-                        if r["values"][0] == "Runs":
-                            runs_row = r["values"][1:]
-                            break
+    # =============================
+    # STEP 1 — ALLROUNDERS OF EVERY INTERNATIONAL SQUAD
+    # (shared roster cache; role headers like "ALL ROUNDER")
+    # =============================
 
-                    if runs_row:
-                        for fmt, runs in zip(formats, runs_row):
-                            try:
-                                batting_records.append({
-                                    "player_id": player_id,
-                                    "player_name": player_name,
-                                    "team_name": team_name,
-                                    "format": fmt,
-                                    "total_runs": int(runs)
-                                })
-                            except:
-                                continue
+    squads = warehouse.roster(get_engine())
 
+    allrounders = squads[
+        squads["role"].fillna("").str.upper().str.contains("ALL")
+    ].drop_duplicates("player_id")
 
-                # ---------- Bowling ----------
-                bowl_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{player_id}/bowling"
-                bowl_resp = requests.get(bowl_url, headers=headers, timeout=20)
 
-                if bowl_resp.status_code == 200:
+    # =============================
+    # STEP 2 — THEIR STATS (career stats cache)
+    # =============================
 
-                    bowl_data = bowl_resp.json()
-                    formats = bowl_data.get("headers", [])[1:]
+    who = allrounders[["player_id", "name", "team_name"]].rename(columns={"name": "player_name"})
 
-                    wickets_row = None
-                    for r in bowl_data.get("values", []):
-                        if r["values"][0] == "Wickets":
-                            wickets_row = r["values"][1:]
-                            break
+    df_bat = (
+        warehouse.career_table(get_engine(), who["player_id"], "batting", ["Runs"])
+        .dropna()
+        .rename(columns={"Runs": "total_runs"})
+        .astype({"total_runs": int})
+    )
+    df_bowl = (
+        warehouse.career_table(get_engine(), who["player_id"], "bowling", ["Wickets"])
+        .dropna()
+        .rename(columns={"Wickets": "total_wickets"})
+        .astype({"total_wickets": int})
+    )
 
-                    if wickets_row:
-                        for fmt, wkts in zip(formats, wickets_row):
-                            try:
-                                bowling_records.append({
-                                    "player_id": player_id,
-                                    "player_name": player_name,
-                                    "team_name": team_name,
-                                    "format": fmt,
-                                    "total_wickets": int(wkts)
-                                })
-                            except:
-                                continue
+    columns = ["player_id", "player_name", "team_name", "format"]
+    df_bat = who.merge(df_bat, on="player_id")[columns + ["total_runs"]]
+    df_bowl = who.merge(df_bowl, on="player_id")[columns + ["total_wickets"]]
 
-                time.sleep(0.15)
+    if df_bat.empty or df_bowl.empty:
+        return False
 
 
-        df_bat = pd.DataFrame(batting_records)
-        df_bowl = pd.DataFrame(bowling_records)
+    # =============================
+    # STEP 3 — STORE RAW TABLES
+    # =============================
 
-        if df_bat.empty or df_bowl.empty:
-            return pd.DataFrame()
+    with get_engine().begin() as conn:
+        warehouse.replace_frame(conn, df_bat, "q9_batting_stats")
+        warehouse.replace_frame(conn, df_bowl, "q9_bowling_stats")
 
 
-        # =============================
-        # STEP 4 — STORE RAW TABLES
-        # =============================
+def get_q9_allrounders():
 
-        with engine.begin() as conn:
-            df_bat.to_sql("q9_batting_stats", conn, if_exists="replace", index=False)
-            df_bowl.to_sql("q9_bowling_stats", conn, if_exists="replace", index=False)
+    import warehouse
 
+    try:
 
         # =============================
-        # STEP 5 —  SQL ANALYTICS
+        # STEP 1 —  SQL ANALYTICS
         # =============================
 
-        query = text("""
+        query = """
             SELECT
                 b.player_name,
                 b.team_name,
@@ -1275,32 +1042,9 @@ def get_q9_allrounders():
             WHERE b.total_runs > 1000
             AND bw.total_wickets > 50
             ORDER BY b.player_name
-        """)
-
-        with engine.connect() as conn:
-            result = conn.execute(query)
-            rows = result.fetchall()
-
-        df_result = pd.DataFrame(
-            rows,
-            columns=[
-                "player_name",
-                "team_name",
-                "format",
-                "total_runs",
-                "total_wickets"
-            ]
-        )
-
-
-        # =============================
-        # STEP 6 — STORE FINAL RESULT
-        # =============================
-
-        with engine.begin() as conn:
-            df_result.to_sql("q9_result", conn, if_exists="replace", index=False)
+        """
 
-        return df_result
+        return warehouse.read_answer(get_engine(), "q9", query)
 
 
     except Exception as e:
@@ -1314,156 +1058,55 @@ def get_q9_allrounders():
 # Show match description, both team names,
 ## winning team, victory margin, victory type (runs/wickets),
 #  and venue name. Display the most recent matches first.
-from sqlalchemy import text
-import pandas as pd
-import re
 
 def get_q10_last_20_completed_matches():
 
-    # =====================================================
-    # STEP 1 — FETCH
-    # =====================================================
-    try:
-        query = """
-            SELECT *
-            FROM que_10_recent_matches
-            ORDER BY start_date DESC
-            LIMIT 20
-        """
-
-        with engine.connect() as conn:
-            result = conn.execute(text(query))
-            rows = result.fetchall()
-
-        if rows:
-            df_cached = pd.DataFrame(
-                rows,
-                columns=[
-                    "match_description",
-                    "team_1",
-                    "team_2",
-                    "winning_team",
-                    "victory_margin",
-                    "victory_type",
-                    "venue",
-                    "start_date"
-                ]
-            )
-
-            df_cached["start_date"] = pd.to_datetime(df_cached["start_date"])
-            df_cached["match_date"] = df_cached["start_date"].dt.strftime("%d %b %Y")
-
-            return df_cached.drop(columns=["start_date"])
-
-    except Exception:
-        
-        pass
-
-
-    # =====================================================
-    # STEP 2 — FETCH FROM API
-    # =====================================================
-    url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
-    data = safe_api_call(url, headers)
-
-    if not data:
-        return pd.DataFrame()
-
-    records = []
-
-    for type_grp in data.get("typeMatches", []):
-        for series in type_grp.get("seriesMatches", []):
-            wrapper = series.get("seriesAdWrapper", {})
-
-            for match in wrapper.get("matches", []):
-                mi = match.get("matchInfo", {})
-                status = mi.get("status", "")
-
-                if not isinstance(status, str):
-                    continue
-
-                if "won" not in status.lower():
-                    continue
-
-                team1 = mi.get("team1", {}).get("teamName")
-                team2 = mi.get("team2", {}).get("teamName")
-
-                venue_info = mi.get("venueInfo", {})
-                ground = venue_info.get("ground", "")
-                city = venue_info.get("city", "")
-                venue = f"{ground}, {city}".strip(", ")
-
-                winner = status.split(" won ")[0].strip()
-
-                run_win = re.search(r'won by (\d+) runs', status.lower())
-                wkt_win = re.search(r'won by (\d+) (wickets|wkts)', status.lower())
-
-                margin = None
-                victory_type = None
-
-                if run_win:
-                    margin = int(run_win.group(1))
-                    victory_type = "Runs"
-                elif wkt_win:
-                    margin = int(wkt_win.group(1))
-                    victory_type = "Wickets"
-
-                records.append({
-                    "match_description": mi.get("matchDesc"),
-                    "team_1": team1,
-                    "team_2": team2,
-                    "winning_team": winner,
-                    "victory_margin": margin,
-                    "victory_type": victory_type,
-                    "venue": venue,
-                    "start_date": pd.to_datetime(
-                        pd.to_numeric(mi.get("startDate"), errors="coerce"),
-                        unit="ms"
-                    )
-                })
-
-    if not records:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(records)
+    import warehouse
 
     # =====================================================
-    # STEP 3 — SORT + REMOVE NULL MATCHES
+    # STEP 1 — SQL OVER STORED MATCHES
     # =====================================================
-    df = df.sort_values("start_date", ascending=False)
-
-    df = df.dropna(subset=[
-        "match_description",
-        "team_1",
-        "team_2",
-        "winning_team",
-        "victory_margin",
-        "victory_type",
-        "venue"
-    ])
+    query = r"""
+        WITH completed AS (
+            SELECT
+                match_desc,
+                team1,
+                team2,
+                TRIM(SPLIT_PART(status, ' won ', 1)) AS winning_team,
+                SUBSTRING(LOWER(status) FROM 'won by (\d+) runs') AS run_margin,
+                SUBSTRING(LOWER(status) FROM 'won by (\d+) (wickets|wkts)') AS wkt_margin,
+                CONCAT_WS(', ', NULLIF(venue, ''), NULLIF(city, '')) AS venue,
+                start_date
+            FROM matches
+            WHERE LOWER(status) LIKE '%won%'
+        )
+        SELECT
+            match_desc AS match_description,
+            team1 AS team_1,
+            team2 AS team_2,
+            winning_team,
+            COALESCE(run_margin, wkt_margin)::INT AS victory_margin,
+            CASE WHEN run_margin IS NOT NULL THEN 'Runs' ELSE 'Wickets' END AS victory_type,
+            venue,
+            start_date
+        FROM completed
+        WHERE COALESCE(run_margin, wkt_margin) IS NOT NULL
+          AND match_desc IS NOT NULL
+          AND team1 IS NOT NULL
+          AND team2 IS NOT NULL
+        ORDER BY start_date DESC
+        LIMIT 20
+    """
 
-    df_top20 = df.head(20).reset_index(drop=True)
+    df_top20 = warehouse.read_answer(get_engine(), "q10", query)
 
     if df_top20.empty:
         return pd.DataFrame()
 
     # =====================================================
-    # STEP 4 — STORE CLEAN DATA INTO DATABASE
-    # =====================================================
-    try:
-        with engine.begin() as conn:
-            df_top20.to_sql(
-                "que_10_recent_matches",
-                conn,
-                if_exists="replace",
-                index=False
-            )
-    except Exception as e:
-        print("DB Write Error:", e)
-
-    # =====================================================
-    # STEP 5 — FORMAT OUTPUT
+    # STEP 2 — FORMAT OUTPUT
     # =====================================================
+    df_top20["start_date"] = pd.to_datetime(df_top20["start_date"])
     df_top20["match_date"] = df_top20["start_date"].dt.strftime("%d %b %Y")
 
     return df_top20.drop(columns=["start_date"])
@@ -1475,9 +1118,6 @@ def get_q10_last_20_completed_matches():
 #  For players who have played at least 2 different formats, 
 ## show their total runs in Test cricket, ODI cricket, and T20I cricket, along with their overall batting average across all formats.
 
-from sqlalchemy import text
-import pandas as pd
-import time
 
 
 # ===============================
@@ -1485,132 +1125,46 @@ import time
 # ===============================
 def _build_que_11_raw_table():
 
+    import warehouse
+
     MAX_TEAMS = 6
     PLAYERS_PER_TEAM = 4
 
-    teams_url = "https://cricbuzz-cricket.p.rapidapi.com/teams/v1/international"
-    teams_data = safe_api_call(teams_url, headers)
-
-    if not teams_data:
-        return
-
-    teams = [
-        (t["teamId"], t["teamName"])
-        for t in teams_data.get("list", [])
-        if t.get("teamId")
-    ][:MAX_TEAMS]
-
-    records = []
-
-    for team_id, team_name in teams:
+    # first squads of the international list, first players of each
+    squads = warehouse.roster(get_engine())
+    teams = squads["team_id"].drop_duplicates().head(MAX_TEAMS)
+    picked = squads[squads["team_id"].isin(teams)].groupby("team_id", sort=False).head(PLAYERS_PER_TEAM)
 
-        players_url = f"https://cricbuzz-cricket.p.rapidapi.com/teams/v1/{team_id}/players"
-        players_data = safe_api_call(players_url, headers)
+    stats = warehouse.career_table(get_engine(), picked["player_id"], "batting", ["Runs", "Average"])
 
-        if not players_data:
-            continue
+    if stats.empty:
+        return False
 
-        count = 0
+    # every fetched player gets a Test / ODI / T20 row (0 runs where absent)
+    fetched = picked[picked["player_id"].isin(stats["player_id"])]
 
-        for player in players_data.get("player", []):
-            if count >= PLAYERS_PER_TEAM:
-                break
+    df_raw = (
+        fetched[["player_id", "name", "team_name"]]
+        .rename(columns={"name": "player_name"})
+        .merge(pd.DataFrame({"format": ["Test", "ODI", "T20"]}), how="cross")
+        .merge(stats, on=["player_id", "format"], how="left")
+        .rename(columns={"Runs": "runs", "Average": "average"})
+    )
+    df_raw["runs"] = df_raw["runs"].fillna(0).astype(int)
 
-            if "id" not in player:
-                continue
+    with get_engine().begin() as conn:
+        warehouse.replace_frame(conn, df_raw, "que_11_player_batting_raw")
 
-            count += 1
 
-            player_id = player["id"]
-            player_name = player["name"]
-
-            bat_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{player_id}/batting"
-            pdata = safe_api_call(bat_url, headers)
-
-            if not pdata:
-                continue
-
-            headers_list = pdata.get("headers", [])
-            if not headers_list:
-                continue
-
-            formats = headers_list[1:]
-
-            runs_dict = {}
-            avg_dict = {}
-
-            for row_data in pdata.get("values", []):
-                values = row_data.get("values", [])
-                if not values:
-                    continue
-
-                label = values[0]
-                stats_vals = values[1:]
-
-                if label == "Runs":
-                    runs_dict = dict(zip(formats, stats_vals))
-
-                if label == "Average":
-                    avg_dict = dict(zip(formats, stats_vals))
-
-            for fmt in ["Test", "ODI", "T20"]:
-
-                try:
-                    runs = int(runs_dict.get(fmt, 0))
-                except:
-                    runs = 0
-
-                try:
-                    avg = float(avg_dict.get(fmt))
-                except:
-                    avg = None
-
-                records.append({
-                    "player_id": player_id,
-                    "player_name": player_name,
-                    "team_name": team_name,
-                    "format": fmt,
-                    "runs": runs,
-                    "average": avg
-                })
-
-            time.sleep(0.05)
-
-    df_raw = pd.DataFrame(records)
-
-    if df_raw.empty:
-        return
-
-    with engine.begin() as conn:
-        df_raw.to_sql(
-            "que_11_player_batting_raw",
-            conn,
-            if_exists="replace",
-            index=False
-        )
-
-
-# =====================================================
-# MAIN PIPELINE FUNCTION (SQL ANALYTICS)
-# =====================================================
-def get_q11_player_format_comparison():
-
-    # ----------------------------------------------
-    # Step 1 — Ensure Raw Table Exists
-    # ----------------------------------------------
-    try:
-        check_query = "SELECT 1 FROM que_11_player_batting_raw LIMIT 1"
-
-        with engine.connect() as conn:
-            conn.execute(text(check_query))
-
-    except Exception:
-        
-        _build_que_11_raw_table()
+# =====================================================
+# MAIN PIPELINE FUNCTION (SQL ANALYTICS)
+# =====================================================
+def get_q11_player_format_comparison():
 
+    import warehouse
 
     # ----------------------------------------------
-    # Step 2 — SQL Analytics 
+    # Step 1 — SQL Analytics 
     # ----------------------------------------------
     query = """
         SELECT
@@ -1626,20 +1180,7 @@ def get_q11_player_format_comparison():
         ORDER BY overall_avg DESC;
     """
 
-    with engine.connect() as conn:
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-
-    df = pd.DataFrame(rows, columns=[
-        "player_name",
-        "team_name",
-        "test_runs",
-        "odi_runs",
-        "t20_runs",
-        "overall_avg"
-    ])
-
-    return df
+    return warehouse.read_answer(get_engine(), "q11", query)
 
 ## Question 12 Analyze each international team's performance when playing at home versus playing away. 
 ## Determine whether each team played at home or away based on whether the venue country matches the team's country. 
@@ -1653,8 +1194,6 @@ def get_q11_player_format_comparison():
 # Dataset: ICC Cricket World Cup 2023 (Series ID: 6732)
 # =====================================================
 
-from sqlalchemy import text
-import pandas as pd
 
 
 # ============================
@@ -1662,11 +1201,13 @@ import pandas as pd
 # ============================
 def _build_que_12_information():
 
+    import warehouse
+
     url = "https://cricbuzz-cricket.p.rapidapi.com/series/v1/6732"
     data = safe_api_call(url, headers)
 
     if not data:
-        return
+        return False
 
     records = []
 
@@ -1703,15 +1244,10 @@ def _build_que_12_information():
     df_raw = pd.DataFrame(records)
 
     if df_raw.empty:
-        return
+        return False
 
-    with engine.begin() as conn:
-        df_raw.to_sql(
-            "que_12_information",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+    with get_engine().begin() as conn:
+        warehouse.replace_frame(conn, df_raw, "que_12_information")
 
 
 # =====================================================
@@ -1719,17 +1255,10 @@ def _build_que_12_information():
 # =====================================================
 def get_que12_home_away_analysis():
 
-    # ----------------------------------------------
-    # Step 1 — Ensure raw table exists
-    # ----------------------------------------------
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1 FROM que_12_information LIMIT 1"))
-    except Exception:
-        _build_que_12_information()
+    import warehouse
 
     # ----------------------------------------------
-    # Step 2 — SQL Analytics
+    # Step 1 — SQL Analytics
     # ----------------------------------------------
     query = """
         WITH expanded AS (
@@ -1778,13 +1307,7 @@ def get_que12_home_away_analysis():
         ORDER BY team
     """
 
-    with engine.connect() as conn:
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-
-    df = pd.DataFrame(rows, columns=["Team", "Home Wins", "Away Wins"])
-
-    return df
+    return warehouse.read_answer(get_engine(), "q12", query)
 
 
 ## Question 13 Identify batting partnerships where two consecutive batsmen (batting positions next to each other) scored a 
@@ -1796,129 +1319,60 @@ def get_que12_home_away_analysis():
 # Question 13 — Century Partnerships
 # ============================================================
 
-def get_que13_century_partnerships():
-
-    SERIES_ID = 3641
-
-    # -------------------------
-    # STEP 1 — GET MATCH IDS
-    # -------------------------
-
-    def get_match_ids(series_id):
-
-        url = f"https://cricbuzz-cricket.p.rapidapi.com/series/v1/{series_id}"
-
-        resp = requests.get(url, headers=headers)
-
-        if resp.status_code != 200:
-            print(" Series fetch failed")
-            return []
-
-        data = resp.json()
-
-        match_ids = []
-
-        for block in data.get("matchDetails", []):
-
-            match_map = block.get("matchDetailsMap")
-
-            if not match_map:
-                continue
-
-            for match in match_map.get("match", []):
-
-                info = match.get("matchInfo", {})
-
-                mid = info.get("matchId")
-
-                if mid:
-                    match_ids.append(mid)
-
-        match_ids = list(set(match_ids))
-
-        print(f" Found {len(match_ids)} matches")
-
-        return match_ids
-
-
-    # -------------------------
-    # STEP 2 — LOAD API → DB
-    # -------------------------
-
-    match_ids = get_match_ids(SERIES_ID)
-
-    with engine.begin() as conn:
+def _build_series_scorecards(series_id):
 
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS q13_partnerships (
-                match_id BIGINT,
-                innings_id INT,
-                player1 TEXT,
-                player2 TEXT,
-                runs INT
-            );
-        """))
+    import warehouse
 
-        conn.execute(text("TRUNCATE TABLE q13_partnerships"))
+    # Series match list + every scorecard into the warehouse (Q13, Q14);
+    # False when the list or any scorecard could not be fetched
+    infos = warehouse.series_match_infos(series_id)
 
-        insert_sql = text("""
-            INSERT INTO q13_partnerships
-            (match_id, innings_id, player1, player2, runs)
-            VALUES
-            (:match_id, :innings_id, :player1, :player2, :runs)
-        """)
+    if not infos:
+        print(" Series fetch failed")
+        return False
 
-        for mid in match_ids:
+    print(f" Found {len(infos)} matches")
 
-            url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{mid}/scard"
+    with get_engine().begin() as conn:
+        warehouse.create_schema(conn)
+        warehouse.load_match_infos(conn, infos)
 
-            resp = requests.get(url, headers=headers)
+    if warehouse.ensure_scorecards(get_engine(), [i.get("matchId") for i in infos]):
+        return False
 
-            if resp.status_code != 200:
-                print(f" Failed match {mid}")
-                continue
-
-            data = resp.json()
+    return infos
 
-            for innings in data.get("scorecard", []):
 
-                iid = innings.get("inningsid")
-
-                partnerships = (
-                    innings.get("partnership", {})
-                    .get("partnership", [])
-                )
-
-                for p in partnerships:
+def get_que13_century_partnerships():
 
-                    conn.execute(insert_sql,[ {
-                        "match_id": mid,
-                        "innings_id": iid,
-                        "player1": p.get("bat1name"),
-                        "player2": p.get("bat2name"),
-                        "runs": p.get("totalruns", 0)
-                    }])
+    import warehouse
 
+    SERIES_ID = 3641
 
     # -------------------------
-    # STEP 3 — ANALYSIS
+    # STEP 1 — ANALYSIS
     # -------------------------
 
-    query = """
+    query = f"""
         SELECT
-            match_id AS "Match ID",
-            player1 AS "Player 1",
-            player2 AS "Player 2",
-            runs AS "Combined Runs",
-            innings_id AS "Innings"
-        FROM q13_partnerships
-        WHERE runs >= 100
-        ORDER BY match_id, innings_id
+            p.match_id AS "Match ID",
+            COALESCE(p1.full_name, p.bat1_name) AS "Player 1",
+            COALESCE(p2.full_name, p.bat2_name) AS "Player 2",
+            p.total_runs AS "Combined Runs",
+            p.innings_id AS "Innings"
+        FROM partnerships p
+        JOIN matches m
+            ON m.match_id = p.match_id
+        LEFT JOIN players p1
+            ON p1.player_id = p.bat1_id
+        LEFT JOIN players p2
+            ON p2.player_id = p.bat2_id
+        WHERE m.series_id = {SERIES_ID}
+          AND p.total_runs >= 100
+        ORDER BY p.match_id, p.innings_id
     """
 
-    df = pd.read_sql(query, engine)
-
-    return df
+    return warehouse.read_answer(get_engine(), f"q13_{SERIES_ID}", query)
 
 ## Question 14 Examine bowling performance at different venues. For bowlers who have played at least 3 matches at the same venue, 
 ## calculate their average economy rate, total wickets taken, and number of matches played at each venue. 
@@ -1930,154 +1384,45 @@ def get_que13_century_partnerships():
 
 def get_que14_bowler_venue_performance(series_id=3641):
 
-    import requests
-    import time
-    import pandas as pd
-    from sqlalchemy import text
-
-    # ---------------------------
-    # SERIES API — MATCH IDS + VENUES
-    # ---------------------------
-
-    series_url = f"https://cricbuzz-cricket.p.rapidapi.com/series/v1/{series_id}"
-
-    resp = requests.get(series_url, headers=headers)
-
-    if resp.status_code != 200:
-        return pd.DataFrame(), f"Series {series_id}"
-
-    data = resp.json()
-
-    match_ids = []
-    venue_map = {}
-    series_name = f"Series {series_id}"
-
-    for block in data.get("matchDetails", []):
-
-        match_map = block.get("matchDetailsMap")
-
-        if not match_map:
-            continue
-
-        for match in match_map.get("match", []):
-
-            info = match.get("matchInfo", {})
-
-            mid = info.get("matchId")
-
-            venue_info = info.get("venueInfo", {})
-
-            ground = venue_info.get("ground", "")
-            city = venue_info.get("city", "")
+    import warehouse
 
-            venue = f"{ground}, {city}".strip(", ")
-
-            if mid:
-                match_ids.append(mid)
-                venue_map[mid] = venue if venue else "Unknown"
-
-            if info.get("seriesName"):
-                series_name = info.get("seriesName")
-
-    match_ids = list(set(match_ids))
-
-    # ---------------------------
-    # CREATE TABLE
-    # ---------------------------
-
-    with engine.begin() as conn:
-
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS q14_bowling (
-                match_id BIGINT,
-                venue TEXT,
-                bowler TEXT,
-                overs FLOAT,
-                runs INT,
-                wickets INT
-            );
-        """))
-
-        conn.execute(text("TRUNCATE TABLE q14_bowling"))
-
-        insert_sql = text("""
-            INSERT INTO q14_bowling
-            (match_id, venue, bowler, overs, runs, wickets)
-            VALUES
-            (:match_id, :venue, :bowler, :overs, :runs, :wickets)
-        """)
-
-        # ---------------------------
-        # SCORECARD API
-        # ---------------------------
-
-        for mid in match_ids:
-
-            url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{mid}/scard"
-
-            resp = requests.get(url, headers=headers, timeout=20)
-
-            if resp.status_code != 200:
-                continue
-
-            data = resp.json()
-
-            venue = venue_map.get(mid, "Unknown")
-
-            for innings in data.get("scorecard", []):
-
-                for bw in innings.get("bowler", []):
-
-                    overs = float(bw.get("overs", 0))
-
-                   
-                    if overs < 4:
-                        continue
-
-                    conn.execute(insert_sql,[{
-                        "match_id": mid,
-                        "venue": venue,
-                        "bowler": bw.get("name"),
-                        "overs": overs,
-                        "runs": int(bw.get("runs", 0)),
-                        "wickets": int(bw.get("wickets", 0))
-                    }])
-
-            time.sleep(1)
+    with get_engine().connect() as conn:
+        series_name = conn.execute(
+            text("""
+                SELECT series_name FROM matches
+                WHERE series_id = :series_id AND series_name IS NOT NULL
+                LIMIT 1
+            """),
+            {"series_id": series_id}
+        ).scalar() or f"Series {series_id}"
 
     # ---------------------------
     # ANALYSIS
     # ---------------------------
 
-    query = """
+    query = f"""
         SELECT
-            bowler,
-            venue,
-            COUNT(*) AS matches,
-            SUM(wickets) AS total_wickets,
-            SUM(runs) AS runs,
-            SUM(overs) AS overs
-        FROM q14_bowling
-        GROUP BY bowler, venue
+            COALESCE(MIN(p.full_name), MIN(b.player_name)) AS "Bowler",
+            COALESCE(
+                NULLIF(CONCAT_WS(', ', NULLIF(m.venue, ''), NULLIF(m.city, '')), ''),
+                'Unknown'
+            ) AS "Venue",
+            COUNT(*) AS "Matches",
+            SUM(b.wickets) AS "Total Wickets",
+            ROUND(SUM(b.runs) / NULLIF(SUM(b.overs), 0), 2) AS "Economy"
+        FROM bowling_entries b
+        JOIN matches m
+            ON m.match_id = b.match_id
+        LEFT JOIN players p
+            ON p.player_id = b.player_id
+        WHERE m.series_id = {int(series_id)}
+          AND b.overs >= 4
+        GROUP BY b.player_id, 2
         HAVING COUNT(*) >= 3
-        ORDER BY total_wickets DESC
+        ORDER BY "Total Wickets" DESC
     """
 
-    df = pd.read_sql(query, engine)
-
-    if df.empty:
-        return df, series_name
-
-    df["Economy"] = (df["runs"] / df["overs"]).round(2)
-
-    df = df.rename(columns={
-        "bowler": "Bowler",
-        "venue": "Venue",
-        "matches": "Matches",
-        "total_wickets": "Total Wickets"
-    })
-
-    df = df[["Bowler", "Venue", "Matches", "Total Wickets", "Economy"]]
+    df = warehouse.read_answer(get_engine(), f"q14_{int(series_id)}", query)
 
     return df, series_name
 
@@ -2086,42 +1431,26 @@ def get_que14_bowler_venue_performance(series_id=3641):
 ## A close match is defined as one decided by 10 runs or fewer OR 2 wickets or fewer.
 
 
-def get_que15_close_matches_performance():
-   
-    import re
-    from sqlalchemy import text
-
-    # ---------------- RESET TABLES ---------------- #
-
-    with engine.begin() as conn:
-        conn.execute(text("DROP TABLE IF EXISTS batting;"))
-        conn.execute(text("DROP TABLE IF EXISTS matches;"))
-
-    with engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE matches (
-                match_id BIGINT PRIMARY KEY,
-                status TEXT
-            );
-        """))
-
-        conn.execute(text("""
-            CREATE TABLE batting (
-                match_id BIGINT,
-                player_name TEXT,
-                team_name TEXT,
-                runs INT,
-                win_flag INT
-            );
-        """))
+# decided by 10 runs or fewer OR 2 wickets or fewer
+_CLOSE_MATCH_SQL = r"""
+    (SUBSTRING(LOWER(m.status) FROM 'won by (\d+) runs'))::int <= 10
+    OR (SUBSTRING(LOWER(m.status) FROM 'won by (\d+) (wicket|wkts)'))::int <= 2
+"""
+
+
+def _build_q15_close_match_scorecards():
+
+    import warehouse
 
     # ---------------- FETCH RECENT MATCHES ---------------- #
 
     url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
-    resp = requests.get(url, headers=headers)
-    data = resp.json()
+    data = safe_api_call(url, headers)
 
-    match_records = []
+    if not data:
+        return False
+
+    infos = []
 
     for type_block in data.get("typeMatches", []):
         for series in type_block.get("seriesMatches", []):
@@ -2134,104 +1463,69 @@ def get_que15_close_matches_performance():
 
                 info = match.get("matchInfo", {})
 
-                match_id = info.get("matchId")
-                status = info.get("status")
-
-                if match_id and status:
-                    match_records.append({
-                        "match_id": match_id,
-                        "status": status
-                    })
-
-    matches_df = pd.DataFrame(match_records)
-
-    if not matches_df.empty:
-        matches_df.drop_duplicates(inplace=True)
-        matches_df.to_sql("matches", engine, if_exists="append", index=False)
+                if info.get("matchId") and info.get("status"):
+                    infos.append(info)
 
     # ---------------- IDENTIFY CLOSE MATCHES ---------------- #
 
-    matches_df = pd.read_sql("SELECT * FROM matches", engine)
-
-    close_ids = []
-
-    for _, row in matches_df.iterrows():
-
-        status = str(row["status"]).lower()
-
-        r = re.search(r'won by (\d+) runs', status)
-        w = re.search(r'won by (\d+) (?:wicket|wkts)', status)
+    with get_engine().begin() as conn:
+        warehouse.create_schema(conn)
+        warehouse.load_match_infos(conn, infos)
 
-        if (r and int(r.group(1)) <= 10) or (w and int(w.group(1)) <= 2):
-            close_ids.append(row["match_id"])
+        close_ids = [
+            r[0] for r in conn.execute(text(f"""
+                SELECT m.match_id
+                FROM matches m
+                WHERE {_CLOSE_MATCH_SQL}
+            """))
+        ]
 
     # ---------------- FETCH SCORECARDS ---------------- #
 
-    batting_rows = []
-
-    for mid in close_ids:
-
-        url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{mid}/scard"
-        resp = requests.get(url, headers=headers)
-
-        if resp.status_code != 200:
-            continue
-
-        score = resp.json()
-
-        match_status = score.get("status", "")
+    if warehouse.ensure_scorecards(get_engine(), close_ids):
+        return False
 
-        winner = None
-        if "won" in match_status.lower():
-            winner = match_status.split(" won")[0].strip().lower()
 
-        for innings in score.get("scorecard", []):
-
-            bat_team = str(innings.get("batteamname", "")).lower()
-            win_flag = 1 if winner and winner in bat_team else 0
-
-            batsmen = innings.get("batsman", [])
-
-            for b in batsmen:
-
-                runs = b.get("runs")
-
-                try:
-                    runs = int(runs)
-                except:
-                    runs = 0
-
-                batting_rows.append({
-                    "match_id": mid,
-                    "player_name": b.get("name"),
-                    "team_name": innings.get("batteamname"),
-                    "runs": runs,
-                    "win_flag": win_flag
-                })
-
-    batting_df = pd.DataFrame(batting_rows)
+def get_que15_close_matches_performance():
 
-    if not batting_df.empty:
-        batting_df.to_sql("batting", engine, if_exists="append", index=False)
+    import warehouse
 
     # ---------------- FINAL QUERY ---------------- #
 
-    query = """
+    query = f"""
+    WITH close_matches AS (
+        SELECT
+            m.match_id,
+            LOWER(m.winner) AS winner
+        FROM matches m
+        WHERE {_CLOSE_MATCH_SQL}
+    )
     SELECT
-        player_name AS player,
-        team_name AS team,
-        AVG(runs) AS avg_runs,
-        COUNT(DISTINCT match_id) AS close_matches_played,
-        SUM(win_flag) AS wins_when_batted
-    FROM batting
-    GROUP BY player_name, team_name
+        COALESCE(MIN(p.full_name), MIN(b.player_name)) AS player,
+        i.bat_team AS team,
+        AVG(b.runs) AS avg_runs,
+        COUNT(DISTINCT b.match_id) AS close_matches_played,
+        SUM(
+            CASE
+                WHEN c.winner IS NOT NULL
+                 AND POSITION(c.winner IN LOWER(i.bat_team)) > 0
+                THEN 1 ELSE 0
+            END
+        ) AS wins_when_batted
+    FROM batting_entries b
+    JOIN innings i
+        ON i.match_id = b.match_id
+        AND i.innings_id = b.innings_id
+    JOIN close_matches c
+        ON c.match_id = b.match_id
+    LEFT JOIN players p
+        ON p.player_id = b.player_id
+    GROUP BY b.player_id, i.bat_team
     ORDER BY avg_runs DESC
     LIMIT 10;
     """
 
-    result = pd.read_sql(query, engine)
-
-    return result
+    return warehouse.read_answer(get_engine(), "q15", query)
 
 
 
@@ -2240,259 +1534,135 @@ def get_que15_close_matches_performance():
 ## Only include players who played at least 5 matches in that year.
 
 
-def get_que16_player_yearly_stats():
-
-    import pandas as pd
-    import requests
-    import time
-    from sqlalchemy import text
-
-    # =========================
-    # CREATE TABLE
-    # =========================
-    create_table = """
-    CREATE TABLE IF NOT EXISTS q16_batting (
-        player_id BIGINT,
-        player_name TEXT,
-        match_id BIGINT,
-        match_year INT,
-        runs INT,
-        balls INT
-    );
-    """
-
-    with engine.begin() as conn:
-        conn.execute(text(create_table))
-
-    # =========================
-    # CHECK EXISTING DATA
-    # =========================
-    count = pd.read_sql(
-        "SELECT COUNT(*) FROM q16_batting",
-        engine
-    ).iloc[0, 0]
-
-    if count == 0:
+def _india_player_ids(limit=None):
 
-        print("Fetching Q16 raw data...")
+    import warehouse
 
-        # GET 10 INDIA PLAYERS
-        team_url = "https://cricbuzz-cricket.p.rapidapi.com/teams/v1/2/players"
-        team_res = requests.get(team_url, headers=headers).json()
+    players = warehouse.roster(get_engine(), [2])["player_id"].tolist()
 
-        players = []
-        for p in team_res.get("player", []):
-            if "id" in p:
-                players.append(int(p["id"]))
+    return players[:limit] if limit else players
 
-        selected_players = set(players[:10])
 
-        rows = []
+def _build_q16_india_scorecards():
 
-        for year in range(2020, 2025):
+    import async_ingest
+    import warehouse
 
-            archive_url = "https://cricbuzz-cricket.p.rapidapi.com/series/v1/archives/international"
-            archive_res = requests.get(
-                archive_url,
-                headers=headers,
-                params={"year": str(year)}
-            ).json()
+    # ARCHIVES -> SERIES -> MATCH INFOS -> HSCARDS (one asyncio task graph;
+    # only scorecards not yet loaded are fetched)
+    asyncio.run(async_ingest.load_series_years(get_engine(), range(2020, 2025)))
 
-            india_series_ids = []
+    # 10 INDIA PLAYERS to report on
+    players = pd.DataFrame({"player_id": _india_player_ids(limit=10)})
 
-            for block in archive_res.get("seriesMapProto", []):
-                for series in block.get("series", []):
-                    if "India" in series.get("name", ""):
-                        india_series_ids.append(series.get("id"))
+    if not players.empty:
+        with get_engine().begin() as conn:
+            warehouse.replace_frame(conn, players, "q16_players")
 
-            for sid in india_series_ids:
 
-                series_url = f"https://cricbuzz-cricket.p.rapidapi.com/series/v1/{sid}"
-                s_res = requests.get(series_url, headers=headers).json()
-
-                for group in s_res.get("matchDetails", []):
-                    match_map = group.get("matchDetailsMap", {})
-
-                    for match in match_map.get("match", []):
-                        mid = match.get("matchInfo", {}).get("matchId")
-
-                        if not mid:
-                            continue
-
-                        score_url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{mid}/hscard"
-                        score_res = requests.get(score_url, headers=headers).json()
-
-                        for innings in score_res.get("scorecard", []):
-
-                            if innings.get("batteamname", "").lower() != "india":
-                                continue
-
-                            for bat in innings.get("batsman", []):
-
-                                pid = bat.get("id")
-
-                                if pid in selected_players:
-
-                                    runs = bat.get("runs")
-                                    balls = bat.get("balls")
-                                    name = bat.get("name")
-
-                                    if runs is None or balls is None:
-                                        continue
-
-                                    rows.append({
-                                        "player_id": pid,
-                                        "player_name": name,
-                                        "match_id": mid,
-                                        "match_year": year,
-                                        "runs": int(runs),
-                                        "balls": int(balls)
-                                    })
-
-                        time.sleep(0.15)
-
-        df_insert = pd.DataFrame(rows)
+def get_que16_player_yearly_stats():
 
-        if not df_insert.empty:
-            df_insert.to_sql(
-                "q16_batting",
-                engine,
-                if_exists="append",
-                index=False
-            )
+    import warehouse
 
     # =========================
     # SQL AGGREGATION
     # =========================
     query = """
     SELECT
-        player_id,
-        MIN(player_name) AS player_name,
-        match_year,
-        COUNT(DISTINCT match_id) AS matches,
-        ROUND(AVG(runs)::numeric, 2) AS avg_runs_per_match,
+        b.player_id,
+        MIN(b.player_name) AS player_name,
+        EXTRACT(YEAR FROM m.start_date)::int AS match_year,
+        COUNT(DISTINCT b.match_id) AS matches,
+        ROUND(AVG(b.runs)::numeric, 2) AS avg_runs_per_match,
         ROUND(
-         ((SUM(runs)::numeric / NULLIF(SUM(balls),0)) * 100), 2
+         ((SUM(b.runs)::numeric / NULLIF(SUM(b.balls),0)) * 100), 2
         ) AS strike_rate
-    FROM q16_batting
-    GROUP BY player_id, match_year
-    HAVING COUNT(DISTINCT match_id) >= 5
+    FROM batting_entries b
+    JOIN innings i
+        ON i.match_id = b.match_id
+        AND i.innings_id = b.innings_id
+    JOIN matches m
+        ON m.match_id = b.match_id
+    WHERE LOWER(i.bat_team) = 'india'
+      AND b.player_id IN (SELECT player_id FROM q16_players)
+      AND m.start_date >= '2020-01-01'
+    GROUP BY b.player_id, EXTRACT(YEAR FROM m.start_date)
+    HAVING COUNT(DISTINCT b.match_id) >= 5
     ORDER BY player_name, match_year;
     """
 
-    result = pd.read_sql(query, engine)
-
-    return result
+    return warehouse.read_answer(get_engine(), "q16", query)
 
 
 ## Question 17 Investigate whether winning the toss gives teams an advantage in winning matches. 
 ## Calculate what percentage of matches are won by the team that wins the toss,
 ## broken down by their toss decision (choosing to bat first or bowl first).
 
-def get_q17_toss_advantage():
-
-    from sqlalchemy import text
-    import time
-
-    # --- Create table ---
-    create_table = """
-    CREATE TABLE IF NOT EXISTS q17_raw (
-        match_id BIGINT PRIMARY KEY,
-        team1 TEXT,
-        team2 TEXT,
-        toss_winner TEXT,
-        decision TEXT,
-        match_winner TEXT
-    );
-    """
-
-    with engine.begin() as conn:
-        conn.execute(text(create_table))
-
-    count = pd.read_sql(
-        "SELECT COUNT(*) FROM q17_raw",
-        engine
-    ).iloc[0, 0]
-
-    if count == 0:
-
-        url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
-        resp = requests.get(url, headers=headers)
-
-        data = resp.json()
+def _build_q17_toss_matches():
 
-        match_ids = []
+    import warehouse
 
-        for t in data.get("typeMatches", []):
-            for series in t.get("seriesMatches", []):
-                wrapper = series.get("seriesAdWrapper")
-                if not wrapper:
-                    continue
-
-                for match in wrapper.get("matches", []):
-                    info = match.get("matchInfo", {})
-                    if info.get("state") == "Complete":
-                        match_ids.append(info.get("matchId"))
-
-        rows = []
-
-        for mid in match_ids:
-
-            base = requests.get(
-                f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{mid}",
-                headers=headers
-            ).json()
+    url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/recent"
+    data = safe_api_call(url, headers)
 
-            if base.get("state") != "Complete":
-                continue
+    match_ids = []
 
-            toss = base.get("tossstatus")
-            if not toss or " opt to " not in toss:
+    for t in data.get("typeMatches", []):
+        for series in t.get("seriesMatches", []):
+            wrapper = series.get("seriesAdWrapper")
+            if not wrapper:
                 continue
 
-            toss_winner, decision = toss.split(" opt to ")
-            toss_winner = toss_winner.strip().lower()
-            decision = decision.strip().lower()
-
-            scard = requests.get(
-                f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{mid}/scard",
-                headers=headers
-            ).json()
+            for match in wrapper.get("matches", []):
+                info = match.get("matchInfo", {})
+                if info.get("state") == "Complete" and info.get("matchId"):
+                    match_ids.append(int(info.get("matchId")))
+
+    if not match_ids:
+        return False
+
+    with get_engine().begin() as conn:
+        warehouse.create_schema(conn)
+        known = {
+            r[0] for r in conn.execute(
+                text("""
+                    SELECT match_id FROM matches
+                    WHERE match_id = ANY(:ids) AND toss_winner IS NOT NULL
+                """),
+                {"ids": match_ids}
+            )
+        }
 
-            status = scard.get("status", "")
+    # MATCH INFO (concurrent) -> toss details
+    infos = [
+        base
+        for _, base in api_client.fetch_match_info([m for m in match_ids if m not in known])
+        if base.get("state") == "Complete"
+    ]
 
-            if " won" in status:
-                match_winner = status.split(" won")[0].strip().lower()
-            else:
-                continue
+    with get_engine().begin() as conn:
+        warehouse.load_match_infos(conn, infos)
 
-            rows.append({
-                "match_id": mid,
-                "team1": base.get("team1", {}).get("name", "").lower(),
-                "team2": base.get("team2", {}).get("name", "").lower(),
-                "toss_winner": toss_winner,
-                "decision": decision,
-                "match_winner": match_winner
-            })
+    # SCORECARDS (concurrent) -> match winner
+    if warehouse.ensure_scorecards(get_engine(), match_ids):
+        return False
 
-            time.sleep(0.2)
 
-        df_insert = pd.DataFrame(rows)
+def get_q17_toss_advantage():
 
-        if not df_insert.empty:
-            df_insert.to_sql(
-                "q17_raw",
-                engine,
-                if_exists="append",
-                index=False
-            )
+    import warehouse
 
     summary_query = """
     WITH cleaned AS (
-        SELECT *
-        FROM q17_raw
-        WHERE match_winner NOT LIKE '%tie%'
-          AND match_winner NOT LIKE '%no result%'
+        SELECT
+            LOWER(toss_winner) AS toss_winner,
+            LOWER(toss_decision) AS decision,
+            LOWER(winner) AS match_winner
+        FROM matches
+        WHERE toss_winner IS NOT NULL
+          AND winner IS NOT NULL
+          AND LOWER(winner) NOT LIKE '%tie%'
+          AND LOWER(winner) NOT LIKE '%no result%'
     )
     SELECT
         decision,
@@ -2508,18 +1678,15 @@ def get_q17_toss_advantage():
     ORDER BY toss_advantage_percentage DESC;
     """
 
-    return pd.read_sql(summary_query, engine)
+    return warehouse.read_answer(get_engine(), "q17", summary_query)
 
 ## Question 18 Find the most economical bowlers in limited-overs cricket (ODI and T20 formats). 
 ## Calculate each bowler's overall economy rate and total wickets taken. 
 ## Only consider bowlers who have bowled in at least 10 matches and bowled at least 2 overs per match on average.
 
-def get_que18_economical_bowlers():
-    
-    from sqlalchemy import text
+def _build_que18_bowling_stats():
 
-    if engine is None:
-        return pd.DataFrame([{"Error": "Database engine not available"}])
+    import warehouse
 
     # ---------- CREATE TABLE ----------
     create_table_query = text("""
@@ -2535,121 +1702,68 @@ def get_que18_economical_bowlers():
     );
     """)
 
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         conn.execute(create_table_query)
-        conn.execute(text("DELETE FROM player_bowling_stats"))
 
 
     # ---------- API CALLS ----------
     def get_rankings(fmt):
         url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/rankings/bowlers?formatType={fmt}"
-        res = requests.get(url, headers=headers).json()
+        res = safe_api_call(url, headers)
         return res.get("rank", [])
 
 
-    def extract_stats(data, fmt):
-
-        headers_list = data.get("headers", [])
-        values = data.get("values", [])
-
-        if fmt not in headers_list:
-            return 0, 0, 0, 0
-
-        idx = headers_list.index(fmt)
-
-        matches = balls = runs = wickets = 0
-
-        for row in values:
-            v = row.get("values", [])
-            if not v:
-                continue
-
-            key = v[0].lower()
-
-            try:
-                val = float(str(v[idx]).replace("*", ""))
-            except:
-                val = 0
-
-            if "match" in key:
-                matches = int(val)
-            elif "ball" in key:
-                balls = int(val)
-            elif "run" in key:
-                runs = int(val)
-            elif "wicket" in key:
-                wickets = int(val)
-
-        return matches, balls, runs, wickets
-
-
     # ---------- FETCH PLAYERS ----------
     players = {}
 
     for p in get_rankings("odi"):
-        players[p["id"]] = {
+        players[int(p["id"])] = {
             "name": p["name"],
             "team": p["country"]
         }
 
     for p in get_rankings("t20"):
-        players[p["id"]] = {
+        players[int(p["id"])] = {
             "name": p["name"],
             "team": p["country"]
         }
 
+    # rankings unavailable: keep the last table rather than emptying it
+    if not players:
+        return False
 
-    insert_query = text("""
-    INSERT INTO player_bowling_stats
-    (player_id, player_name, team, format, matches, balls, runs, wickets)
-    VALUES (:pid, :name, :team, :fmt, :mat, :balls, :runs, :wkts)
-    """)
+    # ---------- BOWLING STATS (career stats cache) ----------
+    stats = warehouse.career_table(
+        get_engine(), players, "bowling", ["Matches", "Balls", "Runs", "Wickets"], formats=["ODI", "T20"]
+    ).fillna(0)
 
+    rows = [
+        (pid, players[pid]["name"], players[pid]["team"], fmt, int(mat), int(balls), int(runs), int(wkts))
+        for pid, fmt, mat, balls, runs, wkts in stats.itertuples(index=False)
+        if mat > 0
+    ]
 
-    # ---------- FETCH + INSERT ----------
-    with engine.begin() as conn:
+    if not rows:
+        return False
 
-        for pid, info in players.items():
+    # ---------- BULK INSERT ----------
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM player_bowling_stats"))
+        warehouse.bulk_load(
+            conn,
+            "player_bowling_stats",
+            rows,
+            columns=["player_id", "player_name", "team", "format",
+                     "matches", "balls", "runs", "wickets"]
+        )
 
-            name = info["name"]
-            team = info["team"]
 
-            try:
-                url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{pid}/bowling"
-                data = requests.get(url, headers=headers).json()
-
-                odi = extract_stats(data, "ODI")
-                t20 = extract_stats(data, "T20")
-
-                if odi[0] > 0:
-                    conn.execute(insert_query,[{
-                        "pid": pid,
-                        "name": name,
-                        "team": team,
-                        "fmt": "ODI",
-                        "mat": odi[0],
-                        "balls": odi[1],
-                        "runs": odi[2],
-                        "wkts": odi[3]
-                    }])
-
-                if t20[0] > 0:
-                    conn.execute(insert_query,[{
-                        "pid": pid,
-                        "name": name,
-                        "team": team,
-                        "fmt": "T20",
-                        "mat": t20[0],
-                        "balls": t20[1],
-                        "runs": t20[2],
-                        "wkts": t20[3]
-                    }])
-
-                time.sleep(0.4)
-
-            except Exception:
-                continue
+def get_que18_economical_bowlers():
 
+    import warehouse
+
+    if get_engine() is None:
+        return pd.DataFrame([{"Error": "Database engine not available"}])
 
     # ---------- FINAL SQL QUERY ----------
     query = """
@@ -2679,7 +1793,7 @@ def get_que18_economical_bowlers():
     ORDER BY rank;
     """
 
-    df = pd.read_sql(query, engine)
+    df = warehouse.read_answer(get_engine(), "q18", query)
 
     if df.empty:
         return pd.DataFrame([{"Bowler": "No Data"}])
@@ -2691,195 +1805,48 @@ def get_que18_economical_bowlers():
 ## Calculate the average runs scored and the standard deviation of runs for each player. 
 ## Only include players who have faced at least 10 balls per innings and played since 2022.
 ## A lower standard deviation indicates more consistent performance.
-def get_que19_player_consistency():
-
-    import pandas as pd
-    import requests
-    import time
-    from sqlalchemy import text
-
-    # =========================
-    # CREATE MATCH CACHE TABLE
-    # =========================
-    create_match_table = """
-    CREATE TABLE IF NOT EXISTS q19_match_cache (
-        match_id BIGINT PRIMARY KEY,
-        match_year INT
-    );
-    """
-
-    # =========================
-    # CREATE BATTING TABLE
-    # =========================
-    create_batting_table = """
-    CREATE TABLE IF NOT EXISTS q19_batting (
-        player_id BIGINT,
-        player_name TEXT,
-        runs INT,
-        balls INT,
-        match_year INT
-    );
-    """
-
-    with engine.begin() as conn:
-        conn.execute(text(create_match_table))
-        conn.execute(text(create_batting_table))
-
-    # =========================
-    # CHECK MATCH CACHE
-    # =========================
-    match_count = pd.read_sql(
-        "SELECT COUNT(*) FROM q19_match_cache",
-        engine
-    ).iloc[0, 0]
-
-    # =========================
-    # FETCH MATCH IDS IF EMPTY
-    # =========================
-    if match_count == 0:
-
-        print("Fetching match IDs...")
-
-        all_rows = []
-
-        for year in range(2022, 2027):
-
-            url = "https://cricbuzz-cricket.p.rapidapi.com/series/v1/archives/international"
-            params = {"year": str(year)}
-
-            response = requests.get(url, headers=headers, params=params)
-            data = response.json()
-
-            india_series_ids = []
-
-            for block in data.get("seriesMapProto", []):
-                for series in block.get("series", []):
-                    if "India" in series.get("name", ""):
-                        india_series_ids.append(series.get("id"))
-
-            year_matches = []
-
-            for sid in india_series_ids:
+def _build_q19_india_scorecards(matches_per_year=3):
 
-                s_url = f"https://cricbuzz-cricket.p.rapidapi.com/series/v1/{sid}"
-                s_resp = requests.get(s_url, headers=headers)
-                s_data = s_resp.json()
-
-                for block in s_data.get("matchDetails", []):
-
-                    match_map = block.get("matchDetailsMap", {})
-
-                    for m in match_map.get("match", []):
-
-                        mid = m.get("matchInfo", {}).get("matchId")
-
-                        if mid:
-                            year_matches.append((mid, year))
-
-                        if len(year_matches) >= 3:
-                            break
-
-                    if len(year_matches) >= 3:
-                        break
-
-                if len(year_matches) >= 3:
-                    break
-
-            all_rows.extend(year_matches)
-
-        df_match = pd.DataFrame(all_rows, columns=["match_id", "match_year"])
-
-        if not df_match.empty:
-            df_match.to_sql(
-                "q19_match_cache",
-                engine,
-                if_exists="append",
-                index=False
-            )
-
-    # =========================
-    # CHECK BATTING TABLE
-    # =========================
-    batting_count = pd.read_sql(
-        "SELECT COUNT(*) FROM q19_batting",
-        engine
-    ).iloc[0, 0]
+    import async_ingest
 
     # =========================
-    # FETCH BATTING IF EMPTY
+    # PICK MATCHES PER YEAR, LOAD HSCARDS NOT YET STORED
+    # (years run concurrently; see async_ingest)
     # =========================
-    if batting_count == 0:
-
-        print("Fetching batting data...")
-
-        match_df = pd.read_sql(
-            "SELECT match_id, match_year FROM q19_match_cache",
-            engine
-        )
-
-        rows = []
-
-        for _, row in match_df.iterrows():
-
-            match_id = row["match_id"]
-            year = row["match_year"]
-
-            url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{match_id}/hscard"
-
-            response = requests.get(url, headers=headers)
-            data = response.json()
-
-            for innings in data.get("scorecard", []):
-
-                if innings.get("batteamname", "").lower() != "india":
-                    continue
-
-                for bat in innings.get("batsman", []):
-
-                    pid = bat.get("id")
-                    name = bat.get("name")
-                    runs = bat.get("runs")
-                    balls = bat.get("balls")
+    asyncio.run(async_ingest.load_year_samples(get_engine(), range(2022, 2027), matches_per_year))
 
-                    if pid is None or runs is None or balls is None:
-                        continue
 
-                    runs = int(runs)
-                    balls = int(balls)
-
-                    if balls < 10:
-                        continue
-
-                    rows.append({
-                        "player_id": pid,
-                        "player_name": name,
-                        "runs": runs,
-                        "balls": balls,
-                        "match_year": year
-                    })
-
-            time.sleep(0.2)
-
-        df_insert = pd.DataFrame(rows)
+def get_que19_player_consistency():
 
-        if not df_insert.empty:
-            df_insert.to_sql(
-                "q19_batting",
-                engine,
-                if_exists="append",
-                index=False
-            )
+    import warehouse
 
     # =========================
     # SQL CONSISTENCY QUERY
     # =========================
     query = """
-    WITH player_years AS (
+    WITH india_batting AS (
+        SELECT
+            b.player_id,
+            b.player_name,
+            b.runs,
+            EXTRACT(YEAR FROM m.start_date) AS match_year
+        FROM batting_entries b
+        JOIN innings i
+            ON i.match_id = b.match_id
+            AND i.innings_id = b.innings_id
+        JOIN matches m
+            ON m.match_id = b.match_id
+        WHERE LOWER(i.bat_team) = 'india'
+          AND b.player_id IS NOT NULL
+          AND b.balls >= 10
+          AND m.start_date >= '2022-01-01'
+    ),
+    player_years AS (
         SELECT
             player_id,
             MIN(player_name) AS player_name,
             COUNT(DISTINCT match_year) AS years_played
-        FROM q19_batting
+        FROM india_batting
         GROUP BY player_id
         HAVING COUNT(DISTINCT match_year) >= 3
     ),
@@ -2890,7 +1857,7 @@ def get_que19_player_consistency():
             COUNT(*) AS matches,
             AVG(b.runs) AS avg_runs,
             STDDEV(b.runs) AS std_dev
-        FROM q19_batting b
+        FROM india_batting b
         JOIN player_years p
             ON b.player_id = p.player_id
         GROUP BY b.player_id, p.player_name
@@ -2902,7 +1869,7 @@ def get_que19_player_consistency():
     LIMIT 10;
     """
 
-    result = pd.read_sql(query, engine)
+    result = warehouse.read_answer(get_engine(), "q19", query)
 
     if not result.empty:
         result["avg_runs"] = result["avg_runs"].round(2)
@@ -2920,316 +1887,175 @@ def get_que19_player_consistency():
 
 def _build_que_20_information():
 
-    team_url = "https://cricbuzz-cricket.p.rapidapi.com/teams/v1/2/players"
-    team_res = safe_api_call(team_url, headers)
-
-    if not team_res:
-        return
-
-    player_ids = []
-    player_map = {}
-
-    for p in team_res.get("player", []):
-        if "id" in p:
-            pid = int(p["id"])
-            player_ids.append(pid)
-            player_map[pid] = p["name"]
-
-   
-    player_ids = player_ids[:10]
-
-    records = []
-
-    for pid in player_ids:
-
-        batting_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{pid}/batting"
-        batting_res = safe_api_call(batting_url, headers)
-
-        if not batting_res:
-            continue
-
-        headers_list = batting_res.get("headers", [])
-        values_list = batting_res.get("values", [])
-
-        if not headers_list or not values_list:
-            continue
-
-        formats = ["Test", "ODI", "T20"]
-
-        for fmt in formats:
-
-            if fmt not in headers_list:
-                continue
-
-            idx = headers_list.index(fmt)
-
-            matches = 0
-            average = 0
-
-            for row in values_list:
-
-                row_vals = row.get("values", [])
-                if not row_vals:
-                    continue
-
-                stat_name = row_vals[0]
-                stat_value = row_vals[idx] if len(row_vals) > idx else "0"
-
-                try:
-                    stat_value = float(str(stat_value).replace("*", ""))
-                except:
-                    stat_value = 0
-
-                if stat_name == "Matches":
-                    matches = int(stat_value)
-                elif stat_name == "Average":
-                    average = float(stat_value)
-
-            records.append({
-                "player_id": pid,
-                "player_name": player_map[pid],
-                "format": fmt,
-                "matches": matches,
-                "average": average
-            })
-
-    df_raw = pd.DataFrame(records)
-
-    if df_raw.empty:
-        return
-
-    with engine.begin() as conn:
-        df_raw.to_sql(
-            "que_20_information",
-            conn,
-            if_exists="replace",
-            index=False
-        )
-# =====================================================
-# Question 20 — SQL ANALYTICS
-# =====================================================
-def get_que20_player_format_analysis():
-
-    # Ensure table exists
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1 FROM que_20_information LIMIT 1"))
-    except Exception:
-        _build_que_20_information()
-
-    query = """
-        SELECT
-            player_name,
-
-            SUM(CASE WHEN format = 'Test' THEN matches ELSE 0 END) AS test_matches,
-            SUM(CASE WHEN format = 'ODI' THEN matches ELSE 0 END) AS odi_matches,
-            SUM(CASE WHEN format = 'T20' THEN matches ELSE 0 END) AS t20_matches,
-
-            MAX(CASE WHEN format = 'Test' THEN average ELSE 0 END) AS test_avg,
-            MAX(CASE WHEN format = 'ODI' THEN average ELSE 0 END) AS odi_avg,
-            MAX(CASE WHEN format = 'T20' THEN average ELSE 0 END) AS t20_avg,
-
-            SUM(matches) AS total_matches
-
-        FROM que_20_information
-        GROUP BY player_name
-        HAVING SUM(matches) >= 20
-        ORDER BY total_matches DESC;
-    """
-
-    with engine.connect() as conn:
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-
-    df = pd.DataFrame(rows, columns=[
-        "Player",
-        "Test Matches", "ODI Matches", "T20 Matches",
-        "Test Avg", "ODI Avg", "T20 Avg",
-        "Total Matches"
-    ])
-
-    return df
-
-
-
-#---------------------------------------------------------------------------------------------------------------------------------
-
-## Question 21 Create a comprehensive performance ranking system for players.
-## Combine their batting performance (runs scored, batting average, strike rate), bowling performance (wickets taken, bowling average, economy rate),
-## and fielding performance (catches, stumpings, Run out) into a single weighted score. Use this formula and rank players:
-## •	Batting points: (runs_scored × 0.01) + (batting_average × 0.5) + (strike_rate × 0.3)
-## •	Bowling points: (wickets_taken × 2) + (50 - bowling_average) × 0.5) + ((6 - economy_rate) × 2)
-
-## Rank the top performers in each cricket format.
-
-import pandas as pd
-import time
-from sqlalchemy import text
-
-
-def get_q21_composite_ranking():
-
-    # ---------------------------------------
-    # STEP 1 — FETCH INDIA PLAYERS
-    # ---------------------------------------
-    team_url = "https://cricbuzz-cricket.p.rapidapi.com/teams/v1/2/players"
-    team_data = safe_api_call(team_url, headers)
-
-    if not team_data:
-        print("No team data")
-        return pd.DataFrame()
-
-    players = team_data.get("player", [])
-
-    formats = ["Test", "ODI", "T20"]
-
-    records = []
-
-    # ---------------------------------------
-    # STEP 2 — COLLECT PLAYER STATS
-    # ---------------------------------------
-    for p in players[:6]:   # limit players to avoid heavy API calls
-
-        pid = p.get("id")
-        pname = p.get("name")
-
-        bat_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{pid}/batting"
-        bowl_url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{pid}/bowling"
-
-        bat = safe_api_call(bat_url, headers)
-        bowl = safe_api_call(bowl_url, headers)
-
-        if not bat:
-            continue
-
-        for fmt in formats:
-
-            if fmt not in bat.get("headers", []):
-                continue
+    import warehouse
 
-            idx = bat["headers"].index(fmt)
+    squad = warehouse.roster(get_engine(), [2])
 
-            runs = avg = sr = 0
+    if squad.empty:
+        return False
 
-            for row in bat.get("values", []):
+    squad = squad.head(10)
 
-                label = row["values"][0]
-                val = row["values"][idx]
+    stats = warehouse.career_table(
+        get_engine(), squad["player_id"], "batting", ["Matches", "Average"], formats=["Test", "ODI", "T20"]
+    ).fillna(0)
 
-                if label == "Runs":
-                    runs = int(val) if val.isdigit() else 0
+    df_raw = (
+        stats.merge(squad[["player_id", "name"]], on="player_id")
+        .rename(columns={"name": "player_name", "Matches": "matches", "Average": "average"})
+        .astype({"matches": int})
+        [["player_id", "player_name", "format", "matches", "average"]]
+    )
 
-                if label == "Average":
-                    avg = float(val) if val.replace('.', '', 1).isdigit() else 0
+    if df_raw.empty:
+        return False
 
-                if label == "SR":
-                    sr = float(val) if val.replace('.', '', 1).isdigit() else 0
+    with get_engine().begin() as conn:
+        warehouse.replace_frame(conn, df_raw, "que_20_information")
+# =====================================================
+# Question 20 — SQL ANALYTICS
+# =====================================================
+def get_que20_player_format_analysis():
 
+    import warehouse
 
-            wickets = bowl_avg = eco = 0
+    query = """
+        SELECT
+            player_name AS "Player",
 
-            if bowl and fmt in bowl.get("headers", []):
+            SUM(CASE WHEN format = 'Test' THEN matches ELSE 0 END) AS "Test Matches",
+            SUM(CASE WHEN format = 'ODI' THEN matches ELSE 0 END) AS "ODI Matches",
+            SUM(CASE WHEN format = 'T20' THEN matches ELSE 0 END) AS "T20 Matches",
 
-                idx2 = bowl["headers"].index(fmt)
+            MAX(CASE WHEN format = 'Test' THEN average ELSE 0 END) AS "Test Avg",
+            MAX(CASE WHEN format = 'ODI' THEN average ELSE 0 END) AS "ODI Avg",
+            MAX(CASE WHEN format = 'T20' THEN average ELSE 0 END) AS "T20 Avg",
 
-                for row in bowl.get("values", []):
+            SUM(matches) AS "Total Matches"
 
-                    label = row["values"][0]
-                    val = row["values"][idx2]
+        FROM que_20_information
+        GROUP BY player_name
+        HAVING SUM(matches) >= 20
+        ORDER BY "Total Matches" DESC;
+    """
 
-                    if label == "Wickets":
-                        wickets = int(val) if val.isdigit() else 0
+    return warehouse.read_answer(get_engine(), "q20", query)
 
-                    if label == "Avg":
-                        bowl_avg = float(val) if val.replace('.', '', 1).isdigit() else 0
 
-                    if label == "Eco":
-                        eco = float(val) if val.replace('.', '', 1).isdigit() else 0
 
+#---------------------------------------------------------------------------------------------------------------------------------
 
-            records.append({
+## Question 21 Create a comprehensive performance ranking system for players.
+## Combine their batting performance (runs scored, batting average, strike rate), bowling performance (wickets taken, bowling average, economy rate),
+## and fielding performance (catches, stumpings, Run out) into a single weighted score. Use this formula and rank players:
+## •	Batting points: (runs_scored × 0.01) + (batting_average × 0.5) + (strike_rate × 0.3)
+## •	Bowling points: (wickets_taken × 2) + (50 - bowling_average) × 0.5) + ((6 - economy_rate) × 2)
 
-                "player_name": pname,
-                "format": fmt,
-                "runs": runs,
-                "batting_avg": avg,
-                "strike_rate": sr,
-                "wickets": wickets,
-                "bowling_avg": bowl_avg,
-                "economy": eco,
-                "fielding_points": 0
-            })
+## Rank the top performers in each cricket format.
 
-            time.sleep(0.05)
 
 
-    if not records:
-        return pd.DataFrame()
+def _build_que_21_information():
 
-    df_raw = pd.DataFrame(records)
+    import warehouse
 
     # ---------------------------------------
-    # STEP 3 — STORE IN DATABASE
+    # STEP 1 — FETCH INDIA PLAYERS
     # ---------------------------------------
-    with engine.begin() as conn:
+    squad = warehouse.roster(get_engine(), [2])
 
-        df_raw.to_sql(
-            "que_21_information",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+    if squad.empty:
+        print("No team data")
+        return False
 
+    squad = squad.head(6)   # limit players to avoid heavy API calls
 
     # ---------------------------------------
-    # STEP 4 — FIELDING EXTRACTION 
+    # STEP 2 — PLAYER STATS (career stats cache)
+    # formats the player batted in; blank runs / wickets count as 0,
+    # blank averages and rates stay NULL (no points, see the ranking)
     # ---------------------------------------
-    match_id = 100337
-
-    url = f"https://cricbuzz-cricket.p.rapidapi.com/mcenter/v1/{match_id}/scard"
-
-    data = safe_api_call(url, headers)
-
-    if data:
-
-        counts = {}
+    bat = warehouse.career_table(
+        get_engine(), squad["player_id"], "batting", ["Runs", "Average", "SR"], formats=["Test", "ODI", "T20"]
+    )
+    bowl = warehouse.career_table(
+        get_engine(), squad["player_id"], "bowling", ["Wickets", "Avg", "Eco"], formats=["Test", "ODI", "T20"]
+    )
 
-        for innings in data.get("scorecard", []):
+    if bat.empty:
+        return False
+
+    df_raw = (
+        squad[["player_id", "name"]]
+        .merge(bat, on="player_id")
+        .merge(bowl, on=["player_id", "format"], how="left")
+        .fillna({"Runs": 0, "Wickets": 0})
+        .rename(columns={
+            "name": "player_name",
+            "Runs": "runs",
+            "Average": "batting_avg",
+            "SR": "strike_rate",
+            "Wickets": "wickets",
+            "Avg": "bowling_avg",
+            "Eco": "economy"
+        })
+        .astype({"runs": int, "wickets": int})
+    )
 
-            for batsman in innings.get("batsman", []):
+    # ---------------------------------------
+    # STEP 3 — STORE IN DATABASE
+    # fielding points are not stored: get_q21_composite_ranking
+    # counts them from fielding_events over every ingested scorecard
+    # ---------------------------------------
+    with get_engine().begin() as conn:
 
-                out_text = batsman.get("outdec", "")
-                lower = out_text.lower()
+        warehouse.replace_frame(conn, df_raw, "que_21_information")
 
-                if lower.startswith("c "):
 
-                    name = out_text.split(" b ")[0].replace("c ", "").strip()
-                    counts[name] = counts.get(name, 0) + 1
+def get_q21_composite_ranking():
 
-                elif "run out" in lower:
+    import warehouse
 
-                    inside = out_text.split("(")[-1].replace(")", "")
-                    names = [n.strip() for n in inside.split("/")]
+    # ---------------------------------------
+    # STEP 1 — SQL ANALYTICS RANKING
+    # one fielding point per catch, stumping or run-out involvement
+    # in a scorecard of that format; a NULL average or rate (a "-" on
+    # the stats page) adds no points instead of scoring as 0
+    # ---------------------------------------
+    query = """
 
-                    for n in names:
-                        counts[n] = counts.get(n, 0) + 1
+    WITH fielding AS (
 
+        SELECT
+            f.fielder_id AS player_id,
+            m.match_format,
+            COUNT(*) AS fielding_points
+        FROM fielding_events f
+        JOIN matches m
+            ON m.match_id = f.match_id
+        WHERE f.fielder_id IS NOT NULL
+        GROUP BY 1, 2
+    ),
 
-        with engine.begin() as conn:
+    que_21 AS (
 
-            for player, pts in counts.items():
+        SELECT
+            q.*,
+            COALESCE(f.fielding_points, 0) AS fielding_points,
 
-                conn.execute(text("""
-                    UPDATE que_21_information
-                    SET fielding_points = fielding_points + :pts
-                    WHERE player_name = :player
-                """), {"pts": pts, "player": player})
+            runs*0.01
+            + COALESCE(batting_avg*0.5, 0)
+            + COALESCE(strike_rate*0.3, 0) AS batting_points,
 
+            wickets*2
+            + COALESCE((50-bowling_avg)*0.5, 0)
+            + COALESCE((6-economy)*2, 0) AS bowling_points
 
-    # ---------------------------------------
-    # STEP 5 — SQL ANALYTICS RANKING
-    # ---------------------------------------
-    query = """
+        FROM que_21_information q
+        LEFT JOIN fielding f
+            ON f.player_id = q.player_id
+            AND f.match_format = UPPER(q.format)
+    )
 
     SELECT
         player_name,
@@ -3241,44 +2067,22 @@ def get_q21_composite_ranking():
         bowling_avg,
         economy,
         fielding_points,
-
-        (runs*0.01 + batting_avg*0.5 + strike_rate*0.3) AS batting_points,
-
-        (wickets*2 + (50-bowling_avg)*0.5 + (6-economy)*2) AS bowling_points,
-
-        (
-            (runs*0.01 + batting_avg*0.5 + strike_rate*0.3)
-            +
-            (wickets*2 + (50-bowling_avg)*0.5 + (6-economy)*2)
-            +
-            fielding_points
-        ) AS total_score,
+        batting_points,
+        bowling_points,
+        batting_points + bowling_points + fielding_points AS total_score,
 
         RANK() OVER(
             PARTITION BY format
-            ORDER BY
-            (
-                (runs*0.01 + batting_avg*0.5 + strike_rate*0.3)
-                +
-                (wickets*2 + (50-bowling_avg)*0.5 + (6-economy)*2)
-                +
-                fielding_points
-            ) DESC
+            ORDER BY batting_points + bowling_points + fielding_points DESC
         ) AS rank
 
-    FROM que_21_information
+    FROM que_21
 
     ORDER BY format, rank
 
     """
 
-
-    with engine.connect() as conn:
-       result = conn.execute(text(query))
-       rows = result.fetchall()
-       final_df = pd.DataFrame(rows, columns=result.keys())
-
-    return final_df
+    return warehouse.read_answer(get_engine(), "q21", query)
 
 
 ## Question 22 Build a head-to-head match prediction analysis between teams. For each pair of teams that have played at least 5 matches against each other in the last 3 years, calculate:
@@ -3289,22 +2093,14 @@ def get_q21_composite_ranking():
 ## •	Overall win percentage for each team in this head-to-head record
 
 
-def get_q22_head_to_head_analysis():
-
-    import pandas as pd
-    import json
-    import re
-
-    # ------------------------------------------------
-    # LOAD CACHED FILES
-    # ------------------------------------------------
+def _q22_match_results(winner_path, margin_path):
+    """Winner and victory margin per match_id, parsed from the two JSON caches."""
 
-    df_matches = pd.read_csv("data/q22_ind_aus_matches.csv")
 
-    with open("data/q22_match_cache.json") as f:
+    with open(winner_path) as f:
         winner_cache = json.load(f)
 
-    with open("data/q22_margin_cache.json") as f:
+    with open(margin_path) as f:
         margin_cache = json.load(f)
 
     # ------------------------------------------------
@@ -3365,14 +2161,43 @@ def get_q22_head_to_head_analysis():
 
     df_margin = pd.DataFrame(margin_records)
 
+    return df_winner.merge(df_margin, on="match_id")
+
+
+def get_q22_head_to_head_analysis(persist=False):
+    """
+    India vs Australia head-to-head summary from the Q22 JSON caches.
+    Read-only; persist=True also writes the result to que_22_information.
+    """
+
+    import corpus_snapshot
+    import warehouse
+
+    # ------------------------------------------------
+    # LOAD CACHED FILES
+    # the 440 KB margin cache is parsed once per file change
+    # (corpus_snapshot keeps the result as Parquet)
+    # ------------------------------------------------
+    data_dir = os.path.join(os.path.dirname(__file__), "data")
+
+    df_matches = pd.read_csv(os.path.join(data_dir, "q22_ind_aus_matches.csv"))
+
+    winner_path = os.path.join(data_dir, "q22_match_cache.json")
+    margin_path = os.path.join(data_dir, "q22_margin_cache.json")
+
+    df_results = corpus_snapshot.cached_frame(
+        "q22_results",
+        [winner_path, margin_path],
+        lambda: _q22_match_results(winner_path, margin_path)
+    )
+
     # ------------------------------------------------
     # MERGE DATASETS
     # ------------------------------------------------
 
     df_matches["match_id"] = df_matches["match_id"].astype(int)
 
-    df = df_matches.merge(df_winner, on="match_id")
-    df = df.merge(df_margin, on="match_id")
+    df = df_matches.merge(df_results, on="match_id")
 
    
     df = df[df["winner"].notna()]
@@ -3466,15 +2291,12 @@ def get_q22_head_to_head_analysis():
     })
 
     # ------------------------------------------------
-    # STORE IN DATABASE
+    # OPTIONAL PERSISTENCE
     # ------------------------------------------------
 
-    result.to_sql(
-        "que_22_information",
-        engine,
-        if_exists="replace",
-        index=False
-    )
+    if persist:
+        with get_engine().begin() as conn:
+            warehouse.replace_frame(conn, result, "que_22_information")
 
     return result
 
@@ -3486,166 +2308,69 @@ def get_q22_head_to_head_analysis():
 ## Based on these metrics, categorize players as being in "Excellent Form", "Good Form", "Average Form", or "Poor Form".
 
 
-import os
-import json
-import pandas as pd
-import numpy as np
-from sqlalchemy import text
-
-
-def get_q23_player_form_analysis(data_folder="data"):
 
-    batting_records = []
 
-    # -----------------------------
-    # STEP 1 — LOAD JSON FILES
-    # -----------------------------
-    data_path = os.path.join(os.path.dirname(__file__), data_folder)
+def _archive_store(formats=None, years=None):
+    """
+    (store, match_ids) behind Q23 / Q25: the innings store of the archive
+    built from the Parquet snapshot, only `formats` / `years` partitions
+    read (match_ids None: it holds archive innings only). Without pyarrow,
+    the main store scoped to the archive's match ids.
+    """
 
-    for file in os.listdir(data_path):
-        if file.startswith("match_") and file.endswith(".json"):
-            match_id = file.split("_")[1].split(".")[0]
-            with open(os.path.join(data_path, file), "r") as f:
-               match_data = json.load(f)
+    import corpus_snapshot
+    import innings_store
+    import warehouse
 
-            for innings in match_data.get("scorecard", []):
+    if corpus_snapshot.available():
 
-                for batsman in innings.get("batsman", []):
+        # cold start: the snapshot is normally written by _build_archive
+        if corpus_snapshot.snapshot_signature() is None:
+            corpus_snapshot.write_corpus_snapshot(get_engine())
 
-                    batting_records.append({
-                        "match_id": int(match_id),
-                        "player": batsman.get("name"),
-                        "runs": int(batsman.get("runs", 0)),
-                        "balls": int(batsman.get("balls", 0)),
-                        "strike_rate": float(batsman.get("strkrate", 0))
-                    })
+        return innings_store.open_store(innings_store.build_snapshot_store(formats, years)), None
 
-    df_raw = pd.DataFrame(batting_records)
+    if formats or years:
+        raise RuntimeError("format / season slices need pyarrow (pip install pyarrow)")
 
-    if df_raw.empty:
-        return df_raw
+    store = innings_store.open_store()
 
-    # -----------------------------
-    # STEP 2 — SORT BY PLAYER + MATCH
-    # -----------------------------
-    df_raw = df_raw.sort_values(
-        by=["player", "match_id"],
-        ascending=[True, False]
-    )
+    # cold start: the store is normally (re)built by _build_archive
+    if store is None:
+        innings_store.build_store(get_engine())
+        store = innings_store.open_store()
 
-    # -----------------------------
-    # STEP 3 — LAST 10 INNINGS
-    # -----------------------------
-    df_last10 = df_raw.groupby("player").head(10)
+    return store, warehouse.archive_match_ids(os.path.join(os.path.dirname(__file__), "data"))
 
-    player_counts = df_last10["player"].value_counts()
 
-    eligible_players = player_counts[player_counts >= 10].index
+def get_q23_player_form_analysis(short=5, long=10, persist=False, formats=None, years=None):
+    """
+    Form of every player over their last `long` archive innings against
+    their last `short` (5/10/20 ...). Computed in-process from the archive
+    innings store in one vectorized pass; `formats` / `years` (e.g.
+    ["T20"], [2024]) restrict it to those snapshot partitions.
+    persist=True also writes the result to que_23_player_form.
+    """
 
-    df_last10 = df_last10[df_last10["player"].isin(eligible_players)]
+    import innings_store
+    import warehouse
 
     # -----------------------------
-    # STEP 4 — STORE RAW DATA
+    # STEP 1 — FORM METRICS
+    # data/ scorecards are the "archive" feed of the warehouse
     # -----------------------------
-    with engine.begin() as conn:
+    store, match_ids = _archive_store(formats, years)
 
-        df_last10.to_sql(
-            "que_23_player_form",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+    df = innings_store.form_table(store, short, long, match_ids=match_ids)
 
     # -----------------------------
-    # STEP 5 — SQL ANALYTICS
+    # STEP 2 — OPTIONAL PERSISTENCE
     # -----------------------------
-    query = """
-
-WITH last10 AS (
-
-    SELECT
-        player,
-        runs,
-        strike_rate,
-        match_id,
-
-        ROW_NUMBER() OVER(
-            PARTITION BY player
-            ORDER BY match_id DESC
-        ) AS rn
-
-    FROM que_23_player_form
-),
-
-metrics AS (
-
-    SELECT
-        player,
-
-        AVG(CASE WHEN rn <= 5 THEN runs END) AS avg_last5,
-        AVG(runs) AS avg_last10,
-
-        AVG(CASE WHEN rn <= 5 THEN strike_rate END) AS sr_last5,
-        AVG(strike_rate) AS sr_last10,
-
-        SUM(CASE WHEN runs >= 50 THEN 1 ELSE 0 END) AS fifties,
-
-        STDDEV(runs) AS std_dev
-
-    FROM last10
-
-    GROUP BY player
-)
-
-SELECT
-    player,
-
-    ROUND(avg_last5::numeric,2) AS avg_last5,
-    ROUND(avg_last10::numeric,2) AS avg_last10,
-
-    ROUND(sr_last5::numeric,2) AS sr_last5,
-    ROUND(sr_last10::numeric,2) AS sr_last10,
-
-    fifties,
-
-    ROUND(std_dev::numeric,2) AS std_dev,
-
-    ROUND((100/(1+std_dev))::numeric,2) AS consistency_score,
-
-    CASE
-        WHEN avg_last5 > avg_last10
-            AND fifties >= 3
-            AND std_dev < 25
-        THEN 'Excellent Form'
-
-        WHEN avg_last5 >= avg_last10
-            AND fifties >= 2
-        THEN 'Good Form'
-
-        WHEN avg_last5 < avg_last10
-            AND std_dev > 35
-        THEN 'Poor Form'
-
-        ELSE 'Average Form'
-    END AS form_category
-
-FROM metrics
-
-ORDER BY avg_last5 DESC
+    if persist:
+        with get_engine().begin() as conn:
+            warehouse.replace_frame(conn, df, "que_23_player_form")
 
-    """
-
-    with engine.connect() as conn:
-
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-
-    if not rows:
-        return pd.DataFrame()
-
-    df_result = pd.DataFrame(rows, columns=result.keys())
-
-    return df_result
+    return df
 
 
 ## Question 24 Study successful batting partnerships to identify the best player combinations.
@@ -3656,169 +2381,122 @@ ORDER BY avg_last5 DESC
 ## •	Calculate their success rate (percentage of good partnerships)
 ## Rank the most successful batting partnerships.
 
-import os
-import json
-import pandas as pd
-from sqlalchemy import text
-
-
-def get_q24_batting_partnerships(data_folder="data"):
-
-    batting_records = []
 
-    data_path = os.path.join(os.path.dirname(__file__), data_folder)
 
-    # -----------------------------
-    # STEP 1 — LOAD JSON
-    # -----------------------------
-    for file in os.listdir(data_path):
+def _pair_ranking(parts):
+    """
+    Q24's ranking from partnership rows (bat1_id, bat1_name, bat2_id,
+    bat2_name, total_runs): the pandas twin of the pair_stats query.
+    """
 
-        if file.startswith("match_") and file.endswith(".json"):
+    columns = ["player1", "player2", "total_partnerships", "avg_partnership", "fifty_plus",
+               "highest_partnership", "success_rate", "rank"]
 
-            match_id = file.split("_")[1].split(".")[0]
+    parts = parts[parts["bat1_id"].notna() & parts["bat2_id"].notna()]
 
-            with open(os.path.join(data_path, file), "r") as f:
-                match_data = json.load(f)
+    # each pair once, lower id first
+    swap = parts["bat1_id"] > parts["bat2_id"]
 
-            for innings in match_data.get("scorecard", []):
+    pairs = pd.DataFrame({
+        "player1_id": parts["bat1_id"].where(~swap, parts["bat2_id"]),
+        "player2_id": parts["bat2_id"].where(~swap, parts["bat1_id"]),
+        "player1": parts["bat1_name"].where(~swap, parts["bat2_name"]),
+        "player2": parts["bat2_name"].where(~swap, parts["bat1_name"]),
+        "runs": parts["total_runs"],
+        "fifty": parts["total_runs"] >= 50,
+    })
 
-                innings_id = innings.get("inningsid")
+    df = pairs.groupby(["player1_id", "player2_id"]).agg(
+        player1=("player1", "min"),
+        player2=("player2", "min"),
+        total_partnerships=("runs", "size"),
+        total_runs=("runs", "sum"),
+        fifty_plus=("fifty", "sum"),
+        highest_partnership=("runs", "max"),
+    )
 
-                position = 1
+    df = df[df["total_partnerships"] >= 5]
 
-                for batsman in innings.get("batsman", []):
+    if df.empty:
+        return pd.DataFrame(columns=columns)
 
-                    batting_records.append({
-                        "match_id": int(match_id),
-                        "innings": innings_id,
-                        "player": batsman.get("name"),
-                        "runs": int(batsman.get("runs", 0)),
-                        "position": position
-                    })
+    success = df["fifty_plus"] / df["total_partnerships"]
+    average = df["total_runs"] / df["total_partnerships"]
 
-                    position += 1
+    df = df.assign(
+        avg_partnership=average.round(2),
+        success_rate=(100 * success).round(2),
+        _success=success,
+        _average=average,
+    ).sort_values(["_success", "_average"], ascending=False, kind="stable")
 
+    # RANK(): ties share the position of their first row
+    first = df[["_success", "_average"]].ne(df[["_success", "_average"]].shift()).any(axis=1)
+    position = pd.Series(range(1, len(df) + 1), index=df.index)
+    df["rank"] = position.where(first).ffill().astype(int)
 
-    df_raw = pd.DataFrame(batting_records)
+    return df[columns].reset_index(drop=True)
 
-    if df_raw.empty:
-        return df_raw
 
+def get_q24_batting_partnerships(formats=None, years=None):
 
     # -----------------------------
-    # STEP 2 — STORE RAW DATA
+    # FORMAT / SEASON SLICE
+    # pair_stats keeps all-time totals; a slice is aggregated from the
+    # partnerships snapshot, reading only those partitions and columns
     # -----------------------------
-    with engine.begin() as conn:
+    if formats or years:
 
-        df_raw.to_sql(
-            "que_24_batting_positions",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+        import corpus_snapshot
 
+        if corpus_snapshot.snapshot_signature() is None:
+            corpus_snapshot.write_corpus_snapshot(get_engine())
+
+        return _pair_ranking(corpus_snapshot.read_snapshot(
+            "partnerships",
+            columns=["bat1_id", "bat1_name", "bat2_id", "bat2_name", "total_runs"],
+            formats=formats,
+            years=years
+        ))
 
     # -----------------------------
-    # STEP 3 — SQL PARTNERSHIP ANALYSIS
+    # STEP 1 — PAIR STATS READ
+    # pair_stats holds running totals of the scorecards' real
+    # partnerships (warehouse.PAIR_ROWS_SQL); archive pairs only,
+    # i.e. matches in the archive feed, whichever source stored them
     # -----------------------------
     query = """
 
-    WITH ordered AS (
-
-        SELECT
-            match_id,
-            innings,
-            player,
-            runs,
-            position,
-
-            LEAD(player) OVER(
-                PARTITION BY match_id, innings
-                ORDER BY position
-            ) AS next_player,
-
-            LEAD(runs) OVER(
-                PARTITION BY match_id, innings
-                ORDER BY position
-            ) AS next_runs
-
-        FROM que_24_batting_positions
-    ),
-
-    partnerships AS (
-
-        SELECT
-            player AS player1,
-            next_player AS player2,
-            runs + next_runs AS partnership_runs
-
-        FROM ordered
-
-        WHERE next_player IS NOT NULL
-    ),
-
-    summary AS (
-
-        SELECT
-            player1,
-            player2,
-
-            COUNT(*) AS total_partnerships,
-
-            AVG(partnership_runs) AS avg_partnership,
-
-            SUM(
-                CASE
-                    WHEN partnership_runs >= 50
-                    THEN 1 ELSE 0
-                END
-            ) AS fifty_plus,
-
-            MAX(partnership_runs) AS highest_partnership,
-
-            100.0 * SUM(
-                CASE
-                    WHEN partnership_runs >= 50
-                    THEN 1 ELSE 0
-                END
-            ) / COUNT(*) AS success_rate
-
-        FROM partnerships
-
-        GROUP BY player1, player2
-
-        HAVING COUNT(*) >= 5
-    )
-
     SELECT
-        player1,
-        player2,
-        total_partnerships,
-        ROUND(avg_partnership::numeric,2) AS avg_partnership,
+        COALESCE(p1.full_name, s.player1) AS player1,
+        COALESCE(p2.full_name, s.player2) AS player2,
+        partnerships AS total_partnerships,
+        ROUND(total_runs::numeric / partnerships, 2) AS avg_partnership,
         fifty_plus,
-        highest_partnership,
-        ROUND(success_rate::numeric,2) AS success_rate,
+        highest AS highest_partnership,
+        ROUND(100.0 * fifty_plus / partnerships, 2) AS success_rate,
 
         RANK() OVER(
-            ORDER BY success_rate DESC, avg_partnership DESC
+            ORDER BY
+                fifty_plus::numeric / partnerships DESC,
+                total_runs::numeric / partnerships DESC
         ) AS rank
 
-    FROM summary
-
-    ORDER BY rank
-    """
+    FROM pair_stats s
 
-    with engine.connect() as conn:
+    LEFT JOIN players p1
+        ON p1.player_id = s.player1_id
+    LEFT JOIN players p2
+        ON p2.player_id = s.player2_id
 
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-
-    if not rows:
-        return pd.DataFrame()
+    WHERE s.source = 'archive'
+      AND s.partnerships >= 5
 
-    df_result = pd.DataFrame(rows, columns=result.keys())
+    ORDER BY rank
+    """
 
-    return df_result
+    with get_engine().connect() as conn:
+        return pd.read_sql(text(query), conn)
 
 ## Question 25 Perform a time-series analysis of player performance evolution. 
 ## Track how each player's batting performance changes over time by:
@@ -3828,207 +2506,348 @@ def get_q24_batting_partnerships(data_folder="data"):
 ## •	Determining overall career trajectory over the last few years
 ## •	Categorizing players' career phase as "Career Ascending", "Career Declining", or "Career Stable"
 ## Only analyze players with data spanning at least 6 quarters and a minimum of 3 matches per quarter.
-from sqlalchemy import text
-import os
-import json
-import pandas as pd
-
 
-def get_q25_player_time_series(data_folder="data"):
 
-    batting_records = []
-
-    data_path = os.path.join(os.path.dirname(__file__), data_folder)
+def get_q25_player_time_series(min_quarters=3, min_innings=1, formats=None, years=None):
+    """
+    Quarterly runs / strike rate of every archive player, by match start
+    date, with quarter-over-quarter deltas, trend and career phase.
+    Computed from the archive innings store (`formats` / `years` as in
+    Q23); unchanged players come from cache.
+    """
 
-    # ---------------------------------------
-    # STEP 1 — LOAD JSON FILES
-    # ---------------------------------------
-    for file in os.listdir(data_path):
+    import innings_store
 
-        if not file.startswith("match_") or not file.endswith(".json"):
-            continue
+    store, match_ids = _archive_store(formats, years)
 
-        match_id_part = file.split("_")[1].split(".")[0]
+    return innings_store.quarterly_table(
+        store,
+        match_ids=match_ids,
+        min_quarters=min_quarters,
+        min_innings=min_innings
+    )
 
-        if not match_id_part.isdigit():
-            continue
 
-        match_id = int(match_id_part)
+# =====================================================
+# BACKGROUND REFRESH
+# python -m pipeline refresh [--once] [--force] [job ...]
+# =====================================================
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
 
-        file_path = os.path.join(data_path, file)
+REFRESH_POLL = 60
 
-        try:
-            with open(file_path, "r") as f:
-                match_data = json.load(f)
-        except:
-            continue
+def _build_archive():
 
-        for innings in match_data.get("scorecard", []):
+    import warehouse
 
-            for batsman in innings.get("batsman", []):
+    match_ids = warehouse.load_archive(get_engine(), os.path.join(os.path.dirname(__file__), "data"))
 
-                batting_records.append({
+    # Q25 buckets innings by start date: fill in dates the q22 info cache lacks
+    if API_KEY != "DUMMY_KEY":
+        warehouse.backfill_match_info(get_engine(), "archive")
 
-                    "match_id": match_id,
-                    "player": batsman.get("name"),
-                    "runs": int(batsman.get("runs", 0)),
-                    "strike_rate": float(batsman.get("strkrate", 0))
+    # Parquet snapshot of the archive, and the innings store Q23 / Q25
+    # read from it (format / season slices are built on first use)
+    import corpus_snapshot
+    import innings_store
 
-                })
+    if corpus_snapshot.available():
+        corpus_snapshot.write_corpus_snapshot(get_engine())
+        innings_store.build_snapshot_store()
 
-    df_raw = pd.DataFrame(batting_records)
+    # per-player innings arrays behind the Player page
+    _build_innings_store()
 
-    if df_raw.empty:
-        return pd.DataFrame()
+    return match_ids
 
-    # ---------------------------------------
-    # STEP 2 — STORE RAW DATA
-    # ---------------------------------------
-    with engine.begin() as conn:
 
-        df_raw.to_sql(
-            "que_25_player_timeseries",
-            conn,
-            if_exists="replace",
-            index=False
-        )
+# the batting side of corpus_snapshot.SOURCE_TABLES (what Q23 / Q25 read
+# through the snapshot), spelled out so the registry does not import pyarrow
+SNAPSHOT_TABLES = ["batting_entries", "matches", "feed_matches", "players"]
 
-    # ---------------------------------------
-    # STEP 3 — SQL TIME SERIES ANALYSIS
-    # ---------------------------------------
-    query = """
 
-  WITH quarterly AS (
+def _build_innings_store():
+    import innings_store
+    return innings_store.build_store(get_engine())
 
-SELECT
-    player,
-    match_id AS quarter,
 
-    AVG(runs) AS avg_runs,
-    AVG(strike_rate) AS avg_sr,
-    COUNT(*) AS matches
+def _question(label, job, ingest, query, tables, max_age, **display):
+    """One QUESTIONS entry; `display` holds optional dashboard hints."""
+    return {
+        "label": label,
+        "job": job,                 # refresh job name shared by questions with the same ingest
+        "ingest": ingest,           # API -> tables (None when the question reads local files)
+        "query": query,             # tables -> DataFrame, SQL only
+        "tables": tables,           # tables the query reads
+        "max_age": max_age,         # freshness policy: re-ingest after this many seconds
+        **display
+    }
 
-FROM que_25_player_timeseries
 
-GROUP BY player, match_id
+# =====================================================
+# QUESTION REGISTRY
+# Schedulers, caches and the dashboard work off this table
+# instead of knowing each question's function names.
+# =====================================================
+QUESTIONS = {
+    1: _question(
+        "All players who represent India",
+        "q1", _build_q1_india_players, get_q1_india_players,
+        ["q1_players"], DAY
+    ),
+    2: _question(
+        "Matches played in the last few days",
+        "recent_matches", _build_recent_matches, get_q2_recent_matches,
+        ["matches", "feed_matches"], 5 * MINUTE
+    ),
+    3: _question(
+        "Top 10 highest run scorers in ODI",
+        "q3", _build_q3_odi_batting, get_q3_top_odi_scorers,
+        ["q3_odi_batting"], DAY
+    ),
+    4: _question(
+        "Venues with capacity exceeding 25k",
+        "q4", _build_q4_venues, get_q4_large_venues,
+        ["q4_venues"], DAY
+    ),
+    5: _question(
+        "Matches won by each team",
+        "recent_matches", _build_recent_matches, get_q5_team_win_counts,
+        ["matches", "feed_matches"], 5 * MINUTE
+    ),
+    6: _question(
+        "Player count by playing role",
+        "q6", _build_q6_players_role, get_q6_players_by_role,
+        ["roster_players", "roster_teams"], 7 * DAY
+    ),
+    7: _question(
+        "Highest individual score per format",
+        "q7", _build_q7_recent_scorecards, get_q7_highest_scores,
+        ["matches", "batting_entries"], 30 * MINUTE
+    ),
+    8: _question(
+        "Series started in 2024",
+        "q8", _build_q8_series_2024, get_q8_series_2024,
+        ["q8_series_2024"], 7 * DAY
+    ),
+    9: _question(
+        "All-rounders with 1000 runs & 50 wickets",
+        "q9", _build_q9_allrounders, get_q9_allrounders,
+        ["q9_batting_stats", "q9_bowling_stats"], DAY
+    ),
+    10: _question(
+        "Last 20 completed matches details",
+        "recent_matches", _build_recent_matches, get_q10_last_20_completed_matches,
+        ["matches"], 5 * MINUTE
+    ),
+    11: _question(
+        "Player performance comparison across formats",
+        "q11", _build_que_11_raw_table, get_q11_player_format_comparison,
+        ["que_11_player_batting_raw"], DAY
+    ),
+    12: _question(
+        "Team performance Home vs Away",
+        "q12", _build_que_12_information, get_que12_home_away_analysis,
+        ["que_12_information"], 7 * DAY,
+        title="ICC Cricket World Cup 2023 — Home vs Away Performance"
+    ),
+    13: _question(
+        "Batting partnerships of 100+ runs",
+        "series_3641", lambda: _build_series_scorecards(3641), get_que13_century_partnerships,
+        ["matches", "partnerships", "players"], DAY
+    ),
+    14: _question(
+        "Bowling performance at different venues",
+        "series_3641", lambda: _build_series_scorecards(3641), get_que14_bowler_venue_performance,
+        ["matches", "bowling_entries", "players"], DAY,
+        empty_message=(
+            "No bowlers satisfy the criteria:\n"
+            "• At least 3 matches at the same venue\n"
+            "• Minimum 4 overs in each match"
+        )
+    ),
+    15: _question(
+        "Players in close matches",
+        "q15", _build_q15_close_match_scorecards, get_que15_close_matches_performance,
+        ["matches", "innings", "batting_entries", "players"], 30 * MINUTE
+    ),
+    16: _question(
+        "Yearly batting performance evolution",
+        "q16", _build_q16_india_scorecards, get_que16_player_yearly_stats,
+        ["matches", "innings", "batting_entries", "q16_players"], DAY
+    ),
+    17: _question(
+        "Toss advantage percentage analysis",
+        "q17", _build_q17_toss_matches, get_q17_toss_advantage,
+        ["matches"], 30 * MINUTE,
+        title="Question 17 — Toss Advantage Analysis"
+    ),
+    18: _question(
+        "Most economical bowlers in limited overs",
+        "q18", _build_que18_bowling_stats, get_que18_economical_bowlers,
+        ["player_bowling_stats"], DAY
+    ),
+    19: _question(
+        "Batsmen scoring consistency analysis",
+        "q19", _build_q19_india_scorecards, get_que19_player_consistency,
+        ["matches", "innings", "batting_entries"], DAY
+    ),
+    20: _question(
+        "Player format analysis & batting averages",
+        "q20", _build_que_20_information, get_que20_player_format_analysis,
+        ["que_20_information"], DAY
+    ),
+    21: _question(
+        "Composite player ranking system",
+        "q21", _build_que_21_information, get_q21_composite_ranking,
+        ["que_21_information", "fielding_events", "matches"], DAY
+    ),
+    22: _question(
+        "Head-to-head match prediction",
+        None, None, get_q22_head_to_head_analysis,
+        [], None,
+        title="🏏 Q22: India vs Australia Head-to-Head Analysis (2024–2026)",
+        caption="Data extracted from Cricbuzz series archives | Only completed matches included"
+    ),
+    23: _question(
+        "Recent player form categorized",
+        "archive", _build_archive, get_q23_player_form_analysis,
+        SNAPSHOT_TABLES, HOUR
+    ),
+    24: _question(
+        "Successful batting partnerships analysis",
+        "archive", _build_archive, get_q24_batting_partnerships,
+        ["pair_stats", "players"], HOUR
+    ),
+    25: _question(
+        "Time-series analysis of player evolution",
+        "archive", _build_archive, get_q25_player_time_series,
+        SNAPSHOT_TABLES, HOUR
+    ),
+}
 
-),
 
-filtered_quarters AS (
+def _refresh_jobs():
 
-SELECT *
-FROM quarterly
-WHERE matches >= 1
+    # job name -> (ingest function, interval); shared jobs use the tightest interval
+    jobs = {}
 
-),
+    for q in QUESTIONS.values():
 
-valid_players AS (
+        if not q["job"]:
+            continue
 
-SELECT
-    player
-FROM filtered_quarters
-GROUP BY player
-HAVING COUNT(*) >= 3
+        if q["job"] in jobs:
+            build, interval = jobs[q["job"]]
+            jobs[q["job"]] = (build, min(interval, q["max_age"]))
+        else:
+            jobs[q["job"]] = (q["ingest"], q["max_age"])
 
-),
+    return jobs
 
-trends AS (
 
-SELECT
-    fq.player,
-    fq.quarter,
-    fq.avg_runs,
-    fq.avg_sr,
-    fq.matches,
+REFRESH_JOBS = _refresh_jobs()
 
-    LAG(fq.avg_runs) OVER(
-        PARTITION BY fq.player
-        ORDER BY fq.quarter
-    ) AS prev_runs
+# not tied to a question: feeds the player page's recent innings
+REFRESH_JOBS["innings_store"] = (_build_innings_store, HOUR)
 
-FROM filtered_quarters fq
+# not tied to a question: drops expired data/api_cache entries
+REFRESH_JOBS["api_cache"] = (response_cache.purge_expired, DAY)
 
-JOIN valid_players vp
-ON fq.player = vp.player
 
-),
+def run_question(number):
+    """Dashboard entry point: cold-start ingest if needed, then the SQL query."""
 
-trend_class AS (
+    q = QUESTIONS[number]
 
-SELECT
-    player,
-    quarter,
-    avg_runs,
-    avg_sr,
-    matches,
+    if q["job"]:
+        _ensure_ingested(q["job"], q["ingest"])
 
-    CASE
-        WHEN prev_runs IS NULL THEN 'Stable'
-        WHEN avg_runs > prev_runs THEN 'Improving'
-        WHEN avg_runs < prev_runs THEN 'Declining'
-        ELSE 'Stable'
-    END AS trend
+    return q["query"]()
 
-FROM trends
 
-),
+def question_age(number):
+    """Seconds since the question's data was last ingested (None if never / no ingest)."""
 
-career_phase AS (
+    import warehouse
 
-SELECT
-    player,
+    q = QUESTIONS[number]
 
-    SUM(CASE WHEN trend='Improving' THEN 1 ELSE 0 END) AS improving,
-    SUM(CASE WHEN trend='Declining' THEN 1 ELSE 0 END) AS declining
+    if not q["job"] or get_engine() is None:
+        return None
 
-FROM trend_class
+    with get_engine().connect() as conn:
+        return warehouse.ingest_ages(conn).get(f"refresh/{q['job']}")
 
-GROUP BY player
 
-)
+def refresh(jobs=None, once=False, force=False):
+    """
+    Run due ingestion jobs until interrupted. A job is due when its
+    refresh/<name> stamp in ingest_state is older than its interval.
+    Each pass ends by refreshing the answer views the jobs made stale.
+    """
 
-SELECT
-    t.player,
-    t.quarter AS match_order,
+    import warehouse
 
-    ROUND(t.avg_runs::numeric,2) AS avg_runs,
-    ROUND(t.avg_sr::numeric,2) AS avg_strike_rate,
+    names = list(jobs or REFRESH_JOBS)
 
-    t.matches,
-    t.trend,
+    while True:
 
-    CASE
-        WHEN c.improving > c.declining THEN 'Career Ascending'
-        WHEN c.declining > c.improving THEN 'Career Declining'
-        ELSE 'Career Stable'
-    END AS career_phase
+        with get_engine().begin() as conn:
+            warehouse.create_schema(conn)
+            ages = warehouse.ingest_ages(conn)
 
-FROM trend_class t
+        for name in names:
 
-JOIN career_phase c
-ON t.player = c.player
+            build, interval = REFRESH_JOBS[name]
+            age = ages.get(f"refresh/{name}")
 
-ORDER BY t.player, t.quarter
+            if not force and age is not None and age < interval:
+                continue
 
-    """
+            try:
+                run_refresh_job(name, build)
+            except Exception as e:
+                print(f" Refresh {name} failed:", e)
 
-    with engine.connect() as conn:
+        # recompute only the answer views whose source tables changed
+        refreshed = warehouse.refresh_answers(get_engine())
+        if refreshed:
+            print(f" Refreshed answers: {', '.join(refreshed)}")
 
-        result = conn.execute(text(query))
-        rows = result.fetchall()
+        if once:
+            return
 
-    if not rows:
-        return pd.DataFrame()
+        force = False
+        time.sleep(REFRESH_POLL)
 
-    df_result = pd.DataFrame(rows, columns=result.keys())
 
-    return df_result
+def main(argv=None):
 
+    import argparse
 
+    parser = argparse.ArgumentParser(prog="python -m pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
 
+    refresh_cmd = commands.add_parser("refresh", help="run ingestion jobs on their schedule")
+    refresh_cmd.add_argument("jobs", nargs="*", help=f"subset of: {', '.join(REFRESH_JOBS)}")
+    refresh_cmd.add_argument("--once", action="store_true", help="run due jobs once and exit")
+    refresh_cmd.add_argument("--force", action="store_true", help="ignore intervals on the first pass")
 
+    args = parser.parse_args(argv)
 
+    unknown = [j for j in args.jobs if j not in REFRESH_JOBS]
+    if unknown:
+        parser.error(f"unknown job(s): {', '.join(unknown)}")
 
+    if get_engine() is None:
+        parser.error("database engine not available; check DB_* settings in .env")
 
+    if args.command == "refresh":
+        refresh(args.jobs, once=args.once, force=args.force)
 
 
+if __name__ == "__main__":
+    main()
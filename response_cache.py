@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import config  # loads .env
+
+# =====================================================
+# ON-DISK RAW API RESPONSE CACHE
+# Entries are keyed by sha256(url + params) and stored as
+# data/api_cache/<2 chars>/<key>.json with their own expiry.
+# =====================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+CACHE_DIR = os.getenv("API_CACHE_DIR") or os.path.join(DATA_DIR, "api_cache")
+CACHE_ENABLED = os.getenv("API_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Sentinel TTL: completed-match payloads never expire, everything
+# else under the same endpoint gets LIVE_MATCH_TTL.
+FINAL = "final"
+LIVE_MATCH_TTL = 1 * MINUTE
+
+# First matching rule wins. TTL of 0 means "never cache".
+TTL_RULES = [
+    (re.compile(r"/matches/v1/live"), 0),
+    (re.compile(r"/matches/v1/(recent|upcoming)"), 5 * MINUTE),
+    (re.compile(r"/mcenter/v1/\d+(/h?scard)?$"), FINAL),
+    (re.compile(r"/stats/v1/player/search"), DAY),
+    (re.compile(r"/stats/v1/player/\d+/(batting|bowling)"), DAY),
+    (re.compile(r"/stats/v1/rankings/"), DAY),
+    (re.compile(r"/teams/v1/"), DAY),
+    (re.compile(r"/series/v1/archives/"), DAY),
+    (re.compile(r"/series/v1/\d+$"), 6 * HOUR),
+    (re.compile(r"/venues/v1/"), 7 * DAY),
+]
+
+DEFAULT_TTL = 10 * MINUTE
+
+_SCARD_RE = re.compile(r"/mcenter/v1/(\d+)/scard$")
+
+
+def cache_key(url, params=None):
+    raw = url + "?" + json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+
+def is_final(payload):
+    """True when a match payload describes a finished match."""
+    return (
+        payload.get("ismatchcomplete") is True
+        or payload.get("state") == "Complete"
+    )
+
+
+def ttl_for(url, payload=None):
+    """Seconds to keep `url`'s response; None = forever, 0 = do not cache."""
+
+    path = url.split("?", 1)[0]
+
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(path):
+            if ttl == FINAL:
+                return None if payload and is_final(payload) else LIVE_MATCH_TTL
+            return ttl
+
+    return DEFAULT_TTL
+
+
+def _legacy_snapshot(url):
+    """Scorecards already saved as data/match_<id>.json count as permanent entries."""
+
+    m = _SCARD_RE.search(url.split("?", 1)[0])
+
+    if not m:
+        return None
+
+    path = os.path.join(DATA_DIR, f"match_{m.group(1)}.json")
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r") as f:
+            payload = json.load(f)
+    except Exception:
+        return None
+
+    return payload if is_final(payload) else None
+
+
+def get(url, params=None):
+    """Return the cached payload for url+params, or None on miss/expiry."""
+
+    if not CACHE_ENABLED:
+        return None
+
+    path = _entry_path(cache_key(url, params))
+
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except Exception:
+            return None
+
+        expires_at = entry.get("expires_at")
+
+        if expires_at is None or expires_at > time.time():
+            return entry.get("payload")
+
+        return None
+
+    return _legacy_snapshot(url)
+
+
+def put(url, params, payload):
+    """Store a successful response according to its TTL rule."""
+
+    if not CACHE_ENABLED or not payload:
+        return
+
+    ttl = ttl_for(url, payload)
+
+    if ttl == 0:
+        return
+
+    now = time.time()
+
+    entry = {
+        "url": url,
+        "params": params,
+        "fetched_at": now,
+        "expires_at": None if ttl is None else now + ttl,
+        "payload": payload
+    }
+
+    path = _entry_path(cache_key(url, params))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # write-then-rename so concurrent readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(" Cache write failed:", e)
+
+
+def purge_expired():
+    """Delete expired entries. Returns the number removed."""
+
+    removed = 0
+    now = time.time()
+
+    if not os.path.isdir(CACHE_DIR):
+        return removed
+
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+
+            if not name.endswith(".json"):
+                continue
+
+            path = os.path.join(root, name)
+
+            try:
+                with open(path, "r") as f:
+                    expires_at = json.load(f).get("expires_at")
+            except Exception:
+                expires_at = 0
+
+            if expires_at is not None and expires_at <= now:
+                os.remove(path)
+                removed += 1
+
+    return removed
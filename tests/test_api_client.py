@@ -0,0 +1,186 @@
+import asyncio
+import types
+
+import pytest
+
+import api_client
+
+
+# ---------- AsyncClient retries ----------
+class FakeClientError(Exception):
+    pass
+
+
+class FakeResponse:
+
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class FakeSession:
+    """Replays `outcomes`: a FakeResponse, or an exception raised on get()."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def async_get(monkeypatch):
+    """Run AsyncClient._get against a FakeSession, without sleeping."""
+
+    monkeypatch.setattr(api_client, "aiohttp", types.SimpleNamespace(ClientError=FakeClientError))
+    monkeypatch.setattr(api_client, "MAX_RETRIES", 2)
+    monkeypatch.setattr(api_client, "rate_limiter", api_client.RateLimiter(0))
+
+    delays = []
+
+    async def no_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(api_client.asyncio, "sleep", no_sleep)
+
+    def run(outcomes):
+        client = api_client.AsyncClient()
+        client.session = FakeSession(outcomes)
+        result = asyncio.run(client._get("https://host/x", None))
+        return result, client.session.calls, delays
+
+    return run
+
+
+def test_async_get_retries_connection_errors(async_get):
+
+    result, calls, delays = async_get([
+        FakeClientError("reset"),
+        asyncio.TimeoutError(),
+        FakeResponse(200, {"ok": 1}),
+    ])
+
+    assert result == {"ok": 1}
+    assert calls == 3
+    assert delays == [api_client.BACKOFF_FACTOR, api_client.BACKOFF_FACTOR * 2]
+
+
+def test_async_get_raises_after_last_retry(async_get):
+
+    with pytest.raises(FakeClientError):
+        async_get([FakeClientError("down")] * 3)
+
+
+def test_async_get_retries_statuses_and_honours_retry_after(async_get):
+
+    result, calls, delays = async_get([
+        FakeResponse(429, headers={"Retry-After": "3"}),
+        FakeResponse(200, {"ok": 1}),
+    ])
+
+    assert result == {"ok": 1}
+    assert delays == [3.0]
+
+
+def test_async_get_gives_up_on_other_statuses(async_get):
+
+    result, calls, _ = async_get([FakeResponse(404)])
+
+    assert result == {} and calls == 1
+
+
+# ---------- RateLimiter ----------
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+
+    clock = FakeClock()
+    monkeypatch.setattr(api_client.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(api_client.time, "sleep", clock.sleep)
+
+    return clock
+
+
+def test_rate_limiter_spends_the_burst_then_waits_for_the_rate(clock):
+
+    limiter = api_client.RateLimiter(rate=2, burst=3)
+
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.slept == []
+
+    limiter.acquire()
+    assert clock.slept == [pytest.approx(0.5)]
+
+
+def test_rate_limiter_refills_only_up_to_the_burst(clock):
+
+    limiter = api_client.RateLimiter(rate=1, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+
+    clock.now += 60         # idle for a minute: still only two saved
+
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_rate_limiter_waits_without_blocking_the_loop(clock, monkeypatch):
+
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(api_client.asyncio, "sleep", fake_sleep)
+
+    limiter = api_client.RateLimiter(rate=4)
+
+    async def run():
+        for _ in range(3):
+            await limiter.acquire_async()
+
+    asyncio.run(run())
+
+    assert slept == [pytest.approx(0.25)] * 2
+    assert clock.slept == []
+
+
+def test_rate_limiter_is_off_at_zero_rate(clock):
+
+    limiter = api_client.RateLimiter(rate=0)
+
+    for _ in range(100):
+        limiter.acquire()
+
+    assert clock.slept == []
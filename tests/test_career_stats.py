@@ -0,0 +1,49 @@
+import pytest
+
+import warehouse
+
+
+@pytest.mark.parametrize("raw, value", [
+    ("183*", 183.0),
+    ("1,024", 1024.0),
+    ("45.67", 45.67),
+    (" 12 ", 12.0),
+    ("0", 0.0),
+    (12, 12.0),
+    ("-", None),
+    ("", None),
+    ("5/20", None),
+    (None, None),
+])
+def test_career_value(raw, value):
+    assert warehouse.career_value(raw) == value
+
+
+def test_parse_career_stats_keeps_raw_and_order():
+
+    payload = {
+        "headers": ["ROWHEADER", "Test", "ODI", "T20"],
+        "values": [
+            {"values": ["Wickets", "563", "0", "-"]},
+            {"values": []},
+            {"values": ["BBI", "8/24", "-", "-"]},
+        ],
+    }
+
+    rows = warehouse.parse_career_stats("7710", "bowling", payload)
+
+    assert [(r["stat"], r["format"], r["value"], r["raw"]) for r in rows] == [
+        ("Wickets", "Test", 563.0, "563"),
+        ("Wickets", "ODI", 0.0, "0"),
+        ("Wickets", "T20", None, "-"),
+        ("BBI", "Test", None, "8/24"),
+        ("BBI", "ODI", None, "-"),
+        ("BBI", "T20", None, "-"),
+    ]
+    assert {r["player_id"] for r in rows} == {7710}
+    assert [r["stat_order"] for r in rows] == [0, 0, 0, 2, 2, 2]
+    assert [r["format_order"] for r in rows[:3]] == [0, 1, 2]
+
+
+def test_parse_career_stats_empty_payload():
+    assert warehouse.parse_career_stats(1, "batting", {}) == []
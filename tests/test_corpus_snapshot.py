@@ -0,0 +1,107 @@
+import os
+
+import pandas as pd
+import pytest
+
+import corpus_snapshot
+import innings_store
+import pipeline
+
+pytest.importorskip("pyarrow")
+
+
+def batting_rows():
+
+    rows = []
+
+    for i in range(12):
+        fmt, year = ("T20", 2024) if i < 6 else ("ODI", 2025)
+        rows.append({
+            "match_id": 100 + i, "innings_id": 1, "position": 1,
+            "player_id": 1, "player_name": "Alpha",
+            "runs": 10 * (i + 1), "balls": 10 * (i + 1), "strike_rate": 100.0,
+            "date": pd.Timestamp(f"{year}-0{i % 6 + 1}-01").date(),
+            "match_format": fmt, "year": year,
+        })
+
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+
+    snapshot_dir = str(tmp_path / "snapshot")
+
+    corpus_snapshot._swap_dataset(batting_rows(), os.path.join(snapshot_dir, "batting"))
+
+    with open(os.path.join(snapshot_dir, "_signature"), "w") as f:
+        f.write("v1")
+
+    monkeypatch.setattr(innings_store, "ARCHIVE_STORE_DIR", str(tmp_path / "archive"))
+
+    return snapshot_dir
+
+
+def test_read_snapshot_prunes_partitions_and_columns(snapshot):
+
+    df = corpus_snapshot.read_snapshot(
+        "batting", columns=["match_id", "runs"], formats=["T20"], snapshot_dir=snapshot
+    )
+
+    assert list(df.columns) == ["match_id", "runs"]
+    assert sorted(df["match_id"]) == list(range(100, 106))
+
+    df = corpus_snapshot.read_snapshot("batting", columns=["match_id"], years=[2025], snapshot_dir=snapshot)
+    assert sorted(df["match_id"]) == list(range(106, 112))
+
+    assert corpus_snapshot.read_snapshot("batting", formats=["TEST"], snapshot_dir=snapshot).empty
+
+
+def test_snapshot_store_slices(snapshot):
+
+    full = innings_store.InningsStore(innings_store.build_snapshot_store(snapshot_dir=snapshot))
+    t20 = innings_store.InningsStore(innings_store.build_snapshot_store(["T20"], snapshot_dir=snapshot))
+
+    assert len(full) == 12
+    assert full.innings(1, last=1)["match_id"].tolist() == [111]
+
+    assert len(t20) == 6
+    assert t20.innings(1)["match_id"].tolist() == list(range(100, 106))
+    assert os.path.basename(t20.store_dir) == "T20"
+
+
+def test_snapshot_store_is_rebuilt_only_when_the_snapshot_changes(snapshot):
+
+    store_dir = innings_store.build_snapshot_store(snapshot_dir=snapshot)
+    built = os.stat(os.path.join(store_dir, "meta.json")).st_mtime_ns
+
+    assert innings_store.build_snapshot_store(snapshot_dir=snapshot) == store_dir
+    assert os.stat(os.path.join(store_dir, "meta.json")).st_mtime_ns == built
+
+    with open(os.path.join(snapshot, "_signature"), "w") as f:
+        f.write("v2")
+
+    innings_store.build_snapshot_store(snapshot_dir=snapshot)
+    assert os.stat(os.path.join(store_dir, "meta.json")).st_mtime_ns != built
+
+
+def test_pair_ranking_matches_the_pair_stats_query():
+
+    def part(a, b, runs):
+        return {"bat1_id": a, "bat1_name": f"P{a}", "bat2_id": b, "bat2_name": f"P{b}", "total_runs": runs}
+
+    rows = (
+        [part(1, 2, 60)] * 3 + [part(2, 1, 10)] * 2             # pair (1,2), either order
+        + [part(3, 4, 60)] * 3 + [part(4, 3, 10)] * 2           # same ratios: tied rank
+        + [part(5, 6, 5)] * 5
+        + [part(7, 8, 100)] * 4                                 # only four: left out
+        + [part(1, None, 100)] * 5                              # unknown batter: left out
+    )
+
+    df = pipeline._pair_ranking(pd.DataFrame(rows))
+
+    assert df[["player1", "player2"]].values.tolist() == [["P1", "P2"], ["P3", "P4"], ["P5", "P6"]]
+    assert df["rank"].tolist() == [1, 1, 3]
+    assert df.iloc[0][["total_partnerships", "fifty_plus", "highest_partnership"]].tolist() == [5, 3, 60]
+    assert df.iloc[0]["avg_partnership"] == 40.0
+    assert df.iloc[0]["success_rate"] == 60.0
@@ -0,0 +1,94 @@
+import pandas as pd
+
+import warehouse
+
+
+def parse(*dismissals):
+    return warehouse.parse_dismissals(pd.Series(dismissals))
+
+
+def events(*dismissals):
+    batting = pd.DataFrame({
+        "match_id": 1,
+        "innings_id": 1,
+        "position": range(1, len(dismissals) + 1),
+        "dismissal": dismissals,
+    })
+    df = warehouse.fielding_events_frame(batting)
+    return list(df[["position", "kind", "fielder_name", "is_substitute"]].itertuples(index=False, name=None))
+
+
+def test_caught():
+
+    row = parse("c McSweeney b Mitchell Starc").iloc[0]
+
+    assert row["kind"] == "caught"
+    assert row["fielders"] == "McSweeney"
+    assert row["bowler"] == "Mitchell Starc"
+
+
+def test_caught_and_bowled():
+
+    df = parse("c & b Cummins", "c and b Lyon")
+
+    assert df["kind"].tolist() == ["caught and bowled"] * 2
+    assert df["bowler"].tolist() == ["Cummins", "Lyon"]
+    assert events("c & b Cummins") == [(1, "caught and bowled", "Cummins", False)]
+
+
+def test_substitute_fielder():
+
+    assert events("c (sub)Abbott b Starc", "c sub (Abbott) b Starc") == [
+        (1, "caught", "Abbott", True),
+        (2, "caught", "Abbott", True),
+    ]
+
+
+def test_run_out():
+
+    row = parse("run out (Cummins/Alex Carey)").iloc[0]
+
+    assert row["kind"] == "run out"
+    assert pd.isna(row["bowler"])
+
+    assert events("run out (Cummins/Alex Carey)") == [
+        (1, "run out", "Cummins", False),
+        (1, "run out", "Alex Carey", False),
+    ]
+
+
+def test_run_out_by_substitute():
+
+    assert events("run out ((sub)Abbott/Carey)") == [
+        (1, "run out", "Abbott", True),
+        (1, "run out", "Carey", False),
+    ]
+
+
+def test_other_kinds_and_not_out():
+
+    df = parse("st Alex Carey b Lyon", "lbw b Hazlewood", "b Starc", "hit wicket b Zampa", "not out", "", None)
+
+    assert df["kind"].tolist()[:4] == ["stumped", "lbw", "bowled", "hit wicket"]
+    assert df["kind"].iloc[4:].isna().all()
+
+    # only the stumping credits a fielder
+    assert events("st Alex Carey b Lyon", "lbw b Hazlewood", "b Starc", "not out") == [
+        (1, "stumped", "Alex Carey", False),
+    ]
+
+
+def test_player_index_resolves_surnames_within_a_match():
+
+    index = warehouse.PlayerIndex(
+        {1: "Mitchell Starc", 2: "Mitchell Marsh", 3: "Shaun Marsh"},
+        [("mitchell starc", 1), ("starc", 1), ("mitchell marsh", 2), ("shaun marsh", 3)],
+    )
+
+    assert index.resolve("Starc") == 1
+    assert index.resolve("Mitchell  Marsh") == 2
+
+    # a bare surname is ambiguous until narrowed to the match's players
+    assert index.resolve("Marsh") is None
+    assert index.resolve("Marsh", among={1, 3}) == 3
+    assert index.resolve("Cummins") is None
@@ -0,0 +1,149 @@
+import pandas as pd
+import pytest
+
+import innings_store
+
+# player 1: ten innings, two per quarter over five quarters, runs 10..100
+# player 2: four innings in one quarter (too few for either table)
+DATES_1 = [
+    "2024-01-10", "2024-02-10", "2024-04-10", "2024-05-10", "2024-07-10",
+    "2024-08-10", "2024-10-10", "2024-11-10", "2025-01-10", "2025-02-10",
+]
+
+
+def innings_rows(dates_1=DATES_1):
+
+    rows = [
+        {
+            "player_id": 1, "player_name": "Alpha", "match_id": 101 + i,
+            "date": date, "runs": 10 * (i + 1), "balls": 10 * (i + 1),
+            "strike_rate": 100.0 if i < 5 else 150.0,
+        }
+        for i, date in enumerate(dates_1)
+    ]
+
+    rows += [
+        {
+            "player_id": 2, "player_name": "Beta", "match_id": 201 + i,
+            "date": "2024-03-01", "runs": 5, "balls": 10, "strike_rate": 50.0,
+        }
+        for i in range(4)
+    ]
+
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store_dir = str(tmp_path / "store")
+    innings_store.write_store(innings_rows(), store_dir)
+    return innings_store.InningsStore(store_dir)
+
+
+def test_innings_last_n_is_newest_slice_oldest_first(store):
+
+    cols = store.innings(1, last=3)
+
+    assert cols["match_id"].tolist() == [108, 109, 110]
+    assert cols["runs"].tolist() == [80, 90, 100]
+    assert 2 in store and 3 not in store
+    assert len(store.innings(3)["runs"]) == 0
+
+
+def test_form_table(store):
+
+    df = innings_store.form_table(store, short=5, long=10)
+
+    # Beta has only four innings
+    assert df["player"].tolist() == ["Alpha"]
+
+    row = df.iloc[0]
+    assert row["avg_last5"] == 80.0
+    assert row["avg_last10"] == 55.0
+    assert row["sr_last5"] == 150.0
+    assert row["sr_last10"] == 125.0
+    assert row["fifties"] == 6
+    assert row["std_dev"] == 30.28
+    assert row["consistency_score"] == 3.2
+    assert row["form_category"] == "Good Form"
+
+
+def test_form_table_respects_match_scope(store):
+
+    # without match 101 Alpha has nine innings left: below long=10
+    assert innings_store.form_table(store, match_ids=range(102, 111)).empty
+
+    df = innings_store.form_table(store, short=2, long=4, match_ids=range(201, 205))
+    assert df["player"].tolist() == ["Beta"]
+    assert df.iloc[0]["avg_last4"] == 5.0
+
+
+def test_quarterly_table(store):
+
+    df = innings_store.quarterly_table(store, min_quarters=3)
+
+    assert df["player"].unique().tolist() == ["Alpha"]
+    assert df["quarter"].tolist() == ["2024-Q1", "2024-Q2", "2024-Q3", "2024-Q4", "2025-Q1"]
+    assert df["avg_runs"].tolist() == [15.0, 35.0, 55.0, 75.0, 95.0]
+    assert df["avg_strike_rate"].tolist() == [100.0, 100.0, 125.0, 150.0, 150.0]
+    assert df["innings"].tolist() == [2] * 5
+
+    assert pd.isna(df["runs_delta"].iloc[0])
+    assert df["runs_delta"].iloc[1:].tolist() == [20.0] * 4
+    assert df["trend"].tolist() == ["Stable"] + ["Improving"] * 4
+    assert set(df["career_phase"]) == {"Career Ascending"}
+
+
+def test_quarterly_table_minimums(store):
+
+    assert innings_store.quarterly_table(store, min_quarters=6).empty
+
+    # every quarter has two innings: min_innings=3 leaves none
+    assert innings_store.quarterly_table(store, min_innings=3).empty
+
+    # Beta's single quarter qualifies once one quarter is enough
+    df = innings_store.quarterly_table(store, min_quarters=1)
+    assert sorted(df["player"].unique()) == ["Alpha", "Beta"]
+
+
+def test_quarterly_cache_follows_date_changes(store):
+
+    before = innings_store.quarterly_table(store)
+    assert before["quarter"].iloc[-1] == "2025-Q1"
+
+    # same innings, runs and strike rates; only the last date moves
+    moved = DATES_1[:-1] + ["2025-04-10"]
+    innings_store.write_store(innings_rows(moved), store.store_dir)
+
+    after = innings_store.quarterly_table(innings_store.InningsStore(store.store_dir))
+
+    assert after["quarter"].tolist()[-2:] == ["2025-Q1", "2025-Q2"]
+    assert after["avg_runs"].tolist()[-2:] == [90.0, 100.0]
+
+
+def test_quarterly_cache_follows_strike_rate_corrections(store):
+
+    innings_store.quarterly_table(store)
+
+    # a corrected scorecard: same runs, different balls and strike rate
+    df = innings_rows()
+    df.loc[df["match_id"] == 110, ["balls", "strike_rate"]] = [50, 200.0]
+    innings_store.write_store(df, store.store_dir)
+
+    after = innings_store.quarterly_table(innings_store.InningsStore(store.store_dir))
+
+    assert after["avg_strike_rate"].iloc[-1] == 175.0
+
+
+def test_quarterly_cache_is_bounded(store, monkeypatch):
+
+    monkeypatch.setattr(innings_store, "QUARTERLY_CACHE_SIZE", 2)
+    innings_store._quarterly.clear()
+
+    for min_quarters in (1, 2, 3):
+        df = innings_store.quarterly_table(store, min_quarters=min_quarters)
+
+    # Beta drops out at min_quarters=3; only the two newest entries are kept
+    assert sorted(df["player"].unique()) == ["Alpha"]
+    assert len(innings_store._quarterly) == 2
+    assert all(key[2] == 3 for key in innings_store._quarterly)
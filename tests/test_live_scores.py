@@ -0,0 +1,131 @@
+import live_scores
+
+
+def match(match_id, runs, state="In Progress", status="Day 1"):
+    return {
+        "matchInfo": {
+            "matchId": match_id,
+            "state": state,
+            "status": status,
+            "startDate": "1700000000000",
+            "endDate": "1700000000000",
+            "team1": {"teamName": "India"},
+            "team2": {"teamName": "Australia"},
+        },
+        "matchScore": {
+            "team1Score": {"inngs1": {"runs": runs, "wickets": 1, "overs": 10.2}},
+        },
+    }
+
+
+def payload(*matches):
+    return {"typeMatches": [{"seriesMatches": [{"seriesAdWrapper": {"matches": list(matches)}}]}]}
+
+
+def poller(*payloads):
+    feed = iter(payloads)
+    return live_scores.LivePoller(fetch=lambda: next(feed))
+
+
+def test_first_poll_is_full_state():
+
+    p = poller(payload(match(1, 10), match(2, 5)))
+
+    assert sorted(p.poll()) == [1, 2]
+
+    version, changed, removed = p.changes(0)
+    assert version == 1
+    assert sorted(changed) == [1, 2]
+    assert changed[1]["Team1 Runs"] == 10
+    assert removed == []
+
+
+def test_unchanged_poll_keeps_version():
+
+    p = poller(payload(match(1, 10)), payload(match(1, 10)))
+    p.poll()
+
+    assert p.poll() == []
+    assert p.version == 1
+    assert p.changes(1) == (1, {}, [])
+
+
+def test_delta_holds_only_changed_matches():
+
+    p = poller(payload(match(1, 10), match(2, 5)), payload(match(1, 14), match(2, 5)))
+    p.poll()
+    seen = p.version
+
+    assert p.poll() == [1]
+
+    version, changed, removed = p.changes(seen)
+    assert version == seen + 1
+    assert list(changed) == [1]
+    assert changed[1]["Team1 Runs"] == 14
+    assert removed == []
+
+
+def test_state_or_status_change_counts():
+
+    p = poller(payload(match(1, 10)), payload(match(1, 10, status="Stumps")))
+    p.poll()
+
+    assert p.poll() == [1]
+
+
+def test_removed_match_is_reported_once_and_can_return():
+
+    p = poller(payload(match(1, 10), match(2, 5)), payload(match(1, 10)), payload(match(1, 10), match(2, 5)))
+    p.poll()
+    seen = p.version
+
+    assert p.poll() == [2]
+
+    version, changed, removed = p.changes(seen)
+    assert changed == {} and removed == [2]
+
+    # the full state never lists removals
+    assert p.changes(0)[2] == []
+
+    # nothing new after the removal was seen
+    assert p.changes(version) == (version, {}, [])
+
+    assert p.poll() == [2]
+    version, changed, removed = p.changes(version)
+    assert list(changed) == [2] and removed == []
+
+
+def test_failed_fetch_keeps_last_state():
+
+    p = poller(payload(match(1, 10)), {})
+    p.poll()
+
+    assert p.poll() == []
+    assert p.version == 1
+    assert list(p.changes(0)[1]) == [1]
+
+
+def test_removals_are_capped_and_stale_viewers_resync(monkeypatch):
+
+    monkeypatch.setattr(live_scores, "LIVE_REMOVED_KEEP", 2)
+
+    # matches 1..4 leave the live list one poll at a time; 5 stays
+    polls = [payload(*[match(i, 10) for i in range(n, 6)]) for n in range(1, 6)]
+    p = poller(*polls)
+
+    p.poll()
+    first = p.version
+
+    for _ in range(4):
+        p.poll()
+
+    assert sorted(p.removed) == [3, 4]
+
+    # a viewer from before the dropped removals gets the full state back
+    version, changed, removed = p.changes(first)
+    assert removed is None
+    assert list(changed) == [5]
+
+    # one whose removals are all still known gets a normal delta
+    version, changed, removed = p.changes(version - 1)
+    assert changed == {} and removed == [4]
@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+
+import pytest
+
+import pipeline
+import warehouse
+
+
+class FakeEngine:
+
+    @contextmanager
+    def begin(self):
+        yield object()
+
+    connect = begin
+
+
+@pytest.fixture
+def stamps(monkeypatch):
+    """refresh/<name> sources stamped through warehouse.record_ingest."""
+
+    stamped = []
+
+    monkeypatch.setattr(pipeline, "get_engine", lambda: FakeEngine())
+    monkeypatch.setattr(warehouse, "create_schema", lambda conn: None)
+    monkeypatch.setattr(warehouse, "record_ingest", lambda conn, source, rows, mark=None: stamped.append(source))
+    monkeypatch.setattr(warehouse, "ingest_ages", lambda conn: {s: 0 for s in stamped})
+
+    return stamped
+
+
+@pytest.mark.parametrize("result", [None, [], [1, 2], 0])
+def test_successful_build_is_stamped(stamps, result):
+
+    pipeline.run_refresh_job("job", lambda: result)
+
+    assert stamps == ["refresh/job"]
+
+
+def test_failed_build_is_not_stamped(stamps):
+
+    pipeline.run_refresh_job("job", lambda: False)
+
+    assert stamps == []
+
+
+def test_no_engine_skips_the_build(stamps, monkeypatch):
+
+    monkeypatch.setattr(pipeline, "get_engine", lambda: None)
+    calls = []
+
+    pipeline.run_refresh_job("job", lambda: calls.append(1))
+    pipeline._ensure_ingested("job", lambda: calls.append(1))
+
+    assert calls == [] and stamps == []
+
+
+def test_ensure_ingested_retries_until_stamped(stamps, monkeypatch):
+
+    monkeypatch.setattr(pipeline, "INGEST_ON_READ", True)
+    results = iter([False, None])
+    calls = []
+
+    def build():
+        calls.append(1)
+        return next(results)
+
+    for _ in range(3):
+        pipeline._ensure_ingested("job", build)
+
+    # failed, then stamped, then never run again
+    assert len(calls) == 2
+    assert stamps == ["refresh/job"]
+
+
+def test_ensure_ingested_off_never_builds(stamps, monkeypatch):
+
+    monkeypatch.setattr(pipeline, "INGEST_ON_READ", False)
+
+    pipeline._ensure_ingested("job", lambda: pytest.fail("built"))
+
+
+@pytest.mark.parametrize("build", [
+    pipeline._build_recent_matches,
+    lambda: pipeline._build_series_scorecards(3641),
+    pipeline._build_q15_close_match_scorecards,
+])
+def test_failed_feed_fetch_returns_false(stamps, monkeypatch, build):
+
+    monkeypatch.setattr(pipeline, "safe_api_call", lambda *a, **k: {})
+    monkeypatch.setattr(warehouse, "series_match_infos", lambda series_id: [])
+
+    assert build() is False
+
+
+def test_missing_scorecards_fail_the_build(stamps, monkeypatch):
+
+    monkeypatch.setattr(warehouse, "series_match_infos", lambda series_id: [{"matchId": 5}, {"matchId": 6}])
+    monkeypatch.setattr(warehouse, "load_match_infos", lambda conn, infos: None)
+    monkeypatch.setattr(warehouse, "ensure_scorecards", lambda engine, ids: [6])
+
+    pipeline.run_refresh_job("series_3641", lambda: pipeline._build_series_scorecards(3641))
+
+    assert stamps == []
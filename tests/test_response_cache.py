@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+import response_cache
+
+BASE = "https://cricbuzz-cricket.p.rapidapi.com"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+
+    now = [1_000_000.0]
+
+    monkeypatch.setattr(response_cache, "CACHE_DIR", str(tmp_path / "api_cache"))
+    monkeypatch.setattr(response_cache, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(response_cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+
+    return now
+
+
+@pytest.mark.parametrize("path, ttl", [
+    ("/matches/v1/live", 0),
+    ("/matches/v1/recent", 5 * response_cache.MINUTE),
+    ("/stats/v1/player/search?plrN=kohli", response_cache.DAY),
+    ("/stats/v1/player/1413/batting", response_cache.DAY),
+    ("/series/v1/7607", 6 * response_cache.HOUR),
+    ("/venues/v1/31", 7 * response_cache.DAY),
+    ("/news/v1/index", response_cache.DEFAULT_TTL),
+])
+def test_ttl_rules(path, ttl):
+    assert response_cache.ttl_for(BASE + path) == ttl
+
+
+def test_entries_expire_after_their_ttl(cache):
+
+    url = BASE + "/matches/v1/recent"
+    response_cache.put(url, None, {"typeMatches": []})
+
+    cache[0] += 5 * response_cache.MINUTE - 1
+    assert response_cache.get(url) == {"typeMatches": []}
+
+    cache[0] += 1
+    assert response_cache.get(url) is None
+    assert response_cache.purge_expired() == 1
+
+
+def test_params_are_part_of_the_key(cache):
+
+    url = BASE + "/stats/v1/player/search"
+    response_cache.put(url, {"plrN": "kohli"}, {"player": [{"id": "1413"}]})
+
+    assert response_cache.get(url, {"plrN": "kohli"}) == {"player": [{"id": "1413"}]}
+    assert response_cache.get(url, {"plrN": "rohit"}) is None
+
+
+def test_live_feed_and_empty_payloads_are_not_stored(cache):
+
+    response_cache.put(BASE + "/matches/v1/live", None, {"typeMatches": [1]})
+    response_cache.put(BASE + "/matches/v1/recent", None, {})
+
+    assert response_cache.get(BASE + "/matches/v1/live") is None
+    assert response_cache.get(BASE + "/matches/v1/recent") is None
+    assert not os.path.exists(response_cache.CACHE_DIR)
+
+
+def test_disabled_cache_neither_reads_nor_writes(cache, monkeypatch):
+
+    monkeypatch.setattr(response_cache, "CACHE_ENABLED", False)
+
+    response_cache.put(BASE + "/teams/v1/international", None, {"list": [1]})
+
+    assert response_cache.get(BASE + "/teams/v1/international") is None
+
+
+# ---------- FINAL: match payloads by state ----------
+@pytest.mark.parametrize("payload, final", [
+    ({"ismatchcomplete": True}, True),
+    ({"state": "Complete"}, True),
+    ({"state": "In Progress", "ismatchcomplete": False}, False),
+    ({"state": "Stumps"}, False),
+    ({}, False),
+])
+def test_is_final(payload, final):
+    assert response_cache.is_final(payload) is final
+
+
+def test_completed_scorecards_never_expire(cache):
+
+    url = BASE + "/mcenter/v1/100/scard"
+    assert response_cache.ttl_for(url, {"ismatchcomplete": True}) is None
+
+    response_cache.put(url, None, {"ismatchcomplete": True, "scorecard": [1]})
+    cache[0] += 365 * response_cache.DAY
+
+    assert response_cache.get(url) == {"ismatchcomplete": True, "scorecard": [1]}
+    assert response_cache.purge_expired() == 0
+
+
+def test_live_match_payloads_get_the_live_ttl(cache):
+
+    url = BASE + "/mcenter/v1/100"
+    live = {"state": "In Progress", "ismatchcomplete": False}
+
+    assert response_cache.ttl_for(url, live) == response_cache.LIVE_MATCH_TTL
+    assert response_cache.ttl_for(url) == response_cache.LIVE_MATCH_TTL
+
+    response_cache.put(url, None, live)
+    cache[0] += response_cache.LIVE_MATCH_TTL
+
+    assert response_cache.get(url) is None
+
+
+def test_archived_scorecards_are_served_only_when_final(cache, tmp_path):
+
+    (tmp_path / "match_100.json").write_text('{"ismatchcomplete": true, "scorecard": []}')
+    (tmp_path / "match_200.json").write_text('{"ismatchcomplete": false, "scorecard": []}')
+
+    assert response_cache.get(BASE + "/mcenter/v1/100/scard") == {"ismatchcomplete": True, "scorecard": []}
+    assert response_cache.get(BASE + "/mcenter/v1/200/scard") is None
+    assert response_cache.get(BASE + "/mcenter/v1/100") is None
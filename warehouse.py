@@ -0,0 +1,2545 @@
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from psycopg2.extras import execute_values
+from sqlalchemy import event
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+import api_client
+
+try:
+    import orjson                   # in requirements.txt; json is the fallback
+except ImportError:
+    orjson = None
+
+# =====================================================
+# NORMALIZED SCORECARD WAREHOUSE
+# matches -> innings -> batting / bowling / partnerships / fall of wickets
+# Each scorecard is parsed once and upserted per match; the
+# scorecard-based questions query these tables instead of
+# writing their own throwaway copies.
+# =====================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+# ============================
+# PAIR STATS
+# Running per-pair partnership totals, keyed by the two batters'
+# ids (lower id first) and the match's scope: "archive" for members
+# of the data/ archive feed, else the source that first stored the
+# match. Triggers on partnerships keep them current from each
+# statement's rows only; triggers on feed_matches move a match's
+# pairs when it joins or leaves the archive feed.
+# ============================
+PAIR_SCOPE_SQL = """
+    CASE WHEN EXISTS (
+        SELECT 1 FROM feed_matches f
+        WHERE f.feed = 'archive' AND f.match_id = m.match_id
+    ) THEN 'archive' ELSE COALESCE(m.source, 'api') END
+"""
+
+# {rows}: the partnership rows; {source}: their scope expression
+PAIR_ROWS_SQL = """
+    SELECT
+        {source} AS source,
+        LEAST(p.bat1_id, p.bat2_id) AS player1_id,
+        GREATEST(p.bat1_id, p.bat2_id) AS player2_id,
+        MIN(CASE WHEN p.bat1_id <= p.bat2_id THEN p.bat1_name ELSE p.bat2_name END) AS player1,
+        MIN(CASE WHEN p.bat1_id <= p.bat2_id THEN p.bat2_name ELSE p.bat1_name END) AS player2,
+        COUNT(*) AS partnerships,
+        SUM(p.total_runs) AS total_runs,
+        MAX(p.total_runs) AS highest,
+        COUNT(*) FILTER (WHERE p.total_runs >= 50) AS fifty_plus
+    FROM {rows} p
+    JOIN matches m
+        ON m.match_id = p.match_id
+    WHERE p.bat1_id IS NOT NULL
+      AND p.bat2_id IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+PAIR_UPSERT_SQL = """
+    INSERT INTO pair_stats AS s (
+        source, player1_id, player2_id, player1, player2,
+        partnerships, total_runs, highest, fifty_plus
+    )
+    """ + PAIR_ROWS_SQL + """
+    ON CONFLICT (source, player1_id, player2_id) DO UPDATE SET
+        player1 = EXCLUDED.player1,
+        player2 = EXCLUDED.player2,
+        partnerships = s.partnerships + EXCLUDED.partnerships,
+        total_runs = s.total_runs + EXCLUDED.total_runs,
+        highest = GREATEST(s.highest, EXCLUDED.highest),
+        fifty_plus = s.fifty_plus + EXCLUDED.fifty_plus
+"""
+
+# take rows back out; only a removed maximum needs a look at the
+# pair's remaining partnerships (in their current scope)
+PAIR_REMOVE_SQL = """
+    WITH gone AS (""" + PAIR_ROWS_SQL + """)
+    UPDATE pair_stats s SET
+        partnerships = s.partnerships - g.partnerships,
+        total_runs = s.total_runs - g.total_runs,
+        fifty_plus = s.fifty_plus - g.fifty_plus,
+        highest = CASE WHEN g.highest < s.highest THEN s.highest ELSE (
+            SELECT MAX(p.total_runs)
+            FROM partnerships p
+            JOIN matches m
+                ON m.match_id = p.match_id
+            WHERE LEAST(p.bat1_id, p.bat2_id) = s.player1_id
+              AND GREATEST(p.bat1_id, p.bat2_id) = s.player2_id
+              AND """ + PAIR_SCOPE_SQL + """ = s.source
+        ) END
+    FROM gone g
+    WHERE s.source = g.source
+      AND s.player1_id = g.player1_id
+      AND s.player2_id = g.player2_id;
+
+    DELETE FROM pair_stats WHERE partnerships <= 0
+"""
+
+# partnerships of the matches in a feed_matches transition table
+ARCHIVE_FEED_ROWS = """(
+    SELECT p.* FROM partnerships p
+    WHERE p.match_id IN (SELECT match_id FROM {table} WHERE feed = 'archive')
+)"""
+
+PAIR_EVENTS = [
+    ("ins", "INSERT", "NEW TABLE AS new_rows"),
+    ("del", "DELETE", "OLD TABLE AS old_rows"),
+    ("upd", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+]
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS matches (
+        match_id BIGINT PRIMARY KEY,
+        series_id BIGINT,
+        series_name TEXT,
+        match_desc TEXT,
+        match_format TEXT,
+        start_date TIMESTAMP,
+        state TEXT,
+        status TEXT,
+        team1 TEXT,
+        team2 TEXT,
+        venue TEXT,
+        city TEXT,
+        country TEXT,
+        toss_winner TEXT,
+        toss_decision TEXT,
+        winner TEXT,
+        is_complete BOOLEAN,
+        source TEXT,
+        scorecard_updated BIGINT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS innings (
+        match_id BIGINT REFERENCES matches (match_id) ON DELETE CASCADE,
+        innings_id INT,
+        bat_team TEXT,
+        bat_team_short TEXT,
+        score INT,
+        wickets INT,
+        overs NUMERIC,
+        run_rate NUMERIC,
+        extras INT,
+        is_declared BOOLEAN,
+        is_follow_on BOOLEAN,
+        PRIMARY KEY (match_id, innings_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS batting_entries (
+        match_id BIGINT,
+        innings_id INT,
+        position INT,
+        player_id BIGINT,
+        player_name TEXT,
+        runs INT,
+        balls INT,
+        fours INT,
+        sixes INT,
+        strike_rate NUMERIC,
+        dismissal TEXT,
+        is_captain BOOLEAN,
+        is_keeper BOOLEAN,
+        PRIMARY KEY (match_id, innings_id, position),
+        FOREIGN KEY (match_id, innings_id)
+            REFERENCES innings (match_id, innings_id) ON DELETE CASCADE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bowling_entries (
+        match_id BIGINT,
+        innings_id INT,
+        position INT,
+        player_id BIGINT,
+        player_name TEXT,
+        overs NUMERIC,
+        balls INT,
+        maidens INT,
+        runs INT,
+        wickets INT,
+        economy NUMERIC,
+        PRIMARY KEY (match_id, innings_id, position),
+        FOREIGN KEY (match_id, innings_id)
+            REFERENCES innings (match_id, innings_id) ON DELETE CASCADE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS partnerships (
+        match_id BIGINT,
+        innings_id INT,
+        wicket_no INT,
+        bat1_id BIGINT,
+        bat1_name TEXT,
+        bat1_runs INT,
+        bat2_id BIGINT,
+        bat2_name TEXT,
+        bat2_runs INT,
+        total_runs INT,
+        total_balls INT,
+        PRIMARY KEY (match_id, innings_id, wicket_no),
+        FOREIGN KEY (match_id, innings_id)
+            REFERENCES innings (match_id, innings_id) ON DELETE CASCADE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fall_of_wickets (
+        match_id BIGINT,
+        innings_id INT,
+        wicket_no INT,
+        player_id BIGINT,
+        player_name TEXT,
+        over_nbr NUMERIC,
+        ball_nbr INT,
+        team_runs INT,
+        PRIMARY KEY (match_id, innings_id, wicket_no),
+        FOREIGN KEY (match_id, innings_id)
+            REFERENCES innings (match_id, innings_id) ON DELETE CASCADE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS feed_matches (
+        feed TEXT,
+        match_id BIGINT REFERENCES matches (match_id) ON DELETE CASCADE,
+        PRIMARY KEY (feed, match_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ingest_state (
+        source TEXT PRIMARY KEY,
+        high_water BIGINT,
+        rows_written INT,
+        updated_at TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS archive_files (
+        match_id BIGINT PRIMARY KEY,
+        path TEXT,
+        mtime_ns BIGINT,
+        size BIGINT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS table_changes (
+        table_name TEXT PRIMARY KEY,
+        changed_at TIMESTAMP NOT NULL,
+        version BIGINT NOT NULL DEFAULT 0
+    );
+    """,
+    # tables created before the version column (checked first: ALTER
+    # would wait on every open writer of table_changes)
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = 'table_changes' AND column_name = 'version'
+        ) THEN
+            ALTER TABLE table_changes ADD COLUMN version BIGINT NOT NULL DEFAULT 0;
+        END IF;
+    END
+    $$;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS answer_views (
+        view_name TEXT PRIMARY KEY,
+        definition TEXT NOT NULL,
+        sources TEXT[] NOT NULL,
+        source_marks JSONB,
+        refreshed_at TIMESTAMP
+    );
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = 'answer_views' AND column_name = 'source_marks'
+        ) THEN
+            ALTER TABLE answer_views ADD COLUMN source_marks JSONB;
+        END IF;
+    END
+    $$;
+    """,
+    # statement trigger body for watched tables: only statements that
+    # actually touched rows count as a change. version is bumped under
+    # the table's table_changes row lock, so it grows in commit order
+    # (a statement timestamp does not: an older stamp can commit later)
+    """
+    CREATE OR REPLACE FUNCTION note_table_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'TRUNCATE' THEN
+            IF NOT EXISTS (SELECT 1 FROM changed_rows) THEN
+                RETURN NULL;
+            END IF;
+        END IF;
+
+        INSERT INTO table_changes (table_name, changed_at, version)
+        VALUES (TG_TABLE_NAME, clock_timestamp(), 1)
+        ON CONFLICT (table_name) DO UPDATE SET
+            changed_at = EXCLUDED.changed_at,
+            version = table_changes.version + 1;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pair_stats (
+        source TEXT,
+        player1_id BIGINT,
+        player2_id BIGINT,
+        player1 TEXT,
+        player2 TEXT,
+        partnerships INT NOT NULL,
+        total_runs BIGINT NOT NULL,
+        highest INT,
+        fifty_plus INT NOT NULL,
+        PRIMARY KEY (source, player1_id, player2_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS players (
+        player_id BIGINT PRIMARY KEY,
+        full_name TEXT,
+        short_name TEXT,
+        nickname TEXT,
+        updated_at TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS player_aliases (
+        alias TEXT,
+        player_id BIGINT,
+        PRIMARY KEY (alias, player_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fielding_events (
+        match_id BIGINT,
+        innings_id INT,
+        position INT,
+        kind TEXT,
+        fielder_name TEXT,
+        fielder_id BIGINT,
+        is_substitute BOOLEAN,
+        PRIMARY KEY (match_id, innings_id, position, fielder_name),
+        FOREIGN KEY (match_id, innings_id)
+            REFERENCES innings (match_id, innings_id) ON DELETE CASCADE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS roster_teams (
+        team_id BIGINT PRIMARY KEY,
+        team_name TEXT,
+        team_short TEXT,
+        category TEXT,
+        list_order INT,
+        players_fetched_at TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS roster_players (
+        team_id BIGINT,
+        player_id BIGINT,
+        squad_order INT,
+        name TEXT,
+        role TEXT,
+        batting_style TEXT,
+        bowling_style TEXT,
+        PRIMARY KEY (team_id, player_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS player_career_stats (
+        player_id BIGINT,
+        discipline TEXT,
+        format TEXT,
+        stat TEXT,
+        value DOUBLE PRECISION,
+        raw TEXT,
+        format_order INT,
+        stat_order INT,
+        PRIMARY KEY (player_id, discipline, format, stat)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS career_stats_fetches (
+        player_id BIGINT,
+        discipline TEXT,
+        fetched_at TIMESTAMP,
+        PRIMARY KEY (player_id, discipline)
+    );
+    """,
+    # statement trigger body for partnerships: fold the inserted rows
+    # into pair_stats and take the deleted ones back out
+    f"""
+    CREATE OR REPLACE FUNCTION apply_pair_stats() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            DELETE FROM pair_stats;
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            {PAIR_REMOVE_SQL.format(rows="old_rows", source=PAIR_SCOPE_SQL)};
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            {PAIR_UPSERT_SQL.format(rows="new_rows", source=PAIR_SCOPE_SQL)};
+        END IF;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    # statement trigger body for feed_matches: a match joining the
+    # archive feed moves its pairs from its source scope to "archive",
+    # a match leaving it moves them back
+    f"""
+    CREATE OR REPLACE FUNCTION move_pair_scope() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            DELETE FROM pair_stats;
+            {PAIR_UPSERT_SQL.format(rows="partnerships", source=PAIR_SCOPE_SQL)};
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP = 'INSERT' THEN
+            {PAIR_REMOVE_SQL.format(rows=ARCHIVE_FEED_ROWS.format(table="new_rows"), source="COALESCE(m.source, 'api')")};
+            {PAIR_UPSERT_SQL.format(rows=ARCHIVE_FEED_ROWS.format(table="new_rows"), source=PAIR_SCOPE_SQL)};
+        ELSE
+            {PAIR_REMOVE_SQL.format(rows=ARCHIVE_FEED_ROWS.format(table="old_rows"), source="'archive'")};
+            {PAIR_UPSERT_SQL.format(rows=ARCHIVE_FEED_ROWS.format(table="old_rows"), source=PAIR_SCOPE_SQL)};
+        END IF;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_matches_series ON matches (series_id)",
+    "CREATE INDEX IF NOT EXISTS idx_matches_start_date ON matches (start_date)",
+    "CREATE INDEX IF NOT EXISTS idx_matches_source ON matches (source)",
+    "CREATE INDEX IF NOT EXISTS idx_batting_player_id ON batting_entries (player_id)",
+    "CREATE INDEX IF NOT EXISTS idx_batting_player_name ON batting_entries (player_name)",
+    "CREATE INDEX IF NOT EXISTS idx_bowling_player_id ON bowling_entries (player_id)",
+    "CREATE INDEX IF NOT EXISTS idx_partnerships_runs ON partnerships (total_runs)",
+    """
+    CREATE INDEX IF NOT EXISTS idx_partnerships_pair
+    ON partnerships (LEAST(bat1_id, bat2_id), GREATEST(bat1_id, bat2_id))
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_pair_stats_count ON pair_stats (source, partnerships)",
+    "CREATE INDEX IF NOT EXISTS idx_player_aliases_player ON player_aliases (player_id)",
+    "CREATE INDEX IF NOT EXISTS idx_fielding_fielder ON fielding_events (fielder_id)",
+    "CREATE INDEX IF NOT EXISTS idx_roster_teams_category ON roster_teams (category, list_order)",
+    "CREATE INDEX IF NOT EXISTS idx_roster_players_player ON roster_players (player_id)",
+    "CREATE INDEX IF NOT EXISTS idx_roster_players_role ON roster_players (role)",
+    "CREATE INDEX IF NOT EXISTS idx_career_stats_stat ON player_career_stats (discipline, stat, format)",
+]
+
+CHILD_TABLES = ["batting_entries", "bowling_entries", "partnerships", "fall_of_wickets"]
+
+MATCH_COLUMNS = [
+    "match_id", "series_id", "series_name", "match_desc", "match_format",
+    "start_date", "state", "status", "team1", "team2", "venue", "city",
+    "country", "toss_winner", "toss_decision", "winner", "is_complete", "source"
+]
+
+
+# databases (by URL) whose schema this process already created; the
+# DDL replaces functions and triggers, so it must not run on every call
+_schema_ready = set()
+
+
+def create_schema(conn):
+    """
+    Create / migrate the warehouse schema once per process and database.
+    The database counts as ready when the caller's transaction commits;
+    an advisory lock keeps two processes from running the DDL at once.
+    """
+
+    key = str(conn.engine.url)
+
+    if key in _schema_ready:
+        return
+
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('warehouse.create_schema'))"))
+
+    for stmt in SCHEMA_SQL:
+        conn.execute(text(stmt))
+
+    _install_pair_stats(conn)
+    _backfill_players(conn)
+    _backfill_fielding(conn)
+
+    event.listen(conn, "commit", lambda _: _schema_ready.add(key), once=True)
+
+
+def _has_trigger(conn, table, name):
+    return conn.execute(
+        text("SELECT 1 FROM pg_trigger WHERE tgrelid = to_regclass(:table) AND tgname = :name"),
+        {"table": table, "name": name}
+    ).scalar() is not None
+
+
+def _install_pair_stats(conn):
+    """
+    Attach the pair_stats triggers to partnerships and feed_matches and
+    rebuild the totals (once; again for tables that predate the
+    archive-feed scope).
+    """
+
+    installed = True
+
+    if not _has_trigger(conn, "partnerships", "pair_stats_trunc"):
+
+        installed = False
+
+        for suffix, op, tables in PAIR_EVENTS:
+            conn.execute(text(f"""
+                CREATE TRIGGER pair_stats_{suffix}
+                AFTER {op} ON partnerships
+                REFERENCING {tables}
+                FOR EACH STATEMENT EXECUTE FUNCTION apply_pair_stats()
+            """))
+
+        conn.execute(text("""
+            CREATE TRIGGER pair_stats_trunc
+            AFTER TRUNCATE ON partnerships
+            FOR EACH STATEMENT EXECUTE FUNCTION apply_pair_stats()
+        """))
+
+    if not _has_trigger(conn, "feed_matches", "pair_scope_trunc"):
+
+        installed = False
+
+        for suffix, op, tables in PAIR_EVENTS[:2]:
+            conn.execute(text(f"""
+                CREATE TRIGGER pair_scope_{suffix}
+                AFTER {op} ON feed_matches
+                REFERENCING {tables}
+                FOR EACH STATEMENT EXECUTE FUNCTION move_pair_scope()
+            """))
+
+        conn.execute(text("""
+            CREATE TRIGGER pair_scope_trunc
+            AFTER TRUNCATE ON feed_matches
+            FOR EACH STATEMENT EXECUTE FUNCTION move_pair_scope()
+        """))
+
+    if installed:
+        return
+
+    conn.execute(text("DELETE FROM pair_stats"))
+    conn.execute(text(PAIR_UPSERT_SQL.format(rows="partnerships", source=PAIR_SCOPE_SQL)))
+
+
+# ============================
+# PARSING HELPERS
+# ============================
+def _pick(d, *keys):
+    """First present key; Cricbuzz mixes camelCase and lowercase payloads."""
+    for k in keys:
+        if d.get(k) is not None:
+            return d[k]
+    return None
+
+
+def _int(val, default=0):
+    try:
+        return int(float(str(val).replace("*", "")))
+    except (TypeError, ValueError):
+        return default
+
+
+def _float(val, default=0.0):
+    try:
+        return float(str(val).replace("*", ""))
+    except (TypeError, ValueError):
+        return default
+
+
+def winner_from_status(status):
+    if isinstance(status, str) and " won" in status:
+        return status.split(" won")[0].strip()
+    return None
+
+
+def match_row(info, source="api"):
+    """Normalize a matchInfo (list feeds) or /mcenter/v1/{id} payload."""
+
+    venue = _pick(info, "venueInfo", "venueinfo") or {}
+    team1 = _pick(info, "team1") or {}
+    team2 = _pick(info, "team2") or {}
+
+    toss_winner = toss_decision = None
+    toss = _pick(info, "tossstatus", "tossStatus") or ""
+
+    if " opt to " in toss:
+        toss_winner, toss_decision = [t.strip() for t in toss.split(" opt to ", 1)]
+
+    start = _pick(info, "startDate", "startdate")
+    start_date = pd.to_datetime(_int(start), unit="ms").to_pydatetime() if start else None
+
+    state = _pick(info, "state")
+    status = _pick(info, "status")
+
+    return {
+        "match_id": _int(_pick(info, "matchId", "matchid")),
+        "series_id": _pick(info, "seriesId", "seriesid"),
+        "series_name": _pick(info, "seriesName", "seriesname"),
+        "match_desc": _pick(info, "matchDesc", "matchdesc"),
+        "match_format": _pick(info, "matchFormat", "matchformat"),
+        "start_date": start_date,
+        "state": state,
+        "status": status,
+        "team1": _pick(team1, "teamName", "teamname", "name"),
+        "team2": _pick(team2, "teamName", "teamname", "name"),
+        "venue": venue.get("ground"),
+        "city": venue.get("city"),
+        "country": venue.get("country"),
+        "toss_winner": toss_winner,
+        "toss_decision": toss_decision,
+        "winner": winner_from_status(status),
+        "is_complete": (state == "Complete") if state else None,
+        "source": source
+    }
+
+
+def _player_sighting(p):
+    return {
+        "player_id": _pick(p, "id"),
+        "name": _pick(p, "name"),
+        "nickname": _pick(p, "nickname", "nickName") or None
+    }
+
+
+def scorecard_rows(match_id, scard):
+    """
+    Flatten one /scard or /hscard payload into rows per warehouse table,
+    plus "players": every (id, name, nickname) seen, for upsert_players.
+    """
+
+    rows = {"innings": [], **{t: [] for t in CHILD_TABLES}, "players": []}
+
+    for innings in scard.get("scorecard", []):
+
+        iid = _int(innings.get("inningsid"))
+        extras = innings.get("extras") or {}
+
+        rows["innings"].append({
+            "match_id": match_id,
+            "innings_id": iid,
+            "bat_team": innings.get("batteamname"),
+            "bat_team_short": innings.get("batteamsname"),
+            "score": _int(innings.get("score")),
+            "wickets": _int(innings.get("wickets")),
+            "overs": _float(innings.get("overs")),
+            "run_rate": _float(innings.get("runrate")),
+            "extras": _int(extras.get("total")),
+            "is_declared": bool(innings.get("isdeclared")),
+            "is_follow_on": bool(innings.get("isfollowon"))
+        })
+
+        for pos, b in enumerate(innings.get("batsman", []), start=1):
+            rows["batting_entries"].append({
+                "match_id": match_id,
+                "innings_id": iid,
+                "position": pos,
+                "player_id": b.get("id"),
+                "player_name": b.get("name"),
+                "runs": _int(b.get("runs")),
+                "balls": _int(b.get("balls")),
+                "fours": _int(b.get("fours")),
+                "sixes": _int(b.get("sixes")),
+                "strike_rate": _float(b.get("strkrate")),
+                "dismissal": b.get("outdec") or "",
+                "is_captain": bool(b.get("iscaptain")),
+                "is_keeper": bool(b.get("iskeeper"))
+            })
+            rows["players"].append(_player_sighting(b))
+
+        for pos, bw in enumerate(innings.get("bowler", []), start=1):
+            rows["bowling_entries"].append({
+                "match_id": match_id,
+                "innings_id": iid,
+                "position": pos,
+                "player_id": bw.get("id"),
+                "player_name": bw.get("name"),
+                "overs": _float(bw.get("overs")),
+                "balls": _int(bw.get("balls")),
+                "maidens": _int(bw.get("maidens")),
+                "runs": _int(bw.get("runs")),
+                "wickets": _int(bw.get("wickets")),
+                "economy": _float(bw.get("economy"))
+            })
+            rows["players"].append(_player_sighting(bw))
+
+        partnership = (innings.get("partnership") or {}).get("partnership", [])
+
+        for wkt, p in enumerate(partnership, start=1):
+            rows["partnerships"].append({
+                "match_id": match_id,
+                "innings_id": iid,
+                "wicket_no": wkt,
+                "bat1_id": p.get("bat1id"),
+                "bat1_name": p.get("bat1name"),
+                "bat1_runs": _int(p.get("bat1runs")),
+                "bat2_id": p.get("bat2id"),
+                "bat2_name": p.get("bat2name"),
+                "bat2_runs": _int(p.get("bat2runs")),
+                "total_runs": _int(p.get("totalruns")),
+                "total_balls": _int(p.get("totalballs"))
+            })
+
+        fow = (innings.get("fow") or {}).get("fow", [])
+
+        for wkt, f in enumerate(fow, start=1):
+            rows["fall_of_wickets"].append({
+                "match_id": match_id,
+                "innings_id": iid,
+                "wicket_no": wkt,
+                "player_id": f.get("batsmanid"),
+                "player_name": f.get("batsmanname"),
+                "over_nbr": _float(f.get("overnbr")),
+                "ball_nbr": _int(f.get("ballnbr")),
+                "team_runs": _int(f.get("runs"))
+            })
+
+    return rows
+
+
+# ============================
+# BULK LOADING
+# One COPY FROM STDIN per batch instead of a round trip per row.
+# ============================
+COPY_NULL = r"\N"
+
+
+def _is_null(val):
+    return val is None or val is pd.NaT or (isinstance(val, float) and math.isnan(val))
+
+
+def _copy_buffer(values):
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    for row in values:
+        writer.writerow([COPY_NULL if _is_null(v) else v for v in row])
+
+    buf.seek(0)
+    return buf
+
+
+def bulk_load(conn, table, rows, columns=None):
+    """
+    Append rows (list of dicts, list of tuples or a DataFrame) to `table`
+    with a single COPY FROM STDIN; falls back to execute_values when the
+    COPY is rejected. Returns the number of rows sent.
+    """
+
+    frame = None
+
+    if isinstance(rows, pd.DataFrame):
+        columns = columns or list(rows.columns)
+        frame = rows
+        values = None
+    else:
+        rows = list(rows)
+        if rows and isinstance(rows[0], dict):
+            columns = columns or list(rows[0].keys())
+            values = [tuple(r.get(c) for c in columns) for r in rows]
+        else:
+            values = [tuple(r) for r in rows]
+
+    if (frame.empty if frame is not None else not values):
+        return 0
+
+    cols = ", ".join(f'"{c}"' for c in columns)
+
+    if frame is not None:
+        # DataFrames are serialized column-wise by pandas
+        buf = io.StringIO()
+        frame.to_csv(buf, header=False, index=False, na_rep=COPY_NULL)
+        buf.seek(0)
+    else:
+        buf = _copy_buffer(values)
+
+    try:
+        # savepoint, so a failed COPY does not abort the caller's transaction
+        with conn.begin_nested():
+            with conn.connection.cursor() as cur:
+                cur.copy_expert(
+                    f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                    buf
+                )
+        return len(frame) if frame is not None else len(values)
+
+    except Exception as e:
+        print(f" COPY into {table} failed, using execute_values:", e)
+
+    if values is None:
+        values = list(frame.itertuples(index=False, name=None))
+
+    with conn.connection.cursor() as cur:
+        execute_values(
+            cur,
+            f"INSERT INTO {table} ({cols}) VALUES %s",
+            [tuple(None if _is_null(v) else v for v in row) for row in values],
+            page_size=1000
+        )
+
+    return len(values)
+
+
+def to_sql_copy(pd_table, conn, keys, data_iter):
+    """`method=` for DataFrame.to_sql that writes through bulk_load."""
+
+    table = f"{pd_table.schema}.{pd_table.name}" if pd_table.schema else pd_table.name
+    return bulk_load(conn, table, data_iter, columns=list(keys))
+
+
+# ============================
+# LOADING
+# ============================
+
+
+def upsert_matches(conn, rows):
+    """
+    Insert match rows; on conflict fill in whatever the new row knows.
+    Rows that would not change anything are left untouched.
+    """
+
+    if not rows:
+        return 0
+
+    update_cols = [c for c in MATCH_COLUMNS if c not in ("match_id", "source")]
+
+    updates = ", ".join(
+        f"{c} = COALESCE(EXCLUDED.{c}, matches.{c})" for c in update_cols
+    )
+    current = ", ".join(f"matches.{c}" for c in update_cols)
+    incoming = ", ".join(f"COALESCE(EXCLUDED.{c}, matches.{c})" for c in update_cols)
+
+    result = conn.execute(
+        text(f"""
+            INSERT INTO matches ({', '.join(MATCH_COLUMNS)})
+            VALUES ({', '.join(':' + c for c in MATCH_COLUMNS)})
+            ON CONFLICT (match_id) DO UPDATE SET {updates}
+            WHERE ({current}) IS DISTINCT FROM ({incoming})
+        """),
+        [{c: r.get(c) for c in MATCH_COLUMNS} for r in rows]
+    )
+
+    return result.rowcount
+
+
+def load_match_infos(conn, infos, source="api"):
+    rows = [match_row(info, source) for info in infos if info]
+    upsert_matches(conn, [r for r in rows if r["match_id"]])
+
+
+def backfill_match_info(engine, feed):
+    """
+    Fetch /mcenter/v1/{id} for the feed's matches that have no start
+    date yet (e.g. archived scorecards without a match info entry).
+    Returns the number of matches fetched.
+    """
+
+    with engine.connect() as conn:
+        missing = [
+            r[0] for r in conn.execute(
+                text("""
+                    SELECT f.match_id
+                    FROM feed_matches f
+                    JOIN matches m
+                        ON m.match_id = f.match_id
+                    WHERE f.feed = :feed AND m.start_date IS NULL
+                """),
+                {"feed": feed}
+            )
+        ]
+
+    # like the archive's q22 info: the scorecard's result stays authoritative
+    rows = [
+        {**match_row(info, feed), "status": None, "winner": None}
+        for _, info in api_client.fetch_match_info(missing)
+        if info
+    ]
+
+    with engine.begin() as conn:
+        upsert_matches(conn, [r for r in rows if r["match_id"]])
+
+    return len(missing)
+
+
+def load_scorecard(conn, match_id, scard, source="api"):
+    """
+    Replace one match's innings-level rows from its scorecard.
+    Skips the write when the stored copy is already this fresh.
+    """
+
+    match_id = int(match_id)
+    last_updated = _int(scard.get("responselastupdated"))
+
+    stored = conn.execute(
+        text("SELECT scorecard_updated FROM matches WHERE match_id = :mid"),
+        {"mid": match_id}
+    ).scalar()
+
+    if stored is not None and stored >= last_updated:
+        return False
+
+    status = scard.get("status")
+
+    upsert_matches(conn, [{
+        "match_id": match_id,
+        "status": status,
+        "winner": winner_from_status(status),
+        "is_complete": scard.get("ismatchcomplete"),
+        "source": source
+    }])
+
+    conn.execute(text("DELETE FROM innings WHERE match_id = :mid"), {"mid": match_id})
+
+    rows = scorecard_rows(match_id, scard)
+
+    bulk_load(conn, "innings", rows["innings"])
+    for table in CHILD_TABLES:
+        bulk_load(conn, table, rows[table])
+
+    upsert_players(conn, rows["players"])
+
+    bulk_load(conn, "fielding_events", fielding_events_frame(pd.DataFrame(rows["batting_entries"])))
+    resolve_fielders(conn, [match_id])
+
+    conn.execute(
+        text("UPDATE matches SET scorecard_updated = :ts WHERE match_id = :mid"),
+        {"ts": last_updated, "mid": match_id}
+    )
+
+    return True
+
+
+def missing_scorecards(engine, match_ids):
+    """The match ids (deduplicated, in order) whose final scorecard is not yet loaded."""
+
+    ids = list(dict.fromkeys(int(m) for m in match_ids if m))
+
+    if not ids:
+        return []
+
+    with engine.begin() as conn:
+        create_schema(conn)
+        loaded = {
+            r[0] for r in conn.execute(
+                text("""
+                    SELECT match_id FROM matches
+                    WHERE match_id = ANY(:ids)
+                      AND scorecard_updated IS NOT NULL
+                      AND is_complete
+                """),
+                {"ids": ids}
+            )
+        }
+
+    return [m for m in ids if m not in loaded]
+
+
+def ensure_scorecards(engine, match_ids, kind="scard"):
+    """
+    Fetch and load scorecards for matches not yet (finally) in the
+    warehouse. Returns the ids whose scorecard could not be fetched.
+    """
+
+    missing = missing_scorecards(engine, match_ids)
+    failed = []
+
+    for mid, scard in api_client.fetch_scorecards(missing, kind=kind):
+
+        if not scard:
+            failed.append(mid)
+            continue
+
+        with engine.begin() as conn:
+            load_scorecard(conn, mid, scard)
+
+    return failed
+
+
+def series_match_infos(series_id):
+    """matchInfo dicts for every match listed under /series/v1/{id}."""
+
+    return parse_series_infos(api_client.fetch_json(f"{api_client.BASE_URL}/series/v1/{series_id}"))
+
+
+def parse_series_infos(data):
+    """matchInfo dicts of a /series/v1/{id} payload."""
+
+    infos = []
+
+    for block in data.get("matchDetails", []):
+        match_map = block.get("matchDetailsMap") or {}
+        for match in match_map.get("match", []):
+            info = match.get("matchInfo") or {}
+            if info.get("matchId"):
+                infos.append(info)
+
+    return infos
+
+
+# ============================
+# INCREMENTAL INGESTION
+# ingest_state keeps one high-water mark per API source so
+# repeat runs only write what is new or has changed.
+# ============================
+def high_water(conn, source):
+    return conn.execute(
+        text("SELECT high_water FROM ingest_state WHERE source = :source"),
+        {"source": source}
+    ).scalar()
+
+
+def record_ingest(conn, source, rows_written, mark=None):
+    """Store a run's row count; the high-water mark only ever moves forward."""
+
+    conn.execute(
+        text("""
+            INSERT INTO ingest_state (source, high_water, rows_written, updated_at)
+            VALUES (:source, :mark, :rows_written, NOW())
+            ON CONFLICT (source) DO UPDATE SET
+                high_water = GREATEST(ingest_state.high_water, EXCLUDED.high_water),
+                rows_written = EXCLUDED.rows_written,
+                updated_at = EXCLUDED.updated_at
+        """),
+        {"source": source, "mark": mark, "rows_written": rows_written}
+    )
+
+
+def ingest_ages(conn):
+    """{source: seconds since its last ingest}; empty before the first run."""
+
+    if not conn.execute(text("SELECT to_regclass('ingest_state')")).scalar():
+        return {}
+
+    return {
+        source: float(age)
+        for source, age in conn.execute(text("""
+            SELECT source, EXTRACT(EPOCH FROM NOW() - updated_at)
+            FROM ingest_state
+        """))
+    }
+
+
+def ingest_match_infos(conn, infos, source):
+    """
+    Upsert only the new or still-changing matches of a feed.
+
+    Matches starting after the source's high-water mark are new; older
+    ones are skipped once the warehouse already holds them as complete.
+    The mark advances to the latest start date of a completed match.
+    feed_matches is reset to the feed's current match ids.
+    """
+
+    mark = high_water(conn, source) or 0
+    rows = []
+
+    for info in infos:
+        if not info:
+            continue
+        row = match_row(info, source)
+        if row["match_id"]:
+            rows.append((_int(_pick(info, "startDate", "startdate")), row))
+
+    older = [row["match_id"] for start, row in rows if start <= mark]
+    settled = set()
+
+    if older:
+        settled = {
+            r[0] for r in conn.execute(
+                text("""
+                    SELECT match_id FROM matches
+                    WHERE match_id = ANY(:ids) AND is_complete
+                """),
+                {"ids": older}
+            )
+        }
+
+    delta = [row for start, row in rows if row["match_id"] not in settled]
+    written = upsert_matches(conn, delta)
+
+    feed_ids = list(dict.fromkeys(row["match_id"] for start, row in rows))
+
+    set_feed(conn, source, feed_ids)
+
+    completed = [start for start, row in rows if row["is_complete"]]
+    record_ingest(conn, source, written, max(completed) if completed else None)
+
+    return feed_ids
+
+
+def set_feed(conn, feed, match_ids):
+    """Make feed_matches hold exactly `match_ids` for `feed`, writing only the difference."""
+
+    params = {"feed": feed, "ids": list(match_ids)}
+
+    conn.execute(
+        text("""
+            DELETE FROM feed_matches
+            WHERE feed = :feed AND NOT (match_id = ANY(:ids))
+        """),
+        params
+    )
+
+    conn.execute(
+        text("""
+            INSERT INTO feed_matches (feed, match_id)
+            SELECT :feed, UNNEST(CAST(:ids AS BIGINT[]))
+            ON CONFLICT DO NOTHING
+        """),
+        params
+    )
+
+
+def existing_keys(conn, table, column):
+    """Values of `column` already stored in `table` (empty if either is missing)."""
+
+    found = conn.execute(
+        text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = :table AND column_name = :column
+        """),
+        {"table": table, "column": column}
+    ).scalar()
+
+    if not found:
+        return set()
+
+    return {r[0] for r in conn.execute(text(f"SELECT {column} FROM {table}"))}
+
+
+def _ensure_keyed_table(conn, df, table, key):
+    """
+    Create `table` from df's columns with a primary key on `key`.
+    A copy left by the old if_exists="replace" loads has no key, and one
+    with different columns is out of date; both are rebuilt.
+    """
+
+    has_key = conn.execute(
+        text("""
+            SELECT COUNT(*) FROM pg_index
+            WHERE indrelid = to_regclass(:table) AND indisprimary
+        """),
+        {"table": table}
+    ).scalar()
+
+    columns = {
+        r[0] for r in conn.execute(
+            text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = :table
+            """),
+            {"table": table}
+        )
+    }
+
+    if has_key and columns == set(df.columns):
+        return
+
+    # CASCADE: answer views over the old layout are rebuilt on next read
+    conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+    df.head(0).to_sql(table, conn, index=False)
+    conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(key)})"))
+
+
+def upsert_frame(conn, df, table, key, source=None):
+    """
+    INSERT ... ON CONFLICT a DataFrame into `table` keyed on `key`
+    columns, rewriting only rows whose values changed.
+    Returns the number of rows inserted or updated.
+    """
+
+    if df.empty:
+        return 0
+
+    key = [key] if isinstance(key, str) else list(key)
+    cols = list(df.columns)
+    others = [c for c in cols if c not in key]
+
+    create_schema(conn)
+    _ensure_keyed_table(conn, df, table, key)
+
+    if others:
+        conflict = (
+            f"DO UPDATE SET {', '.join(f'{c} = EXCLUDED.{c}' for c in others)} "
+            f"WHERE ({', '.join(f'{table}.{c}' for c in others)}) "
+            f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in others)})"
+        )
+    else:
+        conflict = "DO NOTHING"
+
+    result = conn.execute(
+        text(f"""
+            INSERT INTO {table} ({', '.join(cols)})
+            VALUES ({', '.join(':' + c for c in cols)})
+            ON CONFLICT ({', '.join(key)}) {conflict}
+        """),
+        df.to_dict("records")
+    )
+
+    if source:
+        record_ingest(conn, source, result.rowcount)
+
+    return result.rowcount
+
+
+def _table_columns(conn, table):
+    return [
+        r[0] for r in conn.execute(
+            text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = :table
+                ORDER BY ordinal_position
+            """),
+            {"table": table}
+        )
+    ]
+
+
+def _merge_frame(conn, df, table):
+    """
+    Diff df against `table` as multisets (EXCEPT ALL on both sides):
+    surplus copies of a row are deleted and missing ones inserted, so
+    unchanged rows are not touched. These answer tables have no key,
+    and a row may legitimately appear more than once.
+    """
+
+    stage = f"{table}_stage"
+    cols = ", ".join(f'"{c}"' for c in df.columns)
+
+    conn.execute(text(f"CREATE TEMP TABLE {stage} (LIKE {table}) ON COMMIT DROP"))
+    bulk_load(conn, stage, df)
+
+    # table EXCEPT ALL stage, by ctid: number each value's copies on
+    # both sides in one sort (PARTITION BY groups NULLs together) and
+    # delete the table's copies past the count df still has
+    conn.execute(text(f"""
+        DELETE FROM {table}
+        WHERE ctid IN (
+            SELECT row_id
+            FROM (
+                SELECT
+                    row_id,
+                    ROW_NUMBER() OVER (PARTITION BY {cols}, row_id IS NULL) AS copy_no,
+                    COUNT(*) FILTER (WHERE row_id IS NULL) OVER (PARTITION BY {cols}) AS wanted
+                FROM (
+                    SELECT ctid AS row_id, {cols} FROM {table}
+                    UNION ALL
+                    SELECT NULL::tid, {cols} FROM {stage}
+                ) both_sides
+            ) ranked
+            WHERE row_id IS NOT NULL AND copy_no > wanted
+        )
+    """))
+
+    # what is left is contained in df, so this adds exactly the missing copies
+    conn.execute(text(f"""
+        INSERT INTO {table} ({cols})
+        SELECT {cols} FROM {stage}
+        EXCEPT ALL
+        SELECT {cols} FROM {table}
+    """))
+
+    conn.execute(text(f"DROP TABLE {stage}"))
+
+
+def replace_frame(conn, df, table):
+    """
+    Make `table` hold exactly df's rows, like to_sql(if_exists="replace"),
+    but by deleting/inserting only the rows that differ. The table, and the
+    answer views over it, survive; it is recreated only when df's columns
+    or types no longer fit.
+    """
+
+    if list(df.columns) == _table_columns(conn, table):
+        try:
+            with conn.begin_nested():
+                _merge_frame(conn, df, table)
+            return
+        except DBAPIError as e:
+            print(f" {table} layout changed, recreating:", e.orig)
+
+    conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+    df.head(0).to_sql(table, conn, index=False)
+    bulk_load(conn, table, df)
+
+
+# ============================
+# PLAYER DIMENSION
+# One row per Cricbuzz player id, whatever name a feed used
+# ("Kohli", "Virat Kohli", a nickname). Every spelling seen is an
+# alias, so names parsed from free text resolve to the id.
+# ============================
+PLAYER_STAGE_SQL = """
+    CREATE TEMP TABLE player_stage (
+        player_id BIGINT,
+        name TEXT,
+        nickname TEXT
+    ) ON COMMIT DROP
+"""
+
+
+def _merge_player_stage(conn):
+    """Fold player_stage into players / player_aliases, then drop it."""
+
+    # the longest spelling is the full name, the shortest the short one
+    full_name = """CASE WHEN LENGTH(EXCLUDED.full_name) > LENGTH(COALESCE(players.full_name, ''))
+                   THEN EXCLUDED.full_name ELSE players.full_name END"""
+    short_name = """CASE WHEN players.short_name IS NULL
+                         OR LENGTH(EXCLUDED.short_name) < LENGTH(players.short_name)
+                    THEN EXCLUDED.short_name ELSE players.short_name END"""
+    nickname = "COALESCE(EXCLUDED.nickname, players.nickname)"
+
+    conn.execute(text(f"""
+        INSERT INTO players (player_id, full_name, short_name, nickname, updated_at)
+        SELECT
+            player_id,
+            (ARRAY_AGG(name ORDER BY LENGTH(name) DESC, name))[1],
+            (ARRAY_AGG(name ORDER BY LENGTH(name), name))[1],
+            MAX(nickname),
+            NOW()
+        FROM player_stage
+        GROUP BY player_id
+        ON CONFLICT (player_id) DO UPDATE SET
+            full_name = {full_name},
+            short_name = {short_name},
+            nickname = {nickname},
+            updated_at = EXCLUDED.updated_at
+        WHERE (players.full_name, players.short_name, players.nickname)
+              IS DISTINCT FROM ({full_name}, {short_name}, {nickname})
+    """))
+
+    conn.execute(text("""
+        INSERT INTO player_aliases (alias, player_id)
+        SELECT LOWER(name), player_id FROM player_stage
+        UNION
+        SELECT LOWER(nickname), player_id FROM player_stage WHERE nickname IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """))
+
+    conn.execute(text("DROP TABLE player_stage"))
+
+
+def upsert_players(conn, rows):
+    """
+    Merge player sightings (dicts or a DataFrame with player_id, name and
+    optionally nickname) from scorecards or team rosters into the player
+    dimension. Returns the number of sightings sent.
+    """
+
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+
+    if df.empty or "player_id" not in df or "name" not in df:
+        return 0
+
+    df = df.reindex(columns=["player_id", "name", "nickname"])
+    df["name"] = df["name"].astype("string").str.strip()
+    df["nickname"] = df["nickname"].astype("string").str.strip().replace("", pd.NA)
+    df["player_id"] = pd.to_numeric(df["player_id"], errors="coerce")
+
+    df = df[df["player_id"].gt(0) & df["name"].fillna("").ne("")].drop_duplicates()
+
+    if df.empty:
+        return 0
+
+    df = df.astype({"player_id": "int64"})
+
+    conn.execute(text(PLAYER_STAGE_SQL))
+    bulk_load(conn, "player_stage", df)
+    _merge_player_stage(conn)
+
+    return len(df)
+
+
+def _backfill_players(conn):
+    """Seed an empty player dimension from scorecards already loaded."""
+
+    if conn.execute(text("SELECT EXISTS (SELECT 1 FROM players)")).scalar():
+        return
+
+    conn.execute(text(PLAYER_STAGE_SQL))
+    conn.execute(text("""
+        INSERT INTO player_stage (player_id, name)
+        SELECT DISTINCT player_id, player_name FROM batting_entries
+        WHERE player_id > 0 AND player_name <> ''
+        UNION
+        SELECT DISTINCT player_id, player_name FROM bowling_entries
+        WHERE player_id > 0 AND player_name <> ''
+    """))
+    _merge_player_stage(conn)
+
+
+class PlayerIndex:
+    """In-memory player_id lookup by any alias, full name or surname."""
+
+    def __init__(self, names, aliases):
+
+        self.names = names              # player_id -> full name
+        self.aliases = {}               # exact alias -> {player_id}
+        self.tokens = {}                # single word of an alias -> {player_id}
+
+        for alias, player_id in aliases:
+            self.aliases.setdefault(alias, set()).add(player_id)
+            for token in alias.split():
+                self.tokens.setdefault(token, set()).add(player_id)
+
+    def resolve(self, name, among=None):
+        """
+        player_id for `name`, or None when unknown or ambiguous. `among`
+        (e.g. the ids who played the match) narrows the candidates, so
+        a bare surname from a dismissal resolves.
+        """
+
+        key = " ".join(str(name or "").lower().split())
+
+        for table, lookup in ((self.aliases, key), (self.tokens, key.split()[-1] if key else "")):
+
+            candidates = table.get(lookup, set())
+
+            if among is not None:
+                candidates = candidates & set(among)
+
+            if len(candidates) == 1:
+                return next(iter(candidates))
+
+            if candidates:
+                return None
+
+        return None
+
+    def name(self, player_id, default=None):
+        return self.names.get(player_id, default)
+
+
+PLAYER_TABLES = ["players", "player_aliases"]
+
+_player_index = {}
+
+
+def player_index(conn):
+    """
+    Shared PlayerIndex of conn's database, reloaded when the player
+    dimension changes. An index read by a transaction that has written
+    is cached only once that transaction commits.
+    """
+
+    for table in PLAYER_TABLES:
+        watch_table(conn, table)
+
+    key = str(conn.engine.url)
+    marks = source_marks(conn, PLAYER_TABLES)
+
+    cached = _player_index.get(key)
+
+    if cached is not None and cached[0] == marks:
+        return cached[1]
+
+    index = PlayerIndex(
+        dict(conn.execute(text("SELECT player_id, full_name FROM players")).fetchall()),
+        conn.execute(text("SELECT alias, player_id FROM player_aliases")).fetchall()
+    )
+
+    if conn.execute(text("SELECT txid_current_if_assigned()")).scalar() is None:
+        _player_index[key] = (marks, index)
+    else:
+        event.listen(conn, "commit", lambda _: _player_index.__setitem__(key, (marks, index)), once=True)
+
+    return index
+
+
+# ============================
+# TEAM ROSTERS
+# /teams/v1/{category} and /teams/v1/{id}/players, cached in
+# roster_teams / roster_players. A team's squad is refetched only
+# once it is older than ROSTER_MAX_AGE, and only the players that
+# joined, left or changed are written.
+# ============================
+ROSTER_MAX_AGE = int(os.getenv("ROSTER_MAX_AGE", str(24 * 3600)))
+
+ROSTER_COLUMNS = ["player_id", "squad_order", "name", "role", "batting_style", "bowling_style"]
+
+
+def parse_roster(payload):
+    """
+    Player dicts of a /teams/v1/{id}/players payload, in squad order.
+    Entries without an id are role headers ("BATSMEN", "ALL ROUNDER",
+    ...) for the players listed after them.
+    """
+
+    rows = []
+    role = None
+
+    for p in payload.get("player", []):
+
+        if "id" not in p:
+            role = p.get("name")
+            continue
+
+        rows.append({
+            "player_id": _int(p.get("id")),
+            "squad_order": len(rows),
+            "name": p.get("name"),
+            "role": role,
+            "batting_style": _pick(p, "battingStyle", "battingstyle"),
+            "bowling_style": _pick(p, "bowlingStyle", "bowlingstyle"),
+            "nickname": _pick(p, "nickName", "nickname")
+        })
+
+    return rows
+
+
+def _refresh_team_list(conn, category, max_age):
+
+    age = ingest_ages(conn).get(f"rosters/{category}")
+
+    if age is not None and age < max_age:
+        return
+
+    data = api_client.fetch_json(f"{api_client.BASE_URL}/teams/v1/{category}")
+
+    teams = [
+        {
+            "team_id": _int(t.get("teamId")),
+            "team_name": t.get("teamName"),
+            "team_short": t.get("teamSName"),
+            "category": category,
+            "list_order": i
+        }
+        for i, t in enumerate(t for t in data.get("list", []) if t.get("teamId"))
+    ]
+
+    # an API failure keeps the cached list
+    if not teams:
+        return
+
+    conn.execute(
+        text("""
+            INSERT INTO roster_teams (team_id, team_name, team_short, category, list_order)
+            VALUES (:team_id, :team_name, :team_short, :category, :list_order)
+            ON CONFLICT (team_id) DO UPDATE SET
+                team_name = EXCLUDED.team_name,
+                team_short = EXCLUDED.team_short,
+                category = EXCLUDED.category,
+                list_order = EXCLUDED.list_order
+            WHERE (roster_teams.team_name, roster_teams.team_short,
+                   roster_teams.category, roster_teams.list_order)
+                  IS DISTINCT FROM
+                  (EXCLUDED.team_name, EXCLUDED.team_short,
+                   EXCLUDED.category, EXCLUDED.list_order)
+        """),
+        teams
+    )
+
+    # teams no longer listed stay cached but leave the category
+    conn.execute(
+        text("""
+            UPDATE roster_teams SET category = NULL, list_order = NULL
+            WHERE category = :category AND NOT (team_id = ANY(:ids))
+        """),
+        {"category": category, "ids": [t["team_id"] for t in teams]}
+    )
+
+    record_ingest(conn, f"rosters/{category}", len(teams))
+
+
+def _apply_roster(conn, team_id, rows):
+    """Make roster_players hold exactly `rows` for the team, writing only the difference."""
+
+    conn.execute(
+        text("DELETE FROM roster_players WHERE team_id = :team_id AND NOT (player_id = ANY(:ids))"),
+        {"team_id": team_id, "ids": [r["player_id"] for r in rows]}
+    )
+
+    values = ", ".join(f"EXCLUDED.{c}" for c in ROSTER_COLUMNS[1:])
+    current = ", ".join(f"roster_players.{c}" for c in ROSTER_COLUMNS[1:])
+
+    conn.execute(
+        text(f"""
+            INSERT INTO roster_players (team_id, {', '.join(ROSTER_COLUMNS)})
+            VALUES (:team_id, {', '.join(':' + c for c in ROSTER_COLUMNS)})
+            ON CONFLICT (team_id, player_id) DO UPDATE SET
+                ({', '.join(ROSTER_COLUMNS[1:])}) = ({values})
+            WHERE ({current}) IS DISTINCT FROM ({values})
+        """),
+        [{"team_id": team_id, **{c: r[c] for c in ROSTER_COLUMNS}} for r in rows]
+    )
+
+    conn.execute(
+        text("UPDATE roster_teams SET players_fetched_at = NOW() WHERE team_id = :team_id"),
+        {"team_id": team_id}
+    )
+
+
+def refresh_rosters(engine, team_ids=None, category="international", max_age=ROSTER_MAX_AGE):
+    """
+    Refetch the squads (concurrently) of the given teams, or of every
+    `category` team, whose cached copy is missing or older than max_age.
+    Returns the ids of the teams refetched.
+    """
+
+    with engine.begin() as conn:
+
+        create_schema(conn)
+
+        if team_ids is None:
+            _refresh_team_list(conn, category, max_age)
+            team_ids = [
+                r[0] for r in conn.execute(
+                    text("SELECT team_id FROM roster_teams WHERE category = :category"),
+                    {"category": category}
+                )
+            ]
+        else:
+            team_ids = [int(t) for t in team_ids]
+            conn.execute(
+                text("""
+                    INSERT INTO roster_teams (team_id)
+                    SELECT UNNEST(CAST(:ids AS BIGINT[]))
+                    ON CONFLICT DO NOTHING
+                """),
+                {"ids": team_ids}
+            )
+
+        due = [
+            r[0] for r in conn.execute(
+                text("""
+                    SELECT team_id FROM roster_teams
+                    WHERE team_id = ANY(:ids)
+                      AND (players_fetched_at IS NULL
+                           OR players_fetched_at < NOW() - make_interval(secs => :max_age))
+                """),
+                {"ids": team_ids, "max_age": max_age}
+            )
+        ]
+
+    urls = {tid: f"{api_client.BASE_URL}/teams/v1/{tid}/players" for tid in due}
+    refreshed = []
+
+    for tid, payload in api_client.fetch_many(urls):
+
+        rows = parse_roster(payload)
+
+        # a failed fetch keeps the cached squad (and is retried next call)
+        if not rows:
+            continue
+
+        with engine.begin() as conn:
+            _apply_roster(conn, tid, rows)
+            upsert_players(conn, rows)
+
+        refreshed.append(tid)
+
+    return refreshed
+
+
+def roster(engine, team_ids=None, category="international", max_age=ROSTER_MAX_AGE):
+    """
+    Cached squads as one frame (team_id, team_name, player_id, squad_order,
+    name, role, batting_style, bowling_style), in team list / squad order.
+    Stale squads are refreshed first.
+    """
+
+    refresh_rosters(engine, team_ids, category, max_age)
+
+    if team_ids is None:
+        where, params = "t.category = :category", {"category": category}
+    else:
+        where, params = "t.team_id = ANY(:ids)", {"ids": [int(t) for t in team_ids]}
+
+    with engine.connect() as conn:
+        return pd.read_sql(
+            text(f"""
+                SELECT t.team_id, t.team_name, p.{', p.'.join(ROSTER_COLUMNS)}
+                FROM roster_teams t
+                JOIN roster_players p
+                    ON p.team_id = t.team_id
+                WHERE {where}
+                ORDER BY t.list_order NULLS LAST, t.team_id, p.squad_order
+            """),
+            conn,
+            params=params
+        )
+
+
+# ============================
+# PLAYER CAREER STATS
+# /stats/v1/player/{id}/batting and /bowling, kept as one long
+# table player_career_stats (player_id, discipline, format, stat,
+# value). Each (player, discipline) is refetched only once it is
+# older than CAREER_STATS_MAX_AGE, so every question and the
+# dashboard share one download per player per day.
+# ============================
+CAREER_STATS_MAX_AGE = int(os.getenv("CAREER_STATS_MAX_AGE", str(24 * 3600)))
+
+DISCIPLINES = ("batting", "bowling")
+
+CAREER_COLUMNS = ["player_id", "discipline", "format", "stat", "value", "raw", "format_order", "stat_order"]
+
+
+def career_value(raw):
+    """
+    Typed value of one stats cell: "183*" -> 183.0, "1,024" -> 1024.0,
+    "45.67" -> 45.67; "-", "" and figures like "5/20" -> None.
+    """
+
+    if raw is None:
+        return None
+
+    return _float(str(raw).replace(",", "").strip(), None)
+
+
+def parse_career_stats(player_id, discipline, payload):
+    """
+    Long rows of a /stats/v1/player/{id}/{discipline} payload. The
+    first header labels the stat column; the rest are formats.
+    """
+
+    formats = payload.get("headers", [])[1:]
+    rows = []
+
+    for stat_order, row in enumerate(payload.get("values", [])):
+
+        values = row.get("values", [])
+
+        if not values:
+            continue
+
+        for format_order, (fmt, raw) in enumerate(zip(formats, values[1:])):
+            rows.append({
+                "player_id": int(player_id),
+                "discipline": discipline,
+                "format": fmt,
+                "stat": values[0],
+                "value": career_value(raw),
+                "raw": raw,
+                "format_order": format_order,
+                "stat_order": stat_order
+            })
+
+    return rows
+
+
+def fetch_career_stats(player_ids, disciplines=DISCIPLINES):
+    """
+    Fetch and parse stats straight from the API (concurrently), without
+    the warehouse. Yields ((player_id, discipline), rows); rows is []
+    for a failed call.
+    """
+
+    urls = {
+        (int(pid), d): f"{api_client.BASE_URL}/stats/v1/player/{int(pid)}/{d}"
+        for pid in player_ids
+        for d in disciplines
+    }
+
+    for (pid, d), payload in api_client.fetch_many(urls):
+        yield (pid, d), parse_career_stats(pid, d, payload)
+
+
+def _apply_career_stats(conn, player_id, discipline, rows):
+    """Make player_career_stats hold exactly `rows` for the pair, writing only the difference."""
+
+    key = {"player_id": player_id, "discipline": discipline}
+
+    conn.execute(
+        text("""
+            DELETE FROM player_career_stats
+            WHERE player_id = :player_id AND discipline = :discipline
+              AND NOT ((format, stat) IN (
+                  SELECT * FROM UNNEST(CAST(:formats AS TEXT[]), CAST(:stats AS TEXT[]))
+              ))
+        """),
+        {**key, "formats": [r["format"] for r in rows], "stats": [r["stat"] for r in rows]}
+    )
+
+    values = ", ".join(f"EXCLUDED.{c}" for c in CAREER_COLUMNS[4:])
+    current = ", ".join(f"player_career_stats.{c}" for c in CAREER_COLUMNS[4:])
+
+    conn.execute(
+        text(f"""
+            INSERT INTO player_career_stats ({', '.join(CAREER_COLUMNS)})
+            VALUES ({', '.join(':' + c for c in CAREER_COLUMNS)})
+            ON CONFLICT (player_id, discipline, format, stat) DO UPDATE SET
+                ({', '.join(CAREER_COLUMNS[4:])}) = ({values})
+            WHERE ({current}) IS DISTINCT FROM ({values})
+        """),
+        rows
+    )
+
+    conn.execute(
+        text("""
+            INSERT INTO career_stats_fetches (player_id, discipline, fetched_at)
+            VALUES (:player_id, :discipline, NOW())
+            ON CONFLICT (player_id, discipline) DO UPDATE SET fetched_at = EXCLUDED.fetched_at
+        """),
+        key
+    )
+
+
+def refresh_career_stats(engine, player_ids, disciplines=DISCIPLINES, max_age=CAREER_STATS_MAX_AGE):
+    """
+    Refetch (concurrently) the stats of the given players whose cached
+    copy is missing or older than max_age. Returns the (player_id,
+    discipline) pairs refetched.
+    """
+
+    player_ids = sorted({int(p) for p in player_ids})
+    disciplines = list(disciplines)
+
+    with engine.begin() as conn:
+
+        create_schema(conn)
+
+        fresh = set(
+            conn.execute(
+                text("""
+                    SELECT player_id, discipline FROM career_stats_fetches
+                    WHERE player_id = ANY(:ids)
+                      AND discipline = ANY(:disciplines)
+                      AND fetched_at >= NOW() - make_interval(secs => :max_age)
+                """),
+                {"ids": player_ids, "disciplines": disciplines, "max_age": max_age}
+            ).fetchall()
+        )
+
+    due = {}
+
+    for pid in player_ids:
+        for d in disciplines:
+            if (pid, d) not in fresh:
+                due.setdefault(d, []).append(pid)
+
+    refreshed = []
+
+    for d, pids in due.items():
+        for key, rows in fetch_career_stats(pids, [d]):
+
+            # a failed fetch keeps the cached stats (and is retried next call)
+            if not rows:
+                continue
+
+            with engine.begin() as conn:
+                _apply_career_stats(conn, *key, rows)
+
+            refreshed.append(key)
+
+    return refreshed
+
+
+def career_stats(engine, player_ids, disciplines=DISCIPLINES, max_age=CAREER_STATS_MAX_AGE):
+    """
+    Cached career stats of the players as one long frame (player_id,
+    discipline, format, stat, value, raw, ...) in payload order.
+    Stale players are refreshed first.
+    """
+
+    player_ids = [int(p) for p in player_ids]
+
+    refresh_career_stats(engine, player_ids, disciplines, max_age)
+
+    with engine.connect() as conn:
+        return pd.read_sql(
+            text(f"""
+                SELECT {', '.join(CAREER_COLUMNS)}
+                FROM player_career_stats
+                WHERE player_id = ANY(:ids)
+                  AND discipline = ANY(:disciplines)
+                ORDER BY player_id, discipline, stat_order, format_order
+            """),
+            conn,
+            params={"ids": player_ids, "disciplines": list(disciplines)}
+        )
+
+
+def career_table(engine, player_ids, discipline, stats, formats=None, max_age=CAREER_STATS_MAX_AGE):
+    """
+    One discipline's stats as a wide frame: a (player_id, format) row
+    per format the player has, one numeric column per stat in `stats`
+    (NaN where the payload has no number).
+    """
+
+    long = career_stats(engine, player_ids, [discipline], max_age)
+
+    if formats is not None:
+        long = long[long["format"].isin(formats)]
+
+    wide = (
+        long[long["stat"].isin(stats)]
+        .set_index(["player_id", "format", "stat"])["value"]
+        .unstack("stat")
+        .reindex(columns=list(stats))
+    )
+    wide.columns.name = None
+
+    # keep formats the player has even when every picked stat is blank
+    keys = long[["player_id", "format"]].drop_duplicates()
+
+    return keys.merge(wide.reset_index(), on=["player_id", "format"], how="left")
+
+
+# ============================
+# DISMISSALS
+# Cricbuzz "outdec" strings ("c McSweeney b Mitchell Starc",
+# "run out (Cummins/Alex Carey)", "st Alex Carey b Lyon", ...)
+# parsed column-wise with one precompiled pattern. Every catch,
+# stumping and run-out becomes a fielding_events row.
+# ============================
+DISMISSAL_PATTERN = re.compile(r"""
+    ^\s*(?:
+        c\s*(?:&|and)\s*b\s+(?P<caught_and_bowled>.+)
+      | c\s+(?P<caught_by>.+?)\s+b\s+(?P<caught_b>.+)
+      | st\s+(?P<stumped_by>.+?)\s+b\s+(?P<stumped_b>.+)
+      | lbw\s+b\s+(?P<lbw>.+)
+      | hit\s+w(?:ic)?ke?t\s+b\s+(?P<hit_wicket>.+)
+      | b\s+(?P<bowled>.+)
+      | run\s+out\s*\((?P<run_out>(?:[^()]|\([^()]*\))*)\)
+    )\s*$
+""", re.IGNORECASE | re.VERBOSE)
+
+# "(sub)Abbott" / "sub (Abbott)", also inside "run out ((sub)Abbott/Carey)"
+SUBSTITUTE_PATTERN = re.compile(r"^\s*(?P<sub>\(sub\)|sub\b)?\s*\(?(?P<name>[^()]*?)\)?\s*$", re.IGNORECASE)
+
+# kind -> (bowler group, fielder group)
+DISMISSAL_KINDS = {
+    "caught and bowled": ("caught_and_bowled", "caught_and_bowled"),
+    "caught": ("caught_b", "caught_by"),
+    "stumped": ("stumped_b", "stumped_by"),
+    "lbw": ("lbw", None),
+    "hit wicket": ("hit_wicket", None),
+    "bowled": ("bowled", None),
+    "run out": (None, "run_out"),
+}
+
+
+def parse_dismissals(dismissals):
+    """
+    Parse a Series of dismissal strings. Returns a frame on the same
+    index with kind (None for not out / retired / blank), bowler and
+    fielders ("/"-separated for run outs).
+    """
+
+    groups = pd.Series(dismissals, dtype="string").str.extract(DISMISSAL_PATTERN)
+
+    out = pd.DataFrame(index=groups.index, columns=["kind", "bowler", "fielders"], dtype="string")
+
+    for kind, (bowler, fielders) in DISMISSAL_KINDS.items():
+
+        hit = groups[bowler or fielders].notna() & out["kind"].isna()
+
+        out.loc[hit, "kind"] = kind
+
+        if bowler:
+            out.loc[hit, "bowler"] = groups.loc[hit, bowler].str.strip()
+        if fielders:
+            out.loc[hit, "fielders"] = groups.loc[hit, fielders].str.strip()
+
+    return out
+
+
+FIELDING_COLUMNS = ["match_id", "innings_id", "position", "kind", "fielder_name", "is_substitute"]
+
+
+def fielding_events_frame(batting):
+    """fielding_events rows (fielder ids unresolved) for batting_entries rows."""
+
+    if batting.empty or "dismissal" not in batting:
+        return pd.DataFrame(columns=FIELDING_COLUMNS)
+
+    events = batting[["match_id", "innings_id", "position"]].join(parse_dismissals(batting["dismissal"]))
+    events = events[events["fielders"].notna()]
+
+    events = events.assign(fielder_name=events["fielders"].str.split("/")).explode("fielder_name")
+
+    names = events["fielder_name"].str.extract(SUBSTITUTE_PATTERN)
+    events["is_substitute"] = names["sub"].notna()
+    events["fielder_name"] = names["name"].str.strip()
+
+    events = events[events["fielder_name"].fillna("").ne("")]
+
+    return events[FIELDING_COLUMNS].drop_duplicates(["match_id", "innings_id", "position", "fielder_name"])
+
+
+def resolve_fielders(conn, match_ids):
+    """
+    Set fielding_events.fielder_id for the matches' unresolved rows with
+    the PlayerIndex, narrowed to the players of each match: the one with
+    the name as an alias, else the one whose alias has its last word.
+    """
+
+    ids = [int(m) for m in match_ids]
+
+    pending = conn.execute(
+        text("""
+            SELECT DISTINCT match_id, fielder_name FROM fielding_events
+            WHERE match_id = ANY(:ids) AND fielder_id IS NULL
+        """),
+        {"ids": ids}
+    ).fetchall()
+
+    if not pending:
+        return
+
+    lineups = {}
+
+    for match_id, player_id in conn.execute(
+        text("""
+            SELECT match_id, player_id FROM batting_entries WHERE match_id = ANY(:ids)
+            UNION
+            SELECT match_id, player_id FROM bowling_entries WHERE match_id = ANY(:ids)
+        """),
+        {"ids": ids}
+    ):
+        lineups.setdefault(match_id, set()).add(player_id)
+
+    index = player_index(conn)
+
+    resolved = [
+        (match_id, name, index.resolve(name, among=lineups.get(match_id, ())))
+        for match_id, name in pending
+    ]
+    resolved = [r for r in resolved if r[2] is not None]
+
+    if not resolved:
+        return
+
+    match_col, name_col, player_col = (list(c) for c in zip(*resolved))
+
+    conn.execute(
+        text("""
+            UPDATE fielding_events f
+            SET fielder_id = r.player_id
+            FROM UNNEST(CAST(:match_ids AS BIGINT[]), CAST(:names AS TEXT[]), CAST(:player_ids AS BIGINT[]))
+                AS r(match_id, fielder_name, player_id)
+            WHERE f.fielder_id IS NULL
+              AND f.match_id = r.match_id
+              AND f.fielder_name = r.fielder_name
+        """),
+        {"match_ids": match_col, "names": name_col, "player_ids": player_col}
+    )
+
+
+def _backfill_fielding(conn):
+    """Parse the dismissals of scorecards loaded before fielding_events existed (once)."""
+
+    if high_water(conn, "fielding_events/backfill") is not None:
+        return
+
+    batting = pd.read_sql(
+        text("""
+            SELECT b.match_id, b.innings_id, b.position, b.dismissal
+            FROM batting_entries b
+            WHERE NOT EXISTS (
+                SELECT 1 FROM fielding_events f WHERE f.match_id = b.match_id
+            )
+        """),
+        conn
+    )
+
+    events = fielding_events_frame(batting)
+    bulk_load(conn, "fielding_events", events)
+    resolve_fielders(conn, events["match_id"].unique().tolist())
+
+    record_ingest(conn, "fielding_events/backfill", len(events), 1)
+
+
+# ============================
+# ANSWER VIEWS
+# Each question's final SQL is kept as a materialized view
+# answer_<name> with a unique row index, so it can be refreshed
+# CONCURRENTLY while the dashboard reads it. Statement triggers on
+# the view's source tables bump their version in table_changes; a
+# view keeps the version of each source it was refreshed from and is
+# refreshed only when one of them moved past it.
+# ============================
+CHANGE_EVENTS = [("ins", "INSERT", "NEW"), ("upd", "UPDATE", "NEW"), ("del", "DELETE", "OLD")]
+
+
+def watch_table(conn, table):
+    """
+    Install the note_table_change triggers on `table` (idempotent). The
+    check-and-create runs under a per-table advisory lock, so two cold
+    builds over the same source cannot both try to create them.
+    """
+
+    if _has_trigger(conn, table, "note_change_trunc"):
+        return
+
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('watch_table.' || :table))"), {"table": table})
+
+    # a concurrent caller may have committed them while we waited
+    if _has_trigger(conn, table, "note_change_trunc"):
+        return
+
+    # transition tables need one trigger per event
+    for suffix, op, ref in CHANGE_EVENTS:
+        conn.execute(text(f"""
+            CREATE TRIGGER note_change_{suffix}
+            AFTER {op} ON {table}
+            REFERENCING {ref} TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION note_table_change()
+        """))
+
+    conn.execute(text(f"""
+        CREATE TRIGGER note_change_trunc
+        AFTER TRUNCATE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION note_table_change()
+    """))
+
+
+def _view_sources(conn, view):
+    """Base tables the view's query reads, from the dependency catalog."""
+
+    return [
+        r[0] for r in conn.execute(
+            text("""
+                SELECT DISTINCT c.relname
+                FROM pg_rewrite r
+                JOIN pg_depend d
+                    ON d.classid = 'pg_rewrite'::regclass
+                    AND d.objid = r.oid
+                JOIN pg_class c
+                    ON c.oid = d.refobjid
+                WHERE r.ev_class = to_regclass(:view)
+                  AND c.relkind = 'r'
+                  AND c.oid <> r.ev_class
+            """),
+            {"view": view}
+        )
+    ]
+
+
+def source_marks(conn, tables):
+    """{table: change version} for the watched `tables`; compare per table, never a max."""
+
+    return dict(conn.execute(
+        text("SELECT table_name, version FROM table_changes WHERE table_name = ANY(:tables)"),
+        {"tables": list(tables)}
+    ).fetchall())
+
+
+def _lock_view(conn, view):
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:view))"), {"view": view})
+
+
+def _build_answer(conn, view, sql, definition):
+
+    _lock_view(conn, view)
+
+    conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view}"))
+    conn.execute(text(f"""
+        CREATE MATERIALIZED VIEW {view} AS
+        SELECT ROW_NUMBER() OVER () AS answer_row, a.*
+        FROM ({sql}) a
+    """))
+    conn.execute(text(f"CREATE UNIQUE INDEX {view}_row ON {view} (answer_row)"))
+
+    sources = _view_sources(conn, view)
+
+    for table in sources:
+        watch_table(conn, table)
+
+    conn.execute(
+        text("""
+            INSERT INTO answer_views (view_name, definition, sources, source_marks, refreshed_at)
+            VALUES (:view, :definition, :sources, CAST(:marks AS JSONB), NOW())
+            ON CONFLICT (view_name) DO UPDATE SET
+                definition = EXCLUDED.definition,
+                sources = EXCLUDED.sources,
+                source_marks = EXCLUDED.source_marks,
+                refreshed_at = EXCLUDED.refreshed_at
+        """),
+        {
+            "view": view,
+            "definition": definition,
+            "sources": sources,
+            "marks": json.dumps(source_marks(conn, sources))
+        }
+    )
+
+
+def _refresh_answer(conn, view, sources):
+
+    _lock_view(conn, view)
+
+    # read the marks first: the refresh sees at least what they cover,
+    # and a write still uncommitted now commits a higher version of its
+    # own table, so the next staleness check picks it up
+    marks = source_marks(conn, sources)
+
+    conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    conn.execute(
+        text("""
+            UPDATE answer_views SET source_marks = CAST(:marks AS JSONB), refreshed_at = NOW()
+            WHERE view_name = :view
+        """),
+        {"view": view, "marks": json.dumps(marks)}
+    )
+
+
+STALE_SQL = """
+    EXISTS (
+        SELECT 1 FROM table_changes c
+        WHERE c.table_name = ANY(v.sources)
+          AND c.version > COALESCE((v.source_marks ->> c.table_name)::BIGINT, 0)
+    )
+"""
+
+
+def _answer_state(conn, view):
+
+    if not conn.execute(text("SELECT to_regclass('answer_views')")).scalar():
+        create_schema(conn)
+
+    return conn.execute(
+        text(f"""
+            SELECT
+                v.definition,
+                v.sources,
+                to_regclass(v.view_name) IS NOT NULL AS present,
+                COALESCE({STALE_SQL}, FALSE) AS stale
+            FROM answer_views v
+            WHERE v.view_name = :view
+        """),
+        {"view": view}
+    ).first()
+
+
+def read_answer(engine, name, sql):
+    """
+    Return `sql`'s result from materialized view answer_<name>: built on
+    first use (or when the SQL changed), refreshed when a source changed.
+    `sql` must be self-contained (no bind parameters).
+    """
+
+    view = f"answer_{name}"
+    sql = sql.strip().rstrip(";")
+    definition = hashlib.md5(sql.encode("utf-8")).hexdigest()
+
+    with engine.begin() as conn:
+
+        state = _answer_state(conn, view)
+
+        if state is None or not state.present or state.definition != definition:
+            _build_answer(conn, view, sql, definition)
+        elif state.stale:
+            _refresh_answer(conn, view, state.sources)
+
+        df = pd.read_sql(text(f"SELECT * FROM {view} ORDER BY answer_row"), conn)
+
+    return df.drop(columns="answer_row")
+
+
+def refresh_answers(engine):
+    """Refresh every built answer view whose sources changed. Returns their names."""
+
+    with engine.begin() as conn:
+
+        create_schema(conn)
+
+        stale = conn.execute(text(f"""
+            SELECT v.view_name, v.sources
+            FROM answer_views v
+            WHERE to_regclass(v.view_name) IS NOT NULL
+              AND {STALE_SQL}
+        """)).fetchall()
+
+    for view, sources in stale:
+        with engine.begin() as conn:
+            _refresh_answer(conn, view, sources)
+
+    return [view for view, _ in stale]
+
+
+# ============================
+# LOCAL SCORECARD ARCHIVE (data/)
+# The archive can hold tens of thousands of match files. Changed
+# files (by mtime/size, remembered in archive_files) are parsed in
+# a process pool into one DataFrame per table per batch, and each
+# batch is loaded with a single COPY per table.
+# ============================
+CORPUS_WORKERS = int(os.getenv("CORPUS_WORKERS", str(os.cpu_count() or 1)))
+CORPUS_BATCH = int(os.getenv("CORPUS_BATCH", "500"))
+
+SCORECARD_TABLES = ["innings", *CHILD_TABLES]
+
+
+def _archive_files(data_dir):
+    """[(match_id, path, mtime_ns, size)] for data/match_<id>.json, in file-name order."""
+
+    files = []
+
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+
+            name = entry.name
+
+            if not name.startswith("match_") or not name.endswith(".json"):
+                continue
+
+            match_part = name[len("match_"):-len(".json")]
+
+            if match_part.isdigit():
+                st = entry.stat()
+                files.append((int(match_part), entry.path, st.st_mtime_ns, st.st_size))
+
+    return sorted(files, key=lambda f: os.path.basename(f[1]))
+
+
+def archive_match_ids(data_dir=DATA_DIR):
+    """Match ids of the archived scorecards, without parsing them."""
+    return [f[0] for f in _archive_files(data_dir)]
+
+
+def _read_json(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _parse_scorecards(files):
+    """
+    Process-pool worker: parse [(match_id, path)] into one DataFrame per
+    table ("matches" plus the scorecard tables), built once per batch.
+    """
+
+    matches = []
+    rows = {t: [] for t in [*SCORECARD_TABLES, "players"]}
+
+    for match_id, path in files:
+
+        try:
+            scard = _read_json(path)
+        except (OSError, ValueError):
+            continue
+
+        status = scard.get("status")
+
+        matches.append({
+            "match_id": match_id,
+            "status": status,
+            "winner": winner_from_status(status),
+            "is_complete": scard.get("ismatchcomplete"),
+            "scorecard_updated": _int(scard.get("responselastupdated"))
+        })
+
+        for table, table_rows in scorecard_rows(match_id, scard).items():
+            rows[table].extend(table_rows)
+
+    # object dtype keeps ints with gaps as ints, so COPY gets "12" not "12.0"
+    batch = {"matches": pd.DataFrame(matches, dtype=object)}
+    batch.update({t: pd.DataFrame(r, dtype=object) for t, r in rows.items()})
+    batch["fielding_events"] = fielding_events_frame(batch["batting_entries"])
+
+    return batch
+
+
+def iter_scorecard_batches(files, batch_size=CORPUS_BATCH, workers=CORPUS_WORKERS):
+    """
+    Yield {table: DataFrame} batches for [(match_id, path)], in order.
+    Batches are parsed in a process pool when there is more than one.
+    """
+
+    chunks = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield _parse_scorecards(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        yield from pool.map(_parse_scorecards, chunks)
+
+
+def _load_scorecard_batch(conn, batch, infos, source="archive"):
+    """load_scorecard for a whole batch: one COPY per table instead of per match."""
+
+    parsed = batch["matches"]
+
+    if parsed.empty:
+        return []
+
+    ids = [int(m) for m in parsed["match_id"]]
+
+    stored = dict(conn.execute(
+        text("SELECT match_id, scorecard_updated FROM matches WHERE match_id = ANY(:ids)"),
+        {"ids": ids}
+    ).fetchall())
+
+    match_rows = []
+    fresh = []
+
+    for m in parsed.to_dict("records"):
+
+        info = infos.get(str(m["match_id"]))
+        # cached info carries a pre-result status; the scorecard's wins
+        row = match_row(info, source) if info else {}
+
+        match_rows.append({
+            **row,
+            "match_id": m["match_id"],
+            "source": source,
+            "status": m["status"],
+            "winner": m["winner"],
+            "is_complete": m["is_complete"]
+        })
+
+        if stored.get(m["match_id"]) is None or stored[m["match_id"]] < m["scorecard_updated"]:
+            fresh.append(m)
+
+    upsert_matches(conn, match_rows)
+
+    if fresh:
+        fresh_ids = [m["match_id"] for m in fresh]
+
+        conn.execute(text("DELETE FROM innings WHERE match_id = ANY(:ids)"), {"ids": fresh_ids})
+
+        for table in SCORECARD_TABLES:
+            df = batch[table]
+            if not df.empty:
+                bulk_load(conn, table, df[df["match_id"].isin(fresh_ids)])
+
+        upsert_players(conn, batch["players"])
+
+        events = batch["fielding_events"]
+        bulk_load(conn, "fielding_events", events[events["match_id"].isin(fresh_ids)])
+        resolve_fielders(conn, fresh_ids)
+
+        conn.execute(
+            text("""
+                UPDATE matches m SET scorecard_updated = u.ts
+                FROM UNNEST(CAST(:ids AS BIGINT[]), CAST(:ts AS BIGINT[])) AS u(match_id, ts)
+                WHERE m.match_id = u.match_id
+            """),
+            {"ids": fresh_ids, "ts": [m["scorecard_updated"] for m in fresh]}
+        )
+
+    return ids
+
+
+def load_archive(engine, data_dir=DATA_DIR):
+    """
+    Load data/match_<id>.json scorecards (+ q22 match info) as source='archive'.
+    Only files whose mtime/size changed since the last load are parsed.
+    Returns the archive's match ids so callers can scope queries to it.
+    """
+
+    info_path = os.path.join(data_dir, "q22_match_cache.json")
+    infos = {}
+
+    if os.path.exists(info_path):
+        infos = _read_json(info_path)
+
+    files = _archive_files(data_dir)
+
+    with engine.begin() as conn:
+        create_schema(conn)
+
+        seen = {
+            r[0]: (r[1], r[2]) for r in conn.execute(
+                text("SELECT match_id, mtime_ns, size FROM archive_files")
+            )
+        }
+
+        changed = [
+            (match_id, path) for match_id, path, mtime_ns, size in files
+            if seen.get(match_id) != (mtime_ns, size)
+        ]
+
+        stats = {match_id: (path, mtime_ns, size) for match_id, path, mtime_ns, size in files}
+        loaded = []
+
+        for batch in iter_scorecard_batches(changed):
+            loaded.extend(_load_scorecard_batch(conn, batch, infos))
+
+        # a newer q22 info cache is applied to every archived match
+        # (just-loaded ones already merged it)
+        fresh = set(loaded)
+        info_mtime = os.stat(info_path).st_mtime_ns if infos else None
+
+        if info_mtime and info_mtime > (high_water(conn, "archive/info") or 0):
+            upsert_matches(conn, [
+                {**match_row(info, "archive"), "match_id": int(mid), "source": "archive",
+                 "status": None, "winner": None}
+                for mid, info in infos.items()
+                if int(mid) in seen and int(mid) not in fresh
+            ])
+            record_ingest(conn, "archive/info", len(infos), info_mtime)
+
+        conn.execute(
+            text("DELETE FROM archive_files WHERE NOT (match_id = ANY(:ids))"),
+            {"ids": list(stats)}
+        )
+
+        if loaded:
+            conn.execute(
+                text("""
+                    INSERT INTO archive_files (match_id, path, mtime_ns, size)
+                    VALUES (:match_id, :path, :mtime_ns, :size)
+                    ON CONFLICT (match_id) DO UPDATE SET
+                        path = EXCLUDED.path,
+                        mtime_ns = EXCLUDED.mtime_ns,
+                        size = EXCLUDED.size
+                """),
+                [
+                    {"match_id": mid, "path": stats[mid][0],
+                     "mtime_ns": stats[mid][1], "size": stats[mid][2]}
+                    for mid in loaded
+                ]
+            )
+
+        match_ids = [r[0] for r in conn.execute(
+            text("SELECT match_id FROM archive_files ORDER BY path")
+        )]
+
+        # archive questions scope their answer views to this feed
+        set_feed(conn, "archive", match_ids)
+
+    return match_ids